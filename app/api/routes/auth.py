@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import insert, select
 from sqlalchemy.exc import IntegrityError
@@ -6,6 +7,7 @@ from db.session import get_db
 from db.tables import Tables
 from schemas.users import UserCreate, UserLogin, Token
 from core.security import hash_password, verify_password, create_access_token
+from crud.users import find_user_by_email, insert_user
 from core.config import settings
 from datetime import timedelta
 from api.routes.google import get_current_user_from_token
@@ -16,46 +18,34 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 @router.post("/register", status_code=201)
 async def register_user(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if email exists
-    result = await db.execute(
-        select(tables.users).where(tables.users.c.email == user_data.email)
-    )
-    existing_user = result.first()
+    existing_user = await find_user_by_email(user_data.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Create new user
-    hashed_pw = hash_password(user_data.password)
-    stmt = (
-        insert(tables.users)
-        .values(
+    # bcrypt off the event loop; the auth admission gate bounds these threads
+    hashed_pw = await run_in_threadpool(hash_password, user_data.password)
+    try:
+        new_user = await insert_user(
             email=user_data.email,
             full_name=user_data.full_name,
             password=hashed_pw,
         )
-        .returning(tables.users.c.id)
-    )
-
-    try:
-        result = await db.execute(stmt)
-        await db.commit()
     except IntegrityError:
         raise HTTPException(status_code=400, detail="Failed to register user")
 
-    new_user_id = result.scalar_one()
-    return {"message": "User registered successfully", "user_id": new_user_id}
+    return {"message": "User registered successfully", "user_id": new_user.id}
 
 
 @router.post("/login", response_model=Token)
 async def login(user_in: UserLogin, db: AsyncSession = Depends(get_db)):
-    stmt = select(tables.users).where(tables.users.c.email == user_in.email)
-    result = await db.execute(stmt)
-    user_row = result.fetchone()
+    user_row = await find_user_by_email(user_in.email)
 
     if not user_row:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     user_data = user_row._mapping  # Access as dict
-    if not verify_password(user_in.password, user_data["password"]):
+    if not await run_in_threadpool(verify_password, user_in.password, user_data["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token(
@@ -1,21 +1,36 @@
 from fastapi import APIRouter, Depends, status, Query
-from typing import List
+from typing import List, Literal, Optional
 from uuid import UUID
 from sqlalchemy import text
 from schemas.checkin import *
 from crud.checkin import *
 from core.dependencies import get_current_user
 from db.session import get_db
+from utils.response import FastJSONResponse, model_response
+from utils.fields import parse_fields, select_columns
 
 router = APIRouter(prefix="/checkin", tags=["Check-ins"])
 
 
 @router.get("/", response_model=List[CheckinOut])
 async def fetch_all_checkins(
+    view: Literal["full", "summary"] = Query(
+        "full", description="summary: no note, a short server-side preview instead"
+    ),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated subset of: {', '.join(CHECKIN_FIELDS)}"
+    ),
     user=Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await get_all_checkins(user["id"], db)
+    selected = parse_fields(fields, CHECKIN_FIELDS)
+    if selected is None and view == "summary":
+        selected = list(CHECKIN_SUMMARY_FIELDS)
+
+    rows = await get_all_checkins(user["id"], db, fields=selected)
+    if selected:
+        return FastJSONResponse(rows)
+    return model_response(rows, CheckinOut, many=True)
 
 
 # Create a new check-in
@@ -25,20 +40,29 @@ async def create_new_checkin(
     user=Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await create_checkin(user_id=user["id"], payload=payload, db=db)
+    row = await create_checkin(user_id=user["id"], payload=payload, db=db)
+    return model_response(row, CheckinOut, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/checkins", summary="List all check-ins (optionally between dates)")
 async def list_checkins(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated subset of: {', '.join(CHECKIN_FIELDS)}"
+    ),
     user=Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     user_id = user["id"]
     checkins_table = Tables().daily_checkins
 
-    query = select(checkins_table).where(checkins_table.c.user_id == user_id)
+    selected = parse_fields(fields, CHECKIN_FIELDS)
+    if selected:
+        query = select(*select_columns(checkins_table, selected, preview_of="note"))
+    else:
+        query = select(checkins_table)
+    query = query.where(checkins_table.c.user_id == user_id)
 
     if start_date:
         query = query.where(checkins_table.c.date >= start_date)
@@ -49,7 +73,9 @@ async def list_checkins(
     result = await db.execute(query)
     data = result.mappings().all()
 
-    return {"success": True, "data": data, "message": "Check-ins fetched successfully"}
+    return FastJSONResponse(
+        {"success": True, "data": data, "message": "Check-ins fetched successfully"}
+    )
 
 
 @router.get("/checkin/today", summary="Check if user has checked in today")
@@ -57,15 +83,7 @@ async def check_if_checked_in_today(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    today = date.today()
-    checkin_table = Tables().daily_checkins
-
-    query = select(checkin_table).where(
-        checkin_table.c.user_id == current_user["id"],
-        checkin_table.c.date == today,
-    )
-    result = await db.execute(query)
-    checkin = result.first()
+    checkin = await has_checked_in_today(current_user["id"], db)
 
     return {
         "success": True,
@@ -121,11 +139,13 @@ async def get_checkin_history(
 
     rows = result.mappings().all()
 
-    return {
-        "success": True,
-        "message": f"Last {range} check-ins retrieved",
-        "data": [dict(r) for r in rows],
-    }
+    return FastJSONResponse(
+        {
+            "success": True,
+            "message": f"Last {range} check-ins retrieved",
+            "data": rows,
+        }
+    )
 
 
 
@@ -144,7 +164,8 @@ async def fetch_checkin_by_id(
     user=Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await get_checkin_by_id(user["id"], checkin_id, db)
+    row = await get_checkin_by_id(user["id"], checkin_id, db)
+    return model_response(row, CheckinOut)
 
 
 # Update check-in
@@ -155,9 +176,10 @@ async def update_checkin(
     user=Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await update_checkin_by_id(
+    row = await update_checkin_by_id(
         user_id=user["id"], checkin_id=checkin_id, payload=payload, db=db
     )
+    return model_response(row, CheckinOut)
 
 
 # Delete check-in
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from core.dependencies import get_current_user
+from crud.dashboard import get_dashboard_data
+
+router = APIRouter(tags=["dashboard"])
+
+
+@router.get("/dashboard", summary="Streak, today, stats, weekly summary, goal and sentiment in one call")
+async def dashboard(user: dict = Depends(get_current_user)):
+    data = await get_dashboard_data(user["id"])
+
+    return {
+        "success": True,
+        "message": "Dashboard retrieved" if not data["errors"] else "Dashboard partially retrieved",
+        "data": data,
+    }
@@ -3,9 +3,11 @@ from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse ,RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, insert
-from core.oauth import oauth
+from core.oauth import get_oauth
 from db.session import get_db
 from core.security import create_access_token
+from core.metrics import track_external
+from crud.users import find_user, insert_user
 from core.dependencies import get_current_user
 from db.tables import Tables
 import uuid
@@ -17,36 +19,31 @@ tables = Tables()
 @router.get("/login")
 async def github_login(request: Request):
     redirect_uri = request.url_for("github_callback")
-    return await oauth.github.authorize_redirect(request, redirect_uri)
+    return await get_oauth().github.authorize_redirect(request, redirect_uri)
 
 
 @router.get("/callback")
 async def github_callback(request: Request, db: AsyncSession = Depends(get_db)):
-    token = await oauth.github.authorize_access_token(request)
-    resp = await oauth.github.get("user", token=token)
+    with track_external("github"):
+        token = await get_oauth().github.authorize_access_token(request)
+    with track_external("github"):
+        resp = await get_oauth().github.get("user", token=token)
     profile = resp.json()
 
     github_id = str(profile["id"])
     email = profile.get("email") or f"{github_id}@github.fake"
     full_name = profile.get("name")
 
-    stmt = select(tables.users).where(tables.users.c.github_id == github_id)
-    result = await db.execute(stmt)
-    user_row = result.first()
+    user_row = await find_user(tables.users.c.github_id == github_id)
 
     if not user_row:
-        user_id = str(uuid.uuid4())
-        insert_stmt = insert(tables.users).values(
-            id=user_id,
+        user_row = await insert_user(
             email=email,
             github_id=github_id,
             full_name=full_name,
             is_active=True,
         )
-        await db.execute(insert_stmt)
-        await db.commit()
-    else:
-        user_id = str(user_row.id)
+    user_id = str(user_row.id)
     access_token = create_access_token({"sub": user_id}, expires_delta=timedelta(minutes=60))
     redirect_url = f"https://focus-journal-frontend.vercel.app/auth/callback?access_token={access_token}"
     return RedirectResponse(url=redirect_url)
@@ -3,13 +3,14 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import insert
-from core.oauth import oauth
+from core.oauth import get_oauth
 from db.session import get_db
 from core.security import create_access_token
+from core.metrics import track_external
+from crud.users import find_user_by_email, insert_user
 import uuid
 from db.tables import Tables
 from datetime import timedelta
-import httpx
 import urllib.parse
 from fastapi.responses import RedirectResponse
 
@@ -51,6 +52,8 @@ async def google_login(request: Request):
 
 @router.get("/callback", name="google_callback")
 async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
+    import httpx  # ~0.2s to import; only OAuth callbacks need it
+
     try:
         logging.debug("=== Google Callback Started (Manual Flow) ===")
         
@@ -80,11 +83,12 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
         
         logging.debug("Exchanging code for token")
         async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                'https://oauth2.googleapis.com/token',
-                data=token_data,
-                headers={'Content-Type': 'application/x-www-form-urlencoded'}
-            )
+            with track_external("google"):
+                token_response = await client.post(
+                    settings.GOOGLE_TOKEN_URL,
+                    data=token_data,
+                    headers={'Content-Type': 'application/x-www-form-urlencoded'}
+                )
             
             if token_response.status_code != 200:
                 logging.error(f"Token exchange failed: {token_response.text}")
@@ -96,10 +100,11 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
         
         # Get user info
         async with httpx.AsyncClient() as client:
-            user_info_response = await client.get(
-                'https://www.googleapis.com/oauth2/v2/userinfo',
-                headers={'Authorization': f'Bearer {token["access_token"]}'}
-            )
+            with track_external("google"):
+                user_info_response = await client.get(
+                    settings.GOOGLE_USERINFO_URL,
+                    headers={'Authorization': f'Bearer {token["access_token"]}'}
+                )
             
             if user_info_response.status_code != 200:
                 logging.error(f"User info fetch failed: {user_info_response.text}")
@@ -119,14 +124,7 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
         logging.debug(f"Processing user with email: {email}")
 
         # Check if user exists
-        select_stmt = select(
-            tables.users.c.id,
-            tables.users.c.email,
-            tables.users.c.full_name
-        ).where(tables.users.c.email == email)
-        
-        result = await db.execute(select_stmt)
-        existing_user = result.fetchone()
+        existing_user = await find_user_by_email(email)
         
         logging.debug(f"Existing user found: {existing_user is not None}")
 
@@ -139,18 +137,14 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
         else:
             # Create new user
             logging.debug("Creating new user")
-            user_id = str(uuid.uuid4())
-            
             try:
-                insert_stmt = insert(tables.users).values(
-                    id=user_id,
+                new_user = await insert_user(
                     email=email,
                     full_name=name,
                     google_id=user_data.get("id"),  # Google returns 'id' not 'sub' for v2 API
                     is_active=True,
                 )
-                await db.execute(insert_stmt)
-                await db.commit()
+                user_id = str(new_user.id)
                 logging.debug(f"New user created with ID: {user_id}")
                 
                 user_email = email
@@ -158,7 +152,6 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
                 
             except Exception as db_error:
                 logging.error(f"Database error creating user: {str(db_error)}")
-                await db.rollback()
                 raise HTTPException(status_code=500, detail="Failed to create user")
 
         # Create JWT token
@@ -203,7 +196,7 @@ async def debug_endpoint(request: Request, db: AsyncSession = Depends(get_db)):
         db_result = db_test.fetchone()
         
         # Test OAuth config
-        oauth_configured = hasattr(oauth, 'google')
+        oauth_configured = hasattr(get_oauth(), 'google')
         
         return JSONResponse({
             "status": "debug_ok",
@@ -1,23 +1,39 @@
-from fastapi import APIRouter, Depends, status, Query, Request, HTTPException
+from fastapi import APIRouter, Depends, status, Query, Request, HTTPException, Response
+from typing import Literal, Optional
+from uuid import UUID
+from datetime import datetime, timezone
 from db.session import get_db
 from schemas.checkin import *
 from crud.insights import *
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.dependencies import get_current_user
+from core.jobs import job_queue, QueueFullError
+from utils.response import FastJSONResponse
+from utils.fields import parse_fields
 
 
 router = APIRouter(prefix="/checkin", tags=["journal-insights"])
 
 
+async def _run_insight_job(user_id: str) -> dict:
+    return await run_insight_job(UUID(user_id))
+
+
+job_queue.register("insights", _run_insight_job)
+
+
 @router.get("/journal/insights")
 async def get_journal_insights_route(
     request: Request,
+    engine: Literal["auto", "openai", "local"] = Query(
+        "auto", description="auto falls back to the local engine when OpenAI fails"
+    ),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     try:
         user_id = current_user["id"]
-        result = await generate_journal_insights(user_id, db)
+        result = await generate_journal_insights(user_id, db, engine=engine)
         return {"message": "Insights generated successfully.", "data": result}
     except HTTPException as e:
         raise e
@@ -28,6 +44,45 @@ async def get_journal_insights_route(
         )
 
 
+@router.post("/journal/insights/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_journal_insights_job(
+    current_user: dict = Depends(get_current_user),
+):
+    user_id = current_user["id"]
+    try:
+        job = await job_queue.submit(
+            kind="insights",
+            key=f"insights:{user_id}",
+            owner=str(user_id),
+            params={"user_id": str(user_id)},
+        )
+    except QueueFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Insight queue is full, try again shortly.",
+            headers={"Retry-After": "5"},
+        )
+
+    return {
+        "message": "Insight job queued.",
+        "data": {"job_id": job.id, "status": job.status},
+    }
+
+
+@router.get("/journal/insights/jobs/{job_id}")
+async def get_journal_insights_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to long-poll for completion"),
+    current_user: dict = Depends(get_current_user),
+):
+    job = await job_queue.get(job_id)
+    if not job or job.owner != str(current_user["id"]) or job.kind != "insights":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    job = await job_queue.wait(job, wait)
+    return {"message": f"Job {job.status}.", "data": job.to_dict()}
+
+
 @router.get("/journal/tags")
 async def get_journal_tags(
     request: Request,
@@ -57,10 +112,12 @@ async def search_journal_entries_route(
         user_id = current_user["id"]
         results = await search_journal_entries_by_keyword(user_id, keyword, db)
 
-        return {
-            "message": "Journal entries matching the keyword fetched successfully.",
-            "data": results,
-        }
+        return FastJSONResponse(
+            {
+                "message": "Journal entries matching the keyword fetched successfully.",
+                "data": results,
+            }
+        )
 
     except HTTPException as e:
         raise e
@@ -74,15 +131,50 @@ async def search_journal_entries_route(
 
 @router.get("/journal/calendar")
 async def get_journal_calendar_route(
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated subset of: {', '.join(CALENDAR_FIELDS)}"
+    ),
     user=Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     try:
-        calendar_data = await get_journal_calendar_data(user["id"], db)
-        return {
-            "message": "Journal calendar data fetched successfully.",
-            "data": calendar_data,
-        }
+        selected = parse_fields(fields, CALENDAR_FIELDS)
+        calendar_data = await get_journal_calendar_data(user["id"], db, fields=selected)
+        return FastJSONResponse(
+            {
+                "message": "Journal calendar data fetched successfully.",
+                "data": calendar_data,
+            }
+        )
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error: {str(e)}",
+        )
+
+
+@router.get("/journal/heatmap")
+async def get_journal_heatmap_route(
+    request: Request,
+    year: Optional[int] = Query(None, ge=1970, le=9998, description="Defaults to the current year"),
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        year = year or datetime.now(timezone.utc).year
+        heatmap = await get_year_heatmap(user["id"], year, db)
+        etag = f'"{year}-{heatmap["cursor"]}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return FastJSONResponse(
+            {
+                "message": "Journal heatmap fetched successfully.",
+                "data": heatmap,
+            },
+            headers={"ETag": etag},
+        )
     except HTTPException as e:
         raise e
     except Exception as e:
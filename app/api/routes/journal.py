@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.session import get_db
 from schemas.journal import *
 from crud.journal import *
 from core.dependencies import get_current_user
 from db.tables import Tables
-from typing import List
+from typing import List, Literal, Optional
 from uuid import UUID
+from utils.response import FastJSONResponse, model_response
+from utils.fields import parse_fields
 
 tables = Tables()
 
@@ -22,14 +24,31 @@ async def create_entry(
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    return await create_journal_entry(entry=entry, user_id=current_user.id, db=db)
+    row = await create_journal_entry(entry=entry, user_id=current_user.id, db=db)
+    return model_response(row, JournalEntryResponse, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/", response_model=List[JournalEntryResponse])
 async def list_entries(
-    db: AsyncSession = Depends(get_db), current_user=Depends(get_current_user)
+    view: Literal["full", "summary"] = Query(
+        "full", description="summary: no content, a short server-side preview instead"
+    ),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated subset of: {', '.join(JOURNAL_FIELDS)}"
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
 ):
-    return await get_journal_entries_by_user(user_id=current_user.id, db=db)
+    selected = parse_fields(fields, JOURNAL_FIELDS)
+    if selected is None and view == "summary":
+        selected = list(JOURNAL_SUMMARY_FIELDS)
+
+    rows = await get_journal_entries_by_user(
+        user_id=current_user.id, db=db, fields=selected
+    )
+    if selected:
+        return FastJSONResponse(rows)
+    return model_response(rows, JournalEntryResponse, many=True)
 
 
 @router.get("/stats", summary="Get journal statistics")
@@ -68,9 +87,10 @@ async def update_entry(
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    return await update_journal_entry_service(
+    row = await update_journal_entry_service(
         entry_id=entry_id, user_id=current_user.id, data=entry, db=db
     )
+    return model_response(row, JournalEntryResponse)
 
 
 @router.delete("/{entry_id}", status_code=200)
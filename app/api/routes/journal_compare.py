@@ -3,16 +3,14 @@ from datetime import date
 from typing import List
 from pydantic import BaseModel
 from sqlalchemy import select
-from collections import Counter
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.session import get_db
 from core.dependencies import get_current_user
 from db.tables import Tables
+from utils.stats import summarize_range_rows
 
 router = APIRouter()
 
-MOOD_SCORES = {"bad": 1, "okay": 2, "good": 3, "great": 4}
-
 
 class CompareDates(BaseModel):
     start_range_1: date
@@ -23,17 +21,6 @@ class CompareDates(BaseModel):
 
 
 
-def parse_tags(tag_data) -> List[str]:
-    if isinstance(tag_data, list):
-        # Already a list, just strip whitespace and filter out empties
-        return [tag.strip() for tag in tag_data if isinstance(tag, str) and tag.strip()]
-    elif isinstance(tag_data, str):
-        # Comma-separated string
-        return [tag.strip() for tag in tag_data.split(",") if tag.strip()]
-    return []
-
-
-
 # ✅ Pass db session into the function
 async def analyze_range(
     table, user_id: int, start_date: date, end_date: date, db: AsyncSession
@@ -57,34 +44,7 @@ async def analyze_range(
                 "common_tags": [],
             }
 
-        focus_scores = []
-        mood_scores = []
-        all_tags_flat = []
-
-        for row in rows:
-            if row.focus_percent is not None:
-                focus_scores.append(row.focus_percent)
-
-            mood = row.mood
-            if mood in MOOD_SCORES:
-                mood_scores.append(MOOD_SCORES[mood])
-
-            tags = row.tags
-            if tags:
-                all_tags_flat.extend(parse_tags(tags))
-
-        most_common = [tag for tag, _ in Counter(all_tags_flat).most_common(3)]
-
-        return {
-            "average_focus": (
-                round(sum(focus_scores) / len(focus_scores)) if focus_scores else 0
-            ),
-            "average_mood": (
-                round(sum(mood_scores) / len(mood_scores), 1) if mood_scores else 0
-            ),
-            "entry_count": len(rows),
-            "common_tags": most_common,
-        }
+        return summarize_range_rows(rows)
 
     except Exception as e:
         raise HTTPException(
@@ -2,12 +2,13 @@ from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import JSONResponse, RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, insert
-from core.oauth import oauth
+from core.oauth import get_oauth
 from db.session import get_db
 from core.security import create_access_token
+from core.metrics import track_external
+from crud.users import find_user_by_email, insert_user
 from db.tables import Tables
 from uuid import uuid4
-import httpx
 
 router = APIRouter(prefix="/auth/linkedin", tags=["Auth"])
 
@@ -31,7 +32,7 @@ async def linkedin_login(request: Request):
         request.session["linkedin_nonce"] = nonce
         
         # Let Authlib handle the state parameter but pass our nonce
-        return await oauth.linkedin.authorize_redirect(
+        return await get_oauth().linkedin.authorize_redirect(
             request, 
             redirect_uri,
             nonce=nonce
@@ -41,6 +42,8 @@ async def linkedin_login(request: Request):
 
 @router.get("/callback", name="linkedin_callback")
 async def linkedin_callback(request: Request, db: AsyncSession = Depends(get_db)):
+    import httpx  # ~0.2s to import; only OAuth callbacks need it
+
     try:
         print(f"DEBUG: Query params: {dict(request.query_params)}")
         print(f"DEBUG: Session keys: {list(request.session.keys())}")
@@ -69,11 +72,12 @@ async def linkedin_callback(request: Request, db: AsyncSession = Depends(get_db)
         
         async with httpx.AsyncClient() as client:
             # Get access token
-            token_response = await client.post(
-                "https://www.linkedin.com/oauth/v2/accessToken",
-                data=token_data,
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
+            with track_external("linkedin"):
+                token_response = await client.post(
+                    settings.LINKEDIN_TOKEN_URL,
+                    data=token_data,
+                    headers={"Content-Type": "application/x-www-form-urlencoded"}
+                )
             
             if token_response.status_code != 200:
                 raise HTTPException(status_code=400, detail=f"Token exchange failed: {token_response.text}")
@@ -84,10 +88,11 @@ async def linkedin_callback(request: Request, db: AsyncSession = Depends(get_db)
             print(f"DEBUG: Token received: {bool(access_token)}")
             
             # Get user info directly from userinfo endpoint
-            user_response = await client.get(
-                "https://api.linkedin.com/v2/userinfo",
-                headers={"Authorization": f"Bearer {access_token}"}
-            )
+            with track_external("linkedin"):
+                user_response = await client.get(
+                    settings.LINKEDIN_USERINFO_URL,
+                    headers={"Authorization": f"Bearer {access_token}"}
+                )
             
             if user_response.status_code != 200:
                 raise HTTPException(status_code=400, detail=f"User info failed: {user_response.text}")
@@ -103,27 +108,16 @@ async def linkedin_callback(request: Request, db: AsyncSession = Depends(get_db)
             raise HTTPException(status_code=400, detail="Email not provided by LinkedIn")
 
         # Check if user exists
-        result = await db.execute(
-            select(tables.users).where(tables.users.c.email == email)
-        )
-        user_row = result.fetchone()
+        user_row = await find_user_by_email(email)
 
         if not user_row:
             # Create new user
-            stmt = (
-                insert(tables.users)
-                .values(
-                    id=str(uuid4()),
-                    email=email,
-                    full_name=name,
-                    linkedin_id=linkedin_id,
-                    is_active=True,
-                )
-                .returning(tables.users)
+            user_row = await insert_user(
+                email=email,
+                full_name=name,
+                linkedin_id=linkedin_id,
+                is_active=True,
             )
-            result = await db.execute(stmt)
-            await db.commit()
-            user_row = result.fetchone()
 
         # Clean up session data
         request.session.pop("linkedin_nonce", None)
@@ -0,0 +1,124 @@
+import gzip
+from typing import Literal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.compression import accepts
+from core.dependencies import get_current_user
+from core.jobs import QueueFullError, job_queue
+from crud.reports import get_stored_report, parse_period, run_report_job
+from crud.sync import get_user_cursor
+from db.session import get_db
+from utils.response import FastJSONResponse
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+ReportKind = Literal["year", "quarter", "month"]
+
+
+async def _run_report_job(user_id: str, kind: str, period: str) -> dict:
+    return await run_report_job(UUID(user_id), kind, period)
+
+
+job_queue.register("report", _run_report_job)
+
+
+async def _submit(user_id, kind: str, period: str):
+    return await job_queue.submit(
+        kind="report",
+        key=f"report:{user_id}:{kind}:{period}",
+        owner=str(user_id),
+        params={"user_id": str(user_id), "kind": kind, "period": period},
+    )
+
+
+# Declared before /{kind}/{period}, which would otherwise match /jobs/<id>
+@router.get("/jobs/{job_id}")
+async def get_report_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to long-poll for completion"),
+    current_user: dict = Depends(get_current_user),
+):
+    job = await job_queue.get(job_id)
+    if not job or job.owner != str(current_user["id"]) or job.kind != "report":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    job = await job_queue.wait(job, wait)
+    return {"message": f"Job {job.status}.", "data": job.to_dict()}
+
+
+@router.get("/{kind}/{period}")
+async def get_report(
+    kind: ReportKind,
+    period: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    The stored report for `period` (2025, 2025-Q3, 2025-07), served as built.
+    If there is none yet, its generation is queued and 202 returned with the
+    job. If data has changed since it was built, it is served anyway
+    (X-Report-Status: stale) and an incremental refresh is queued.
+    """
+    user_id = current_user["id"]
+    start, _ = parse_period(kind, period)
+    stored = await get_stored_report(user_id, kind, start, db)
+
+    if stored is None:
+        try:
+            job = await _submit(user_id, kind, period)
+        except QueueFullError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Report queue is full, try again shortly.",
+                headers={"Retry-After": "5"},
+            )
+        return FastJSONResponse(
+            {"message": "Report is being generated.", "data": {"job_id": job.id, "status": job.status}},
+            status_code=status.HTTP_202_ACCEPTED,
+        )
+
+    report_status = "fresh"
+    if await get_user_cursor(user_id, db) != stored.cursor:
+        report_status = "stale"
+        try:
+            await _submit(user_id, kind, period)
+        except QueueFullError:
+            pass  # the stale copy is still served; the next view retries
+
+    headers = {
+        "ETag": f'"{kind}-{period}-{stored.cursor}"',
+        "X-Report-Status": report_status,
+        "Vary": "Accept-Encoding",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if accepts(request.headers.get("accept-encoding", ""), "gzip"):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=stored.body, media_type="application/json", headers=headers)
+
+    return Response(
+        content=gzip.decompress(stored.body), media_type="application/json", headers=headers
+    )
+
+
+@router.post("/{kind}/{period}/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_report_job(
+    kind: ReportKind,
+    period: str,
+    current_user: dict = Depends(get_current_user),
+):
+    parse_period(kind, period)
+    try:
+        job = await _submit(current_user["id"], kind, period)
+    except QueueFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Report queue is full, try again shortly.",
+            headers={"Retry-After": "5"},
+        )
+    return {"message": "Report job queued.", "data": {"job_id": job.id, "status": job.status}}
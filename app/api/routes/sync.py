@@ -0,0 +1,30 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.dependencies import get_current_user
+from crud.sync import get_changes
+from db.session import get_db
+from utils.response import FastJSONResponse
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", summary="Journal entries, check-ins and goals changed or deleted since a cursor")
+async def sync_changes(
+    since: int = Query(0, ge=0, description="`cursor` from the previous response; 0 for a full sync"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.SYNC_MAX_PAGE_SIZE),
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    data = await get_changes(user["id"], since, limit or settings.SYNC_PAGE_SIZE, db)
+
+    # Keep calling with the returned cursor while has_more is true
+    return FastJSONResponse(
+        {
+            "message": "Full resync required." if data["reset"] else "Changes retrieved successfully.",
+            "data": data,
+        }
+    )
@@ -0,0 +1,78 @@
+"""
+Tiny timing harness shared by the benchmark modules.
+
+Results are printed as a table and can be saved / compared as JSON so the
+same benchmark can be diffed across commits:
+
+    python -m benchmarks.serialization --save before.json
+    python -m benchmarks.serialization --compare before.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def bench(fn: Callable[[], object], number: int = 1, repeat: int = 7) -> Dict[str, float]:
+    """Run `fn` `number` times per round for `repeat` rounds; seconds per call."""
+    fn()  # warm-up: caches, lazy imports
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) / number)
+    return {
+        "min": min(rounds),
+        "median": statistics.median(rounds),
+        "max": max(rounds),
+    }
+
+
+def parse_args(
+    description: str,
+    add_arguments: Optional[Callable[[argparse.ArgumentParser], None]] = None,
+) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=description, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against a saved JSON file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="allowed median slowdown vs --compare before failing (0.15 = 15%%)",
+    )
+    if add_arguments:
+        add_arguments(parser)
+    return parser.parse_args()
+
+
+def report(results: Dict[str, Dict[str, float]], args: argparse.Namespace) -> None:
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}}  {'median':>12}  {'min':>12}  {'vs base':>8}")
+    regressions: List[str] = []
+    for name, stats in results.items():
+        line = f"{name:<{width}}  {stats['median'] * 1e3:>10.3f}ms  {stats['min'] * 1e3:>10.3f}ms"
+        if name in baseline:
+            ratio = stats["median"] / baseline[name]["median"]
+            line += f"  {ratio:>7.2f}x"
+            if ratio > 1 + args.tolerance:
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if regressions:
+        print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
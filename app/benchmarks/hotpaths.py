@@ -0,0 +1,151 @@
+"""
+CPU hot paths that run per request, timed on synthetic rows without a
+database: streak computation, the compare endpoint's range summary, tag
+parsing / counting, insight response parsing and VADER sentiment scoring.
+
+    python -m benchmarks.hotpaths [--sizes 10000 100000 1000000]
+                                  [--save f.json] [--compare f.json]
+
+Names carry the row count, so a saved run is only compared against runs
+with the same --sizes. Sentiment scoring is ~50us per text, so it runs on
+the smallest size only.
+"""
+import random
+from collections import namedtuple
+from datetime import date, timedelta
+from typing import List
+
+from benchmarks.harness import bench, parse_args, report
+from crud.insights import parse_insight_response
+from utils.sentiment import get_sentiment_score
+from utils.stats import compute_streaks, count_tags, parse_tags, summarize_range_rows
+
+MOODS = ["bad", "okay", "good", "great", "happy", None]
+TAGS = [
+    "work", "deep-work", "coding", "meetings", "gym", "reading", "family",
+    "tired", "travel", "focus", " Walk ", "music", "friends", "study",
+]
+TAG_WEIGHTS = [1 / (rank + 1) for rank in range(len(TAGS))]
+TEXTS = [
+    "Worked through the backlog and closed a few tickets, felt good about it.",
+    "Felt scattered and anxious in the morning, better after a long walk.",
+    "Terrible sleep, hard to concentrate, meetings drained the afternoon.",
+    "Great focus after switching off notifications. Proud of today!",
+]
+INSIGHT_RESPONSE = (
+    "1. Mood: Mostly steady with a few stressful days around deadlines.\n"
+    "2. Focus score: 72\n"
+    "3. Keywords: deadline, parser, walk, meetings, family"
+)
+
+Row = namedtuple("Row", "focus_percent mood tags")
+
+
+def checkin_dates(n: int, rng: random.Random) -> List[date]:
+    # Mostly consecutive days with occasional gaps, like a habitual user
+    day = date(1000, 1, 1)
+    dates = []
+    for _ in range(n):
+        dates.append(day)
+        day += timedelta(days=1 if rng.random() < 0.9 else rng.randint(2, 5))
+    return dates
+
+
+def range_rows(n: int, rng: random.Random) -> List[Row]:
+    return [
+        Row(
+            rng.randint(0, 100) if rng.random() < 0.95 else None,
+            rng.choice(MOODS),
+            rng.choices(TAGS, weights=TAG_WEIGHTS, k=rng.randint(0, 4)),
+        )
+        for _ in range(n)
+    ]
+
+
+def legacy_streaks(dates: List[date]):
+    # The loops get_user_streak ran before utils.stats.compute_streaks
+    longest_streak = streak = 1
+    for i in range(1, len(dates)):
+        if dates[i] == dates[i - 1] + timedelta(days=1):
+            streak += 1
+        else:
+            longest_streak = max(longest_streak, streak)
+            streak = 1
+    longest_streak = max(longest_streak, streak)
+    current_streak = 0
+    for i in range(len(dates) - 1, -1, -1):
+        if dates[i] == dates[-1] - timedelta(days=current_streak):
+            current_streak += 1
+        else:
+            break
+    return current_streak, longest_streak
+
+
+def legacy_count_tags(tags: List[str]):
+    tag_count = {}
+    for tag in tags:
+        tag_count[tag] = tag_count.get(tag, 0) + 1
+    return sorted(tag_count.items(), key=lambda x: x[1], reverse=True)
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="row counts"
+    )
+
+
+def label(n: int) -> str:
+    return f"{n // 1_000_000}M" if n >= 1_000_000 else f"{n // 1000}k"
+
+
+def main():
+    args = parse_args(__doc__, add_arguments)
+    rng = random.Random(42)
+    results = {}
+
+    for n in args.sizes:
+        size = label(n)
+        repeat = 3 if n >= 1_000_000 else 7
+        dates = checkin_dates(n, rng)
+        rows = range_rows(n, rng)
+        flat_tags = [tag for row in rows for tag in row.tags]
+        raw_tags = [", ".join(row.tags) for row in rows]
+
+        assert compute_streaks(dates) == legacy_streaks(dates)
+        assert count_tags(flat_tags) == legacy_count_tags(flat_tags)
+
+        results[f"streaks/legacy {size}"] = bench(lambda: legacy_streaks(dates), repeat=repeat)
+        results[f"streaks/compute_streaks {size}"] = bench(
+            lambda: compute_streaks(dates), repeat=repeat
+        )
+        results[f"compare/summarize_range_rows {size}"] = bench(
+            lambda: summarize_range_rows(rows), repeat=repeat
+        )
+        results[f"tags/parse_tags str {size}"] = bench(
+            lambda: [parse_tags(tags) for tags in raw_tags], repeat=repeat
+        )
+        results[f"tags/legacy count {size}"] = bench(
+            lambda: legacy_count_tags(flat_tags), repeat=repeat
+        )
+        results[f"tags/count_tags {size}"] = bench(lambda: count_tags(flat_tags), repeat=repeat)
+        results[f"tags/count_tags normalized {size}"] = bench(
+            lambda: count_tags(flat_tags, normalize=True), repeat=repeat
+        )
+        results[f"insights/parse_insight_response x{size}"] = bench(
+            lambda: [parse_insight_response(INSIGHT_RESPONSE) for _ in range(n)], repeat=repeat
+        )
+
+    n = min(args.sizes)
+    texts = [rng.choice(TEXTS) for _ in range(n)]
+    try:
+        results[f"sentiment/get_sentiment_score x{label(n)}"] = bench(
+            lambda: [get_sentiment_score(text) for text in texts], repeat=3
+        )
+    except LookupError:
+        print("Skipping sentiment: NLTK vader_lexicon is not installed")
+
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+End-to-end load test against a running server.
+
+Virtual users log in as the accounts created by scripts/seed_data.py and
+loop over weighted scenarios: journal CRUD, check-in reads, analytics,
+compare and search (plus OAuth logins and LLM insights when enabled). The
+report gives throughput and p50/p95/p99 per endpoint; --save/--compare
+store and diff a baseline and exit 1 on a regression.
+
+Typical run, each in its own shell:
+
+    python -m scripts.seed_data --users 200 --years 3 --reset
+    python scripts/fake_llm_server.py --latency 0.3
+    python scripts/fake_oauth_server.py
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 \\
+    GOOGLE_TOKEN_URL=http://127.0.0.1:8090/token \\
+    GOOGLE_USERINFO_URL=http://127.0.0.1:8090/userinfo uvicorn main:app
+    python -m benchmarks.load --vus 50 --duration 60 --oauth --llm --save base.json
+    python -m benchmarks.load --vus 50 --duration 60 --oauth --llm --compare base.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+
+from scripts.seed_data import EMAIL_PATTERN
+
+SEARCH_WORDS = ["focus", "walk", "deadline", "family", "parser", "meetings", "calm"]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.recording = False
+
+    async def call(
+        self, client: httpx.AsyncClient, label: str, method: str, url: str, ok=(200,), **kwargs
+    ) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        elapsed = time.perf_counter() - started
+        if self.recording:
+            self.latencies[label].append(elapsed)
+            if response is None or response.status_code not in ok:
+                self.errors[label] += 1
+        return response
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank; fine at the sample sizes a load run produces
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, rec: Recorder, n: int, args: argparse.Namespace):
+        self.client = client
+        self.rec = rec
+        self.n = n
+        self.args = args
+        self.rng = random.Random(n)
+        self.headers = {}
+
+    async def login(self) -> bool:
+        response = await self.rec.call(
+            self.client,
+            "POST /auth/login",
+            "POST",
+            "/auth/login",
+            json={"email": EMAIL_PATTERN.format(self.n % self.args.users), "password": self.args.password},
+        )
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def get(self, label: str, url: str, **kwargs):
+        return await self.rec.call(self.client, label, "GET", url, headers=self.headers, **kwargs)
+
+    # --- scenarios ---
+
+    async def auth(self):
+        await self.login()
+        await self.get("GET /auth/me", "/auth/me")
+
+    async def oauth(self):
+        # fake_oauth_server maps the code to a stable user
+        await self.rec.call(
+            self.client,
+            "GET /auth/google/callback",
+            "GET",
+            "/auth/google/callback",
+            ok=(302, 307),
+            params={"code": f"vu-{self.n}"},
+        )
+
+    async def journal_crud(self):
+        response = await self.rec.call(
+            self.client,
+            "POST /journal/",
+            "POST",
+            "/journal/",
+            ok=(201,),
+            headers=self.headers,
+            json={
+                "title": "Load test entry",
+                "content": "Deep work in the morning, meetings after lunch. " * 5,
+                "mood": self.rng.choice(["okay", "good", "great"]),
+                "focus_percent": self.rng.randint(0, 100),
+                "tags": ["loadtest", "work"],
+            },
+        )
+        if response is None or response.status_code != 201:
+            return
+        entry_id = response.json()["id"]
+        await self.get("GET /journal/{id}", f"/journal/{entry_id}")
+        await self.rec.call(
+            self.client,
+            "PUT /journal/{id}",
+            "PUT",
+            f"/journal/{entry_id}",
+            headers=self.headers,
+            json={
+                "title": "Load test entry (edited)",
+                "content": "Edited.",
+                "mood": "good",
+                "focus_percent": 50,
+                "is_favorite": True,
+                "tags": ["loadtest"],
+            },
+        )
+        await self.rec.call(
+            self.client, "DELETE /journal/{id}", "DELETE", f"/journal/{entry_id}", headers=self.headers
+        )
+
+    async def journal_reads(self):
+        await self.get("GET /journal/", "/journal/")
+        await self.get("GET /journal/?view=summary", "/journal/", params={"view": "summary"})
+        await self.get("GET /checkin/journal/calendar", "/checkin/journal/calendar")
+
+    async def checkins(self):
+        since = date.today() - timedelta(days=self.rng.choice([7, 30, 90]))
+        await self.get("GET /checkin/checkins", "/checkin/checkins", params={"start_date": since.isoformat()})
+        await self.get("GET /checkin/checkin/today", "/checkin/checkin/today")
+        await self.get("GET /checkin/checkin/history", "/checkin/checkin/history", params={"range": 14})
+        await self.get("GET /checkin/streak", "/checkin/streak")
+
+    async def analytics(self):
+        await self.get("GET /dashboard", "/dashboard")
+        await self.get("GET /weekly-summary", "/weekly-summary")
+        await self.get("GET /monthly-summary", "/monthly-summary")
+        await self.get("GET /tag-summary", "/tag-summary")
+        await self.get("GET /journal/stats", "/journal/stats")
+        await self.get("GET /checkin/checkin/stats", "/checkin/checkin/stats")
+
+    async def compare(self):
+        today = date.today()
+        await self.rec.call(
+            self.client,
+            "POST /journal/compare",
+            "POST",
+            "/journal/compare",
+            headers=self.headers,
+            json={
+                "start_range_1": (today - timedelta(days=60)).isoformat(),
+                "end_range_1": (today - timedelta(days=31)).isoformat(),
+                "start_range_2": (today - timedelta(days=30)).isoformat(),
+                "end_range_2": today.isoformat(),
+            },
+        )
+
+    async def search(self):
+        await self.get(
+            "GET /checkin/journal/search",
+            "/checkin/journal/search",
+            params={"keyword": self.rng.choice(SEARCH_WORDS)},
+        )
+        await self.get("GET /checkin/journal/tags", "/checkin/journal/tags")
+
+    async def insights(self):
+        await self.get(
+            "GET /checkin/journal/insights", "/checkin/journal/insights", params={"engine": "openai"}
+        )
+
+    async def run(self, stop_at: float):
+        if not await self.login():
+            return
+        scenarios = [
+            (self.journal_crud, 3),
+            (self.journal_reads, 4),
+            (self.checkins, 5),
+            (self.analytics, 3),
+            (self.compare, 2),
+            (self.search, 2),
+            (self.auth, 1),
+        ]
+        if self.args.oauth:
+            scenarios.append((self.oauth, 1))
+        if self.args.llm:
+            scenarios.append((self.insights, 1))
+        funcs, weights = zip(*scenarios)
+
+        while time.monotonic() < stop_at:
+            await self.rng.choices(funcs, weights=weights)[0]()
+            if self.args.think:
+                await asyncio.sleep(self.rng.uniform(0, 2 * self.args.think))
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=args.vus, max_keepalive_connections=args.vus)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        loop_started = time.monotonic()
+        stop_at = loop_started + args.warmup + args.duration
+        users = [VirtualUser(client, rec, n, args) for n in range(args.vus)]
+        tasks = [asyncio.create_task(vu.run(stop_at)) for vu in users]
+
+        await asyncio.sleep(args.warmup)
+        rec.recording = True
+        measured_from = time.monotonic()
+        await asyncio.gather(*tasks)
+        measured = time.monotonic() - measured_from
+
+    results = {}
+    for label, values in sorted(rec.latencies.items()):
+        values.sort()
+        results[label] = {
+            "requests": len(values),
+            "errors": rec.errors[label],
+            "rps": len(values) / measured,
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+        }
+    return results
+
+
+def report(results: dict, args: argparse.Namespace) -> int:
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    width = max([len(label) for label in results] + [8])
+    print(
+        f"{'endpoint':<{width}}  {'reqs':>7}  {'err':>5}  {'req/s':>8}  "
+        f"{'p50':>8}  {'p95':>8}  {'p99':>8}  {'p95 vs base':>11}"
+    )
+    regressions = []
+    for label, r in results.items():
+        line = (
+            f"{label:<{width}}  {r['requests']:>7}  {r['errors']:>5}  {r['rps']:>8.1f}  "
+            f"{r['p50'] * 1e3:>6.1f}ms  {r['p95'] * 1e3:>6.1f}ms  {r['p99'] * 1e3:>6.1f}ms"
+        )
+        base = baseline.get(label)
+        if base:
+            ratio = r["p95"] / base["p95"] if base["p95"] else 1.0
+            line += f"  {ratio:>10.2f}x"
+            if ratio > 1 + args.tolerance or r["rps"] < base["rps"] * (1 - args.tolerance):
+                regressions.append(label)
+        print(line)
+
+    total = sum(r["requests"] for r in results.values())
+    errors = sum(r["errors"] for r in results.values())
+    print(f"\n{total} requests, {errors} errors, {total / args.duration:.1f} req/s overall")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.max_error_rate is not None and total and errors / total > args.max_error_rate:
+        print(f"Error rate {errors / total:.2%} above {args.max_error_rate:.2%}")
+        return 1
+    if regressions:
+        print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--vus", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--users", type=int, default=100, help="seeded accounts to spread VUs over")
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds first")
+    parser.add_argument("--think", type=float, default=0.0, help="mean think time between scenarios")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--oauth", action="store_true", help="include Google logins (fake_oauth_server)")
+    parser.add_argument("--llm", action="store_true", help="include OpenAI insights (fake_llm_server)")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against a saved JSON file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed p95 increase / throughput drop per endpoint (0.2 = 20%%)",
+    )
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    results = asyncio.run(run_load(args))
+    sys.exit(report(results, args))
+
+
+if __name__ == "__main__":
+    main()
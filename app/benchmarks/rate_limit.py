@@ -0,0 +1,75 @@
+"""
+Per-request cost of the rate limiter: a full RateLimitMiddleware pass
+(route class, bearer token, bucket update, headers) around a no-op app,
+per backend. Point --redis-url at any Redis-protocol server to include the
+shared backend.
+
+    python -m benchmarks.rate_limit [--redis-url redis://localhost:6379/15]
+"""
+import asyncio
+import uuid
+from datetime import timedelta
+
+from benchmarks.harness import bench, parse_args, report
+from core.rate_limit import MemoryBackend, RateLimitMiddleware, RedisBackend
+from core.security import create_access_token
+
+REQUESTS = 1000
+USERS = 100
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def send(message):
+    pass
+
+
+async def receive():
+    return {"type": "http.request"}
+
+
+def scopes():
+    tokens = [
+        create_access_token({"sub": str(uuid.uuid4())}, timedelta(hours=1)) for _ in range(USERS)
+    ]
+    return [
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/journal/",
+            "client": ("127.0.0.1", 50000),
+            "headers": [(b"authorization", f"Bearer {tokens[i % USERS]}".encode())],
+        }
+        for i in range(REQUESTS)
+    ]
+
+
+def main():
+    args = parse_args(
+        __doc__, lambda p: p.add_argument("--redis-url", help="also benchmark the redis backend")
+    )
+    requests = scopes()
+    backends = {"memory": MemoryBackend()}
+    if args.redis_url:
+        backends["redis"] = RedisBackend(args.redis_url)
+
+    loop = asyncio.new_event_loop()
+    results = {}
+    for name, backend in backends.items():
+        middleware = RateLimitMiddleware(noop_app, backend=backend)
+
+        async def run():
+            for scope in requests:
+                await middleware(scope, receive, send)
+
+        results[f"{name}: {REQUESTS} requests"] = bench(
+            lambda: loop.run_until_complete(run()), repeat=5
+        )
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
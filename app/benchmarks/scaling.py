@@ -0,0 +1,92 @@
+"""
+Throughput scaling from 1 to N workers under the production server.
+
+For each worker count this starts `gunicorn main:app` (gunicorn.conf.py)
+with WEB_CONCURRENCY set, waits until it answers, drives it with the
+benchmarks.load mix and records overall throughput and p95/p99 latency.
+
+    python -m scripts.seed_data --users 200 --years 3 --reset
+    python -m benchmarks.scaling --workers 1 2 4 8 --vus 64 --duration 60 --save scaling.json
+
+Run the load generator on a different machine (or pin it with taskset to
+cores the server does not use), otherwise it competes with the workers it
+is measuring. Keep DB_CONNECTION_BUDGET and Postgres fixed across the run
+so only the worker count changes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import time
+
+import httpx
+
+from benchmarks.load import build_parser, run_load
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_until_ready(base_url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/openapi.json", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become ready in {timeout:.0f}s")
+
+
+def run_with_workers(workers: int, port: int, load_args: argparse.Namespace) -> dict:
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port))
+    server = subprocess.Popen(["gunicorn", "main:app"], cwd=APP_DIR, env=env)
+    try:
+        wait_until_ready(load_args.base_url)
+        results = asyncio.run(run_load(load_args))
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    requests = sum(r["requests"] for r in results.values())
+    errors = sum(r["errors"] for r in results.values())
+    # Request-weighted p95/p99 across endpoints
+    p95 = sum(r["p95"] * r["requests"] for r in results.values()) / max(requests, 1)
+    p99 = sum(r["p99"] * r["requests"] for r in results.values()) / max(requests, 1)
+    return {
+        "workers": workers,
+        "rps": requests / load_args.duration,
+        "errors": errors,
+        "p95": p95,
+        "p99": p99,
+    }
+
+
+def main():
+    parser = build_parser()
+    parser.description = __doc__
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    args.base_url = f"http://127.0.0.1:{args.port}"
+
+    rows = [run_with_workers(workers, args.port, args) for workers in args.workers]
+
+    base = rows[0]["rps"] / rows[0]["workers"] if rows[0]["rps"] else 0
+    print(f"{'workers':>7}  {'req/s':>9}  {'speedup':>7}  {'efficiency':>10}  {'p95':>8}  {'p99':>8}  {'errors':>6}")
+    for row in rows:
+        speedup = row["rps"] / rows[0]["rps"] if rows[0]["rps"] else 0
+        efficiency = row["rps"] / (base * row["workers"]) if base else 0
+        print(
+            f"{row['workers']:>7}  {row['rps']:>9.1f}  {speedup:>6.2f}x  {efficiency:>9.0%}  "
+            f"{row['p95'] * 1e3:>6.1f}ms  {row['p99'] * 1e3:>6.1f}ms  {row['errors']:>6}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Serialization cost per 1k rows: FastAPI's response_model path
+(validate -> serialize -> jsonable_encoder -> json.dumps) versus
+utils.response (TypeAdapter validate + pydantic-core dump_json) and
+FastJSONResponse (orjson) for hand-built dicts.
+
+    python -m benchmarks.serialization [--save f.json] [--compare f.json]
+"""
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from benchmarks.harness import bench, parse_args, report
+from schemas.checkin import CheckinOut
+from schemas.journal import JournalEntryResponse
+from utils.response import FastJSONResponse, model_response
+
+ROWS = 1000
+MOODS = ["bad", "okay", "good", "great"]
+TAGS = ["work", "deep-work", "gym", "reading", "family", "tired", "coding", "travel"]
+
+
+def journal_rows(n: int) -> List[dict]:
+    start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    user_id = uuid.uuid4()
+    return [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "title": f"Entry {i}",
+            "content": "Worked on the parser, then a long walk. " * random.randint(5, 40),
+            "mood": random.choice(MOODS),
+            "focus_percent": random.randint(0, 100),
+            "is_favorite": i % 7 == 0,
+            "tags": random.sample(TAGS, 3),
+            "created_at": start + timedelta(hours=i * 9),
+        }
+        for i in range(n)
+    ]
+
+
+def checkin_rows(n: int) -> List[dict]:
+    start = date(2022, 1, 1)
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "date": start + timedelta(days=i),
+            "mood": random.choice(MOODS),
+            "focus_percent": random.randint(0, 100),
+            "tags": random.sample(TAGS, 2),
+            "note": "Slept ok, focused morning." if i % 3 else None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(n)
+    ]
+
+
+def run_sync(coro):
+    # serialize_response is async but never suspends when is_coroutine=True
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("serialize_response awaited unexpectedly")
+
+
+def fastapi_path(field, rows):
+    content = run_sync(
+        serialize_response(field=field, response_content=rows, is_coroutine=True)
+    )
+    return JSONResponse(content).body
+
+
+def main():
+    args = parse_args(__doc__)
+    random.seed(42)
+    journals, checkins = journal_rows(ROWS), checkin_rows(ROWS)
+    journal_field = create_response_field("journal", List[JournalEntryResponse])
+    checkin_field = create_response_field("checkin", List[CheckinOut])
+    calendar = {"message": "ok", "data": checkins}
+
+    results = {
+        "journal_list/fastapi_response_model": bench(
+            lambda: fastapi_path(journal_field, journals), number=5
+        ),
+        "journal_list/model_response": bench(
+            lambda: model_response(journals, JournalEntryResponse, many=True).body, number=5
+        ),
+        "checkin_list/fastapi_response_model": bench(
+            lambda: fastapi_path(checkin_field, checkins), number=5
+        ),
+        "checkin_list/model_response": bench(
+            lambda: model_response(checkins, CheckinOut, many=True).body, number=5
+        ),
+        "dict_payload/jsonable_encoder+json": bench(
+            lambda: JSONResponse(jsonable_encoder(calendar)).body, number=5
+        ),
+        "dict_payload/FastJSONResponse": bench(
+            lambda: FastJSONResponse(calendar).body, number=5
+        ),
+    }
+    print(f"Per {ROWS} rows:")
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
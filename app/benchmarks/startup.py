@@ -0,0 +1,116 @@
+"""
+Cold-start cost: `import main` in a fresh interpreter and, with --lifespan,
+the app's startup (migrations, reflection, pool) against the configured
+database. Also fails if a lazily imported SDK leaks back into `import main`.
+
+    python -m benchmarks.startup [--profile] [--lifespan]
+                                 [--save f.json] [--compare f.json]
+
+--profile prints the slowest imports from `python -X importtime`.
+"""
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks.harness import parse_args, report
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must stay out of `import main`; see utils/llm.py, utils/sentiment.py,
+# core/oauth.py, core/security.py and the OAuth callbacks
+LAZY_MODULES = ("openai", "nltk", "authlib", "passlib", "httpx")
+
+IMPORT_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+leaked = [m for m in {lazy!r} if m in sys.modules]
+print(elapsed, ",".join(leaked))
+"""
+
+LIFESPAN_SCRIPT = """
+import asyncio, time
+import main
+
+async def start():
+    started = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter() - started
+
+print(asyncio.run(start()))
+"""
+
+
+def _run(script: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    return {"min": min(samples), "median": statistics.median(samples), "max": max(samples)}
+
+
+def import_profile(top: int = 15):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), int(own), name.strip()))
+    rows.sort(reverse=True)
+    print(f"{'cumulative':>12}  {'self':>10}  module")
+    for cumulative, own, name in rows[:top]:
+        print(f"{cumulative / 1e3:>10.1f}ms  {own / 1e3:>8.1f}ms  {name}")
+    print()
+
+
+def add_arguments(parser):
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--profile", action="store_true", help="print the slowest imports")
+    parser.add_argument(
+        "--lifespan", action="store_true", help="also time app startup (needs the database)"
+    )
+
+
+def main():
+    args = parse_args(__doc__, add_arguments)
+    if args.profile:
+        import_profile()
+
+    samples, leaked = [], set()
+    for _ in range(args.repeat):
+        elapsed, modules = _run(IMPORT_SCRIPT.format(lazy=LAZY_MODULES)).partition(" ")[::2]
+        samples.append(float(elapsed))
+        leaked.update(filter(None, modules.split(",")))
+    results = {"import main": _stats(samples)}
+
+    if args.lifespan:
+        results["lifespan startup"] = _stats(
+            [float(_run(LIFESPAN_SCRIPT)) for _ in range(args.repeat)]
+        )
+
+    if leaked:
+        print(f"Imported eagerly by `import main`: {', '.join(sorted(leaked))}")
+    report(results, args)
+    if leaked:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# core/admission.py
+"""
+Admission control: bounded concurrency per route class.
+
+Each class (see core.route_classes) has its own gate of ADMISSION_LIMITS
+(concurrency, max queued, queue timeout seconds). A request runs when its
+class has a free slot, otherwise it waits in that class's queue. When the
+queue is full, or the wait exceeds the timeout, it is shed with a fast 503
+and Retry-After instead of joining an ever-growing backlog, so a burst of
+analytics scans or LLM calls cannot make cheap CRUD requests slow.
+
+Gates are per worker process. Their concurrency is ADMISSION_LIMITS scaled
+down to what the worker's DB pool can serve (core.server.admission_limits),
+so the gate fills before the pool does.
+"""
+import asyncio
+import math
+import time
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.route_classes import EXEMPT_PATHS, classify_route
+from core.server import admission_limits
+from utils.response import FastJSONResponse
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for an admission slot",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Admitted requests in progress",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests shed by admission control", ["route_class", "reason"]
+)
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds",
+    "Time queued before admission",
+    ["route_class"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str):
+        self.reason = reason
+
+
+class Gate:
+    def __init__(self, route_class: str, concurrency: int, max_queue: int, timeout: float):
+        self.route_class = route_class
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._queue_depth = ADMISSION_QUEUE_DEPTH.labels(route_class)
+        self._in_flight = ADMISSION_IN_FLIGHT.labels(route_class)
+
+    async def acquire(self) -> None:
+        if not self._slots.locked():
+            # Fast path: a free slot, no waiting and nothing to observe
+            await self._slots.acquire()
+            self._in_flight.inc()
+            return
+
+        if self.waiting >= self.max_queue:
+            raise Rejected("queue_full")
+
+        self.waiting += 1
+        self._queue_depth.inc()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise Rejected("timeout") from None
+        finally:
+            self.waiting -= 1
+            self._queue_depth.dec()
+            ADMISSION_WAIT.labels(self.route_class).observe(time.perf_counter() - started)
+        self._in_flight.inc()
+
+    def release(self) -> None:
+        self._in_flight.dec()
+        self._slots.release()
+
+
+def create_gates() -> Dict[str, Gate]:
+    return {
+        route_class: Gate(route_class, concurrency, max_queue, timeout)
+        for route_class, (concurrency, max_queue, timeout) in admission_limits().items()
+    }
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.gates = create_gates()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        gate = self.gates.get(classify_route(scope["path"]))
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await gate.acquire()
+        except Rejected as rejected:
+            ADMISSION_REJECTED.labels(gate.route_class, rejected.reason).inc()
+            response = FastJSONResponse(
+                {"detail": "Server is busy. Please retry shortly."},
+                status_code=503,
+                headers={"Retry-After": str(max(1, math.ceil(gate.timeout)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from fastapi.security import HTTPBearer
+from typing import Dict, List, Literal, Optional, Tuple
 
 
 class Settings(BaseSettings):
@@ -16,14 +17,139 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
     GOOGLE_CALLBACK_URL: str
+    # Provider endpoints are settings so load tests can point them at scripts/fake_oauth_server.py
+    GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_USERINFO_URL: str = "https://www.googleapis.com/oauth2/v2/userinfo"
     GITHUB_CLIENT_ID: str
     GITHUB_CLIENT_SECRET: str
     LINKEDIN_CLIENT_ID: str
     LINKEDIN_CLIENT_SECRET: str
     LINKEDIN_CALLBACK_URL: str
+    LINKEDIN_TOKEN_URL: str = "https://www.linkedin.com/oauth/v2/accessToken"
+    LINKEDIN_USERINFO_URL: str = "https://api.linkedin.com/v2/userinfo"
     SESSION_SECRET_KEY:str
     LINKEDIN_SCOPE:str
     OPENAI_API_KEY: str
+    OPENAI_BASE_URL: Optional[str] = None  # point at a local fake server in tests
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
+    OPENAI_MAX_CONCURRENCY: int = 8
+    OPENAI_TIMEOUT_SECONDS: float = 20
+    OPENAI_MAX_RETRIES: int = 2
+    OPENAI_RETRY_BACKOFF_SECONDS: float = 0.5
+    OPENAI_BREAKER_FAILURES: int = 5
+    OPENAI_BREAKER_RESET_SECONDS: float = 30
+    INSIGHTS_CACHE_TTL_HOURS: int = 24
+    INSIGHTS_TOKEN_BUDGET: int = 1500
+    SUMMARY_MAX_WEEKS: int = 52
+    SUMMARY_WEEK_ENTRY_LIMIT: int = 50
+    SUMMARY_ENTRY_CHARS: int = 1500
+    LOCAL_INSIGHTS_MAX_ENTRIES: int = 500
+    LOCAL_INSIGHTS_MAX_CHECKINS: int = 90
+    HEATMAP_CACHE_SIZE: int = 4096  # (user, year) heatmaps kept in memory per worker
+    HEATMAP_CACHE_TTL_SECONDS: float = 3600
+
+    # Background jobs, stored in the database and run by every worker process
+    JOB_WORKERS: int = 4  # job runners per process
+    JOB_QUEUE_SIZE: int = 100  # queued jobs across all processes
+    JOB_TIMEOUT_SECONDS: float = 60
+    JOB_MAX_RETRIES: int = 2
+    JOB_BACKOFF_SECONDS: float = 1
+    JOB_RESULT_TTL_SECONDS: float = 600
+    JOB_POLL_SECONDS: float = 0.5  # idle runners and long polls check this often
+
+    DASHBOARD_SECTION_TIMEOUT_SECONDS: float = 3
+    # Connections all dashboard sections of a worker may hold at once;
+    # default a third of DB_POOL_SIZE + DB_MAX_OVERFLOW (core/server.py)
+    DASHBOARD_MAX_CONNECTIONS: Optional[int] = None
+    PREVIEW_CHARS: int = 140
+
+    # Database pool, per process. gunicorn.conf.py derives these from
+    # DB_CONNECTION_BUDGET (total connections all workers may hold)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_CONNECTION_BUDGET: int = 80
+
+    # User-id sharding (db/shards.py): shard name -> asyncpg DSN. Empty means
+    # a single database at DATABASE_URL. Names, not order, place users
+    DATABASE_SHARDS: Dict[str, str] = {}
+    SHARD_VNODES: int = 64
+
+    # Multi-process server (gunicorn.conf.py)
+    PORT: int = 8000
+    WEB_CONCURRENCY: Optional[int] = None  # default: available CPUs
+    MAX_REQUESTS: int = 2000  # recycle a worker after this many requests
+    MAX_REQUESTS_JITTER: int = 200
+    GRACEFUL_TIMEOUT_SECONDS: int = 30
+
+    # Load nltk/VADER and passlib in the background once the app is serving
+    WARM_UP_ON_STARTUP: bool = True
+
+    # SQL profiling: "header" profiles requests sending X-SQL-Profile, "all" every request
+    SQL_PROFILING: Literal["off", "header", "all"] = "off"
+    SLOW_QUERY_MS: float = 200
+
+    # Months of future partitions kept ahead of time (db/partitions.py)
+    PARTITION_MONTHS_AHEAD: int = 3
+
+    # Delta sync (/sync): rows per page across journal, check-ins, goals and deletes
+    SYNC_PAGE_SIZE: int = 500
+    SYNC_MAX_PAGE_SIZE: int = 2000
+
+    # Idempotency-Key replay (core/idempotency.py)
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_MAX_BODY_BYTES: int = 64 * 1024  # larger responses are not stored
+    IDEMPOTENCY_CACHE_SIZE: int = 2048  # completed keys kept in memory per worker
+
+    # Rate limiting (core/rate_limit.py): (requests, window seconds) per route
+    # class, per user or client IP. "redis" shares buckets across workers
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal["memory", "redis"] = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    # Load balancers / proxies (IPs or CIDRs, "*" for any) whose X-Forwarded-For
+    # is believed; unauthenticated clients are keyed on the address they forwarded
+    TRUSTED_PROXIES: List[str] = []
+    RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+        "crud": (300, 60),
+        "analytics": (60, 60),
+        "llm": (5, 60),
+        "auth": (10, 60),
+    }
+
+    # Admission control (core/admission.py), per worker: (concurrent requests,
+    # max queued, queue timeout seconds) per route class. Concurrency is scaled
+    # down to fit the worker's DB pool (core/server.py admission_limits)
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_LIMITS: Dict[str, Tuple[int, int, float]] = {
+        "crud": (32, 128, 1.0),
+        "analytics": (4, 16, 2.0),
+        "llm": (4, 8, 5.0),
+        "auth": (2, 32, 2.0),  # bcrypt is CPU bound; keep it to a couple of threads
+    }
+
+    # Request deadlines in seconds per route class (core/deadlines.py), also
+    # applied as Postgres statement_timeout; lock waits are capped separately
+    REQUEST_DEADLINES: Dict[str, float] = {
+        "crud": 5,
+        "analytics": 15,
+        "llm": 45,
+        "auth": 10,
+    }
+    DB_LOCK_TIMEOUT_MS: int = 2000
+
+    # Response compression, levels per route class (see core/route_classes.py)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVELS: Dict[str, int] = {
+        "crud": 5,
+        "analytics": 6,
+        "llm": 6,
+        "auth": 1,
+    }
+    COMPRESSION_BROTLI_QUALITY: Dict[str, int] = {
+        "crud": 4,
+        "analytics": 5,
+        "llm": 5,
+        "auth": 1,
+    }
 
 
 settings = Settings()
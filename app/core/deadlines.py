@@ -0,0 +1,173 @@
+# core/deadlines.py
+"""
+Per-request deadlines, enforced in Python and in Postgres.
+
+Every request gets a deadline from REQUEST_DEADLINES by route class (see
+core.route_classes). Each transaction a session begins inside that request
+sets `statement_timeout` to the time left and `lock_timeout` to at most
+DB_LOCK_TIMEOUT_MS (transaction-local, one round trip), so a runaway
+analytics scan or ILIKE search is cancelled by the server and its pool
+connection comes back. The request coroutine itself is cancelled shortly
+after the deadline, which covers time spent outside the database.
+
+Outcomes, counted in request_deadline_exceeded_total:
+    statement timeout / deadline passed   504 Gateway Timeout
+    lock timeout (contention, retryable)  503 with Retry-After
+
+Routes often re-raise database errors as HTTPException(500); the handlers
+below look through the exception chain, so those map the same way.
+"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from fastapi.exception_handlers import http_exception_handler
+from prometheus_client import Counter
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.route_classes import EXEMPT_PATHS, classify_route
+from utils.response import FastJSONResponse
+
+QUERY_CANCELED = "57014"  # statement_timeout
+LOCK_NOT_AVAILABLE = "55P03"  # lock_timeout
+# Let Postgres cancel an over-running statement cleanly before the coroutine
+# is cancelled under it
+CANCEL_GRACE_SECONDS = 0.5
+
+DEADLINE_EXCEEDED = Counter(
+    "request_deadline_exceeded_total",
+    "Requests that ran out of time",
+    ["route_class", "reason"],
+)
+
+# Absolute time.monotonic() deadline of the current request
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def remaining_seconds() -> Optional[float]:
+    deadline = request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+SET_TIMEOUTS = text(
+    "SELECT set_config('statement_timeout', :statement_timeout, true),"
+    " set_config('lock_timeout', :lock_timeout, true)"
+)
+
+
+def _apply_deadline(session, transaction, connection):
+    remaining = remaining_seconds()
+    if remaining is None:
+        return
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline passed before the query started")
+    statement_ms = max(1, int(remaining * 1000))
+    connection.execute(
+        SET_TIMEOUTS,
+        {
+            "statement_timeout": str(statement_ms),
+            "lock_timeout": str(min(statement_ms, settings.DB_LOCK_TIMEOUT_MS)),
+        },
+    )
+
+
+def instrument_sessions():
+    # Sessions outside a request (scripts, background jobs) have no deadline
+    event.listen(Session, "after_begin", _apply_deadline)
+
+
+def timeout_reason(exc: BaseException) -> Optional[str]:
+    """'statement_timeout', 'lock_timeout' or 'deadline' if `exc` or anything
+    it was raised from is a deadline failure."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, DeadlineExceeded):
+            return "deadline"
+        if isinstance(exc, DBAPIError):
+            sqlstate = getattr(exc.orig, "sqlstate", None)
+            if sqlstate == QUERY_CANCELED:
+                return "statement_timeout"
+            if sqlstate == LOCK_NOT_AVAILABLE:
+                return "lock_timeout"
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def timeout_response(route_class: str, reason: str) -> FastJSONResponse:
+    DEADLINE_EXCEEDED.labels(route_class, reason).inc()
+    if reason == "lock_timeout":
+        return FastJSONResponse(
+            {"detail": "The resource is busy. Please retry shortly."},
+            status_code=503,
+            headers={"Retry-After": "1"},
+        )
+    return FastJSONResponse({"detail": "The request took too long to complete."}, status_code=504)
+
+
+async def deadline_http_exception_handler(request: Request, exc: StarletteHTTPException):
+    reason = timeout_reason(exc) if exc.status_code >= 500 else None
+    if reason is None:
+        return await http_exception_handler(request, exc)
+    return timeout_response(classify_route(request.url.path), reason)
+
+
+async def deadline_db_exception_handler(request: Request, exc: DBAPIError):
+    reason = timeout_reason(exc)
+    if reason is None:
+        raise exc
+    return timeout_response(classify_route(request.url.path), reason)
+
+
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return timeout_response(classify_route(request.url.path), "deadline")
+
+
+class DeadlineMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_route(scope["path"])
+        budget = settings.REQUEST_DEADLINES.get(route_class)
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        token = request_deadline.set(time.monotonic() + budget)
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await asyncio.wait_for(
+                self.app(scope, receive, send_wrapper), budget + CANCEL_GRACE_SECONDS
+            )
+        except asyncio.TimeoutError:
+            if response_started:
+                raise
+            await timeout_response(route_class, "cancelled")(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
+
+
+instrument_sessions()
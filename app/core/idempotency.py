@@ -0,0 +1,303 @@
+# core/idempotency.py
+"""
+Idempotency-Key support for create and update requests.
+
+An authenticated POST/PUT/PATCH carrying an `Idempotency-Key` header is run
+at most once per (user, key) within IDEMPOTENCY_TTL_HOURS. The first request
+claims the key in the idempotency_keys table (database/V9__idempotency_keys.sql)
+and its response is stored there, status, headers and body; a retry with the same
+key gets that response back, marked `Idempotent-Replayed: true`, without
+reaching the route, so the main tables are never read or written again.
+Framing headers (Content-Length, Transfer-Encoding) are recomputed on replay
+and Set-Cookie is never stored.
+
+- the same key with a different method, path or body: 422
+- the same key while the first request is still running: 409
+- 5xx and throttling responses are not stored, so the key can be retried
+
+Completed keys are also kept in a per-worker TTL cache, so a retry that lands
+on the same worker does not touch the database at all.
+"""
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from fastapi.responses import Response
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.security import bearer_subject
+from db.session import shards
+from db.tables import Tables
+from utils.cache import TTLCache
+from utils.response import FastJSONResponse
+
+tables = Tables()
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH"}
+MAX_KEY_LENGTH = 255
+# Outcomes that say nothing about the request itself; retrying must re-run it
+TRANSIENT_STATUSES = {408, 425, 429}
+# A claim whose worker died mid-request is taken over after this long
+IN_FLIGHT_TIMEOUT = timedelta(minutes=2)
+# Response headers that are not replayed: framing is recomputed for the
+# stored body, and cookies are not kept in the store
+UNSTORED_HEADERS = {b"content-length", b"transfer-encoding", b"connection", b"set-cookie"}
+
+
+class StoredResponse(NamedTuple):
+    request_hash: bytes
+    status_code: Optional[int]  # None while the first request is in flight
+    content_type: Optional[str]  # rows stored before `headers` existed
+    body: Optional[bytes]
+    headers: Optional[List[Tuple[str, str]]] = None
+
+
+_completed = TTLCache(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_TTL_HOURS * 3600
+)
+
+
+def _request_hash(scope: Scope, body: bytes) -> bytes:
+    digest = hashlib.sha256()
+    digest.update(f"{scope['method']} {scope['path']}?".encode())
+    digest.update(scope.get("query_string", b""))
+    digest.update(b"\n")
+    digest.update(body)
+    return digest.digest()
+
+
+async def _claim(user_id: UUID, key: str, request_hash: bytes) -> Optional[StoredResponse]:
+    """Claim the key for this request. Returns None when claimed (new,
+    expired or abandoned key), otherwise the row already holding it."""
+    keys = tables.idempotency_keys
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+    stmt = insert(keys).values(
+        user_id=user_id, key=key, request_hash=request_hash, expires_at=expires_at
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[keys.c.user_id, keys.c.key],
+        set_={
+            "request_hash": stmt.excluded.request_hash,
+            "status_code": None,
+            "content_type": None,
+            "body": None,
+            "headers": None,
+            "created_at": func.now(),
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=or_(
+            keys.c.expires_at < func.now(),
+            keys.c.status_code.is_(None) & (keys.c.created_at < func.now() - IN_FLIGHT_TIMEOUT),
+        ),
+    ).returning(keys.c.key)
+
+    async with shards.engine_for(user_id).begin() as conn:
+        if (await conn.execute(stmt)).first() is not None:
+            return None
+        row = (
+            await conn.execute(
+                select(
+                    keys.c.request_hash,
+                    keys.c.status_code,
+                    keys.c.content_type,
+                    keys.c.body,
+                    keys.c.headers,
+                ).where(keys.c.user_id == user_id, keys.c.key == key)
+            )
+        ).first()
+
+    if row is None:
+        # Released by a failed first attempt between our two statements
+        return StoredResponse(request_hash, None, None, None)
+    return StoredResponse(
+        bytes(row.request_hash),
+        row.status_code,
+        row.content_type,
+        bytes(row.body) if row.body is not None else None,
+        [tuple(header) for header in row.headers] if row.headers is not None else None,
+    )
+
+
+async def _complete(user_id: UUID, key: str, response: StoredResponse) -> None:
+    keys = tables.idempotency_keys
+    async with shards.engine_for(user_id).begin() as conn:
+        await conn.execute(
+            update(keys)
+            .where(keys.c.user_id == user_id, keys.c.key == key)
+            .values(
+                status_code=response.status_code,
+                content_type=response.content_type,
+                body=response.body,
+                headers=response.headers,
+            )
+        )
+
+
+async def _release(user_id: UUID, key: str) -> None:
+    keys = tables.idempotency_keys
+    async with shards.engine_for(user_id).begin() as conn:
+        await conn.execute(
+            keys.delete().where(
+                keys.c.user_id == user_id, keys.c.key == key, keys.c.status_code.is_(None)
+            )
+        )
+
+
+def _user_id(headers: Headers) -> Optional[UUID]:
+    subject = bearer_subject(headers.get("authorization"))
+    try:
+        return UUID(subject) if subject else None
+    except ValueError:
+        return None
+
+
+async def _read_body(receive: Receive) -> Optional[bytes]:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay(stored: StoredResponse) -> Response:
+    """The stored response, with its original headers in their original
+    order (repeated ones included); Content-Length comes from the body."""
+    if stored.headers is None:
+        response = Response(
+            stored.body, status_code=stored.status_code, media_type=stored.content_type
+        )
+    else:
+        response = Response(stored.body, status_code=stored.status_code)
+        response.raw_headers.extend(
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in stored.headers
+        )
+    response.raw_headers.append((b"idempotent-replayed", b"true"))
+    return response
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        user_id = _user_id(headers) if key is not None else None
+        if user_id is None:
+            # No key, or unauthenticated: the route answers as usual (401)
+            await self.app(scope, receive, send)
+            return
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = FastJSONResponse(
+                {"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters."},
+                status_code=400,
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        if body is None:
+            return
+        request_hash = _request_hash(scope, body)
+
+        stored = _completed.get((user_id, key))
+        if stored is None:
+            stored = await _claim(user_id, key, request_hash)
+        if stored is not None:
+            await self._answer_from_store(stored, request_hash, scope, receive, send)
+            return
+
+        await self._run_and_store(user_id, key, request_hash, body, scope, receive, send)
+
+    async def _answer_from_store(
+        self, stored: StoredResponse, request_hash: bytes, scope: Scope, receive: Receive, send: Send
+    ):
+        if stored.request_hash != request_hash:
+            response = FastJSONResponse(
+                {"detail": "Idempotency-Key was already used for a different request."},
+                status_code=422,
+            )
+        elif stored.status_code is None:
+            response = FastJSONResponse(
+                {"detail": "A request with this Idempotency-Key is still being processed."},
+                status_code=409,
+                headers={"Retry-After": "1"},
+            )
+        else:
+            response = _replay(stored)
+        await response(scope, receive, send)
+
+    async def _run_and_store(
+        self, user_id: UUID, key: str, request_hash: bytes, body: bytes,
+        scope: Scope, receive: Receive, send: Send,
+    ):
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = None
+        content_type = None
+        response_headers = []
+        chunks = []
+        size = 0
+        complete = False
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, content_type, size, complete
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message["headers"]).get("content-type")
+                response_headers[:] = [
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message["headers"]
+                    if name.lower() not in UNSTORED_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= settings.IDEMPOTENCY_MAX_BODY_BYTES:
+                    chunks.append(chunk)
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+        except BaseException:
+            # Shielded so a cancelled request still frees its key
+            await asyncio.shield(_release(user_id, key))
+            raise
+
+        if (
+            not complete
+            or status_code >= 500
+            or status_code in TRANSIENT_STATUSES
+            or size > settings.IDEMPOTENCY_MAX_BODY_BYTES
+        ):
+            await _release(user_id, key)
+            return
+
+        stored = StoredResponse(
+            request_hash, status_code, content_type, b"".join(chunks), response_headers
+        )
+        await _complete(user_id, key, stored)
+        _completed.set((user_id, key), stored)
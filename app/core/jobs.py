@@ -0,0 +1,301 @@
+# core/jobs.py
+"""
+Background jobs shared by every worker process.
+
+Jobs live in the `jobs` table on the home shard (database/V14__jobs.sql), so
+the poll for a job can reach any worker and queued jobs survive restarts. A
+job is a registered kind plus JSON params; each process runs JOB_WORKERS
+runners that claim the next due job with FOR UPDATE SKIP LOCKED and hold it
+for a lease of JOB_TIMEOUT_SECONDS plus LEASE_GRACE_SECONDS. A job whose
+process died is claimed again once its lease runs out.
+
+Jobs submitted with the same key while one is still queued or running are
+coalesced into that job (a partial unique index on the key). Each attempt
+runs under a timeout, and failures other than client errors are retried
+with exponential backoff and jitter. Finished jobs are kept for
+JOB_RESULT_TTL_SECONDS.
+"""
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from core.config import settings
+from db.session import shards
+from db.tables import Tables
+
+logger = logging.getLogger(__name__)
+tables = Tables()
+
+ACTIVE = ("queued", "running")
+LEASE_GRACE_SECONDS = 30
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    """A row of the jobs table."""
+
+    def __init__(self, row):
+        self.id = str(row.id)
+        self.kind = row.kind
+        self.key = row.key
+        self.owner = row.owner
+        self.params = row.params
+        self.status = row.status  # queued -> running -> succeeded | failed
+        self.result: Any = row.result
+        self.error: Optional[str] = row.error
+        self.error_status: Optional[int] = row.error_status
+        self.attempts = row.attempts
+        self.created_at = row.created_at.timestamp()
+        self.finished_at: Optional[float] = row.finished_at and row.finished_at.timestamp()
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        timeout: float,
+        max_retries: int,
+        backoff_base: float,
+        result_ttl: float,
+        poll_interval: float,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._handlers: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._pruned_at = 0.0
+        self._tasks = []
+
+    def register(self, kind: str, fn: Callable[..., Awaitable[Any]]):
+        """Run jobs of `kind` as `await fn(**params)`. Every process registers
+        the same kinds (at import), as any of them may claim the job."""
+        self._handlers[kind] = fn
+
+    def start(self):
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _session(self):
+        return shards.sessionmakers[shards.home]()
+
+    async def submit(self, kind: str, key: str, owner: str, params: dict) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind {kind!r}")
+        jobs = tables.jobs
+        active = select(jobs).where(jobs.c.key == key, jobs.c.status.in_(ACTIVE))
+
+        async with self._session() as db:
+            row = (await db.execute(active)).first()
+            if row is None:
+                queued = await db.scalar(
+                    select(func.count()).select_from(jobs).where(jobs.c.status == "queued")
+                )
+                if queued >= self.max_queue:
+                    raise QueueFullError("Job queue is full")
+                insert = (
+                    pg_insert(jobs)
+                    .values(id=uuid.uuid4(), kind=kind, key=key, owner=owner, params=params)
+                    .on_conflict_do_nothing(
+                        index_elements=[jobs.c.key], index_where=jobs.c.status.in_(ACTIVE)
+                    )
+                    .returning(jobs)
+                )
+                # Nothing returned: another process queued the key just now
+                row = (await db.execute(insert)).first() or (await db.execute(active)).first()
+                await db.commit()
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return Job(row)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        try:
+            job_id = uuid.UUID(job_id)
+        except ValueError:
+            return None
+        async with self._session() as db:
+            row = (await db.execute(select(tables.jobs).where(tables.jobs.c.id == job_id))).first()
+        return Job(row) if row is not None else None
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        """Long-poll `job` until it finishes or `timeout` seconds pass."""
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + timeout
+        while job.active and loop.time() < expires:
+            await asyncio.sleep(min(self.poll_interval, expires - loop.time()))
+            job = await self.get(job.id) or job
+        return job
+
+    async def _claim(self) -> Optional[Job]:
+        jobs = tables.jobs
+        now = func.now()
+        due = (
+            select(jobs.c.id)
+            .where(
+                or_(
+                    and_(jobs.c.status == "queued", jobs.c.run_after <= now),
+                    # Its process died mid-run
+                    and_(jobs.c.status == "running", jobs.c.locked_until < now),
+                )
+            )
+            .order_by(jobs.c.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        lease = self.timeout + LEASE_GRACE_SECONDS
+        claim = (
+            update(jobs)
+            .where(jobs.c.id == due)
+            .values(
+                status="running",
+                attempts=jobs.c.attempts + 1,
+                locked_until=now + timedelta(seconds=lease),
+            )
+            .returning(jobs)
+        )
+        async with self._session() as db:
+            row = (await db.execute(claim)).first()
+            await db.commit()
+        return Job(row) if row is not None else None
+
+    async def _finish(self, job: Job, **values):
+        jobs = tables.jobs
+        if values.get("status") in ("succeeded", "failed"):
+            values["finished_at"] = func.now()
+        async with self._session() as db:
+            await db.execute(
+                update(jobs)
+                .where(jobs.c.id == uuid.UUID(job.id))
+                .values(locked_until=None, **values)
+            )
+            await db.commit()
+
+    async def _prune(self):
+        if time.monotonic() - self._pruned_at < self.poll_interval * 60:
+            return
+        self._pruned_at = time.monotonic()
+        jobs = tables.jobs
+        async with self._session() as db:
+            expired = func.now() - timedelta(seconds=self.result_ttl)
+            await db.execute(jobs.delete().where(jobs.c.finished_at < expired))
+            await db.commit()
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self._claim()
+                if job is None:
+                    await self._prune()
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Database unreachable and the like: keep the runner alive
+                logger.exception("Job runner error")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _run(self, job: Job):
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            error = f"Unknown job kind {job.kind!r}"
+            await self._finish(job, status="failed", error=error, error_status=500)
+            return
+        if job.attempts > self.max_retries + 1:
+            # Claimed again after its process died on the last attempt
+            await self._finish(job, status="failed", error="Job was interrupted", error_status=500)
+            return
+
+        try:
+            async with asyncio.timeout(self.timeout):
+                result = await handler(**job.params)
+            await self._finish(job, status="succeeded", result=jsonable_encoder(result))
+            return
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back without spending the attempt
+            await asyncio.shield(self._finish(job, status="queued", attempts=job.attempts - 1))
+            raise
+        except HTTPException as e:
+            # Client errors (e.g. no entries) will not change on retry
+            error, error_status = str(e.detail), e.status_code
+            if e.status_code < 500:
+                await self._finish(job, status="failed", error=error, error_status=error_status)
+                return
+        except TimeoutError:
+            error, error_status = f"Job timed out after {self.timeout}s", 504
+        except Exception as e:
+            error, error_status = str(e), 500
+
+        if job.attempts > self.max_retries:
+            logger.warning("Job %s (%s) failed: %s", job.id, job.kind, error)
+            await self._finish(job, status="failed", error=error, error_status=error_status)
+            return
+
+        delay = self.backoff_base * 2 ** (job.attempts - 1)
+        delay += random.uniform(0, delay)
+        await self._finish(
+            job,
+            status="queued",
+            error=error,
+            error_status=error_status,
+            run_after=func.now() + timedelta(seconds=delay),
+        )
+
+
+job_queue = JobQueue(
+    workers=settings.JOB_WORKERS,
+    max_queue=settings.JOB_QUEUE_SIZE,
+    timeout=settings.JOB_TIMEOUT_SECONDS,
+    max_retries=settings.JOB_MAX_RETRIES,
+    backoff_base=settings.JOB_BACKOFF_SECONDS,
+    result_ttl=settings.JOB_RESULT_TTL_SECONDS,
+    poll_interval=settings.JOB_POLL_SECONDS,
+)
@@ -0,0 +1,214 @@
+# core/metrics.py
+"""
+Prometheus metrics for routes, database, pool and external calls.
+
+Per-request DB counters live in a ContextVar that the SQLAlchemy cursor
+events update; SQLAlchemy's greenlets inherit the request's context, so
+the events attribute queries to the request that issued them. When
+PROMETHEUS_MULTIPROC_DIR is set (multi-worker server), /metrics aggregates
+across worker processes.
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.session import shards
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed")
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "SQL statement latency", buckets=LATENCY_BUCKETS
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements issued per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 50),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent in SQL per HTTP request",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL = Gauge(
+    "db_pool_connections",
+    "Connection pool usage",
+    ["shard", "state"],
+    multiprocess_mode="livesum",
+)
+EXTERNAL_LATENCY = Histogram(
+    "external_call_duration_seconds",
+    "Latency of calls to external providers",
+    ["service", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_IN_FLIGHT = Gauge(
+    "external_calls_in_flight",
+    "External provider calls in progress",
+    ["service"],
+    multiprocess_mode="livesum",
+)
+EXTERNAL_ERRORS = Counter(
+    "external_call_errors_total", "Failed external provider calls", ["service", "error"]
+)
+LLM_RETRIES = Counter("openai_retries_total", "OpenAI call attempts that were retried")
+LLM_REJECTED = Counter(
+    "openai_rejected_total", "OpenAI calls refused before reaching the provider", ["reason"]
+)
+LLM_BREAKER_OPEN = Gauge(
+    "openai_circuit_open", "1 while the OpenAI circuit breaker is open", multiprocess_mode="max"
+)
+SENTIMENT_LATENCY = Histogram(
+    "sentiment_scoring_duration_seconds",
+    "Time to score one text with VADER",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05),
+)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class track_external:
+    """Time a block calling an external provider:
+
+        with track_external("google"):
+            await client.post(...)
+    """
+
+    __slots__ = ("service", "started")
+
+    def __init__(self, service: str):
+        self.service = service
+
+    def __enter__(self):
+        EXTERNAL_IN_FLIGHT.labels(self.service).inc()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        EXTERNAL_IN_FLIGHT.labels(self.service).dec()
+        outcome = "error" if exc_type else "ok"
+        EXTERNAL_LATENCY.labels(self.service, outcome).observe(
+            time.perf_counter() - self.started
+        )
+        if exc_type:
+            EXTERNAL_ERRORS.labels(self.service, exc_type.__name__).inc()
+        return False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    DB_QUERIES.inc()
+    DB_QUERY_LATENCY.observe(elapsed)
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
+
+
+def instrument_engine(async_engine):
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(async_engine.sync_engine, "handle_error", _handle_error)
+
+
+def _update_pool_gauges():
+    for name, engine in shards.engines.items():
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            DB_POOL.labels(name, "checked_out").set(pool.checkedout())
+            DB_POOL.labels(name, "idle").set(pool.checkedin())
+            DB_POOL.labels(name, "overflow").set(max(pool.overflow(), 0))
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_stats.reset(token)
+            route = scope.get("route")
+            # Templated path keeps label cardinality bounded
+            label = route.path if route is not None else "unmatched"
+            HTTP_LATENCY.labels(scope["method"], label).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(scope["method"], label, str(status_code)).inc()
+            DB_QUERIES_PER_REQUEST.labels(label).observe(stats.queries)
+            DB_TIME_PER_REQUEST.labels(label).observe(stats.db_time)
+            _update_pool_gauges()
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        data = generate_latest(registry)
+    else:
+        _update_pool_gauges()
+        data = generate_latest()
+    return Response(data, media_type=CONTENT_TYPE_LATEST)
+
+
+for _engine in shards.engines.values():
+    instrument_engine(_engine)
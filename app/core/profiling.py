@@ -0,0 +1,204 @@
+# core/profiling.py
+"""
+Per-request SQL profiler and slow-query log.
+
+Profiling is opt-in: with SQL_PROFILING="header" a request sending
+`X-SQL-Profile: 1` (or `explain` to add EXPLAIN ANALYZE for read-only
+statements) is
+profiled; with SQL_PROFILING="all" every request is. A profiled response
+carries a `Server-Timing` header (total DB time plus the slowest statement
+fingerprints) and the full statement list is logged.
+
+The slow-query log is always on: statements slower than SLOW_QUERY_MS are
+logged with their fingerprint and parameter *shape*, never the values.
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from db.session import shards
+
+logger = logging.getLogger("sql.profile")
+
+PROFILE_HEADER = "x-sql-profile"
+SERVER_TIMING_STATEMENTS = 5
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+# EXPLAIN ANALYZE executes the statement a second time: anything that may
+# write (a data-modifying CTE, SELECT ... FOR UPDATE, nextval) is not explained
+_WRITE_RE = re.compile(r"\b(insert|update|delete|merge|nextval|setval)\b", re.IGNORECASE)
+
+
+def normalize_sql(statement: str) -> str:
+    sql = _STRING_RE.sub("?", statement)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.md5(normalized.encode()).hexdigest()[:12]
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Types of the bound parameters, without their values."""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return {"rows": len(parameters), "row": parameter_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class RequestProfile:
+    def __init__(self, explain: bool):
+        self.explain = explain
+        self.statements: List[dict] = []
+
+    @property
+    def db_time(self) -> float:
+        return sum(s["duration_ms"] for s in self.statements)
+
+    def server_timing(self) -> str:
+        entries = [f'db;dur={self.db_time:.2f};desc="{len(self.statements)} queries"']
+
+        by_fingerprint = {}
+        for s in self.statements:
+            agg = by_fingerprint.setdefault(s["fingerprint"], [0, 0.0])
+            agg[0] += 1
+            agg[1] += s["duration_ms"]
+        slowest = sorted(by_fingerprint.items(), key=lambda item: -item[1][1])
+        for fp, (count, total) in slowest[:SERVER_TIMING_STATEMENTS]:
+            entries.append(f'sql-{fp};dur={total:.2f};desc="x{count}"')
+        return ", ".join(entries)
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def explainable(normalized: str) -> bool:
+    return normalized.lower().startswith(("select", "with")) and not _WRITE_RE.search(normalized)
+
+
+def _explain(conn, statement: str, parameters: Any) -> Optional[Any]:
+    # Runs on a separate raw DBAPI cursor so it bypasses these events and
+    # leaves the original cursor's result untouched
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+        cursor.close()
+        return json.loads(plan) if isinstance(plan, str) else plan
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration_ms = (time.perf_counter() - conn.info["profile_started"].pop()) * 1000
+    profile = current_profile.get()
+    slow = duration_ms >= settings.SLOW_QUERY_MS
+    if profile is None and not slow:
+        return
+
+    normalized = normalize_sql(statement)
+    fp = fingerprint(normalized)
+    shape = parameter_shape(parameters, executemany)
+
+    if slow:
+        logger.warning(
+            "Slow query %.1fms [%s] %s params=%s", duration_ms, fp, normalized, shape
+        )
+
+    if profile is not None:
+        entry = {
+            "fingerprint": fp,
+            "sql": normalized,
+            "duration_ms": round(duration_ms, 3),
+            "params": shape,
+        }
+        if profile.explain and explainable(normalized):
+            entry["plan"] = _explain(conn, statement, parameters)
+        profile.statements.append(entry)
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get("profile_started"):
+        context.connection.info["profile_started"].pop()
+
+
+def instrument_engine(async_engine):
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(async_engine.sync_engine, "handle_error", _handle_error)
+
+
+def _requested_profile(scope: Scope) -> Optional[RequestProfile]:
+    mode = settings.SQL_PROFILING
+    if mode == "off":
+        return None
+    value = Headers(scope=scope).get(PROFILE_HEADER, "").lower()
+    if mode == "all" or value in ("1", "true", "explain"):
+        return RequestProfile(explain=value == "explain")
+    return None
+
+
+class SQLProfilerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        profile = _requested_profile(scope) if scope["type"] == "http" else None
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        token = current_profile.set(profile)
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                total_ms = (time.perf_counter() - started) * 1000
+                headers.append(
+                    "Server-Timing", f"{profile.server_timing()}, app;dur={total_ms:.2f}"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            logger.info(
+                "SQL profile %s %s: %d statements, %.1fms\n%s",
+                scope["method"],
+                scope["path"],
+                len(profile.statements),
+                profile.db_time,
+                json.dumps(profile.statements, indent=2, default=str),
+            )
+
+
+for _engine in shards.engines.values():
+    instrument_engine(_engine)
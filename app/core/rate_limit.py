@@ -0,0 +1,217 @@
+# core/rate_limit.py
+"""
+Token-bucket rate limiting per client and route class.
+
+Each (client, route class) pair owns a bucket of `limit` tokens refilled at
+limit / window per second (RATE_LIMITS, see core.route_classes). Clients are
+the bearer token's user id, or the peer address for unauthenticated requests
+such as /auth/login. Behind a load balancer the peer is the balancer, so
+when it is listed in TRUSTED_PROXIES the client is the nearest
+X-Forwarded-For hop that is not itself a trusted proxy. A request spends one token; an empty bucket answers 429
+with Retry-After. Every limited response carries the draft-standard
+RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset / RateLimit-Policy
+headers.
+
+Backends:
+    memory - buckets in this process; limits are per worker
+    redis  - buckets in any Redis-protocol server at REDIS_URL (Redis, Valkey,
+             KeyDB, ...) shared by all workers; needs the `redis` package.
+             One EVALSHA round trip per request, timed on the server clock.
+
+If the shared backend is unreachable requests are let through (and counted)
+rather than failing the API.
+"""
+import ipaddress
+import logging
+import math
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from prometheus_client import Counter
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.route_classes import EXEMPT_PATHS, classify_route
+from core.security import bearer_subject
+from utils.response import FastJSONResponse
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # optional: memory backend only
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = Counter(
+    "rate_limited_total", "Requests rejected by the rate limiter", ["route_class"]
+)
+RATE_LIMIT_BACKEND_ERRORS = Counter(
+    "rate_limit_backend_errors_total", "Rate limit checks that failed open"
+)
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: float  # tokens left after this request
+
+
+class MemoryBackend:
+    """Buckets in a bounded LRU dict; the least recently seen clients are
+    dropped first, which only ever hands them a fresh (full) bucket."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def take(self, key: str, limit: int, rate: float) -> Decision:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(limit), now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return Decision(True, bucket[0])
+        return Decision(False, bucket[0])
+
+
+# KEYS[1] bucket; ARGV limit, refill per second. Returns {allowed, tokens}
+# with tokens as a string since Lua numbers are truncated in replies.
+TAKE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or limit
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(limit, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(limit / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the `redis` package")
+        self._client = redis.from_url(url)
+        self._take = self._client.register_script(TAKE_SCRIPT)
+
+    async def take(self, key: str, limit: int, rate: float) -> Decision:
+        allowed, tokens = await self._take(keys=[f"ratelimit:{key}"], args=[limit, rate])
+        return Decision(bool(allowed), float(tokens))
+
+
+def create_backend():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL)
+    return MemoryBackend()
+
+
+@lru_cache(maxsize=8)
+def _proxy_networks(entries: Tuple[str, ...]) -> tuple:
+    return tuple(ipaddress.ip_network(entry, strict=False) for entry in entries if entry != "*")
+
+
+def is_trusted_proxy(host: str) -> bool:
+    entries = tuple(settings.TRUSTED_PROXIES)
+    if "*" in entries:
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _proxy_networks(entries))
+
+
+def client_ip(scope: Scope, headers: Headers) -> str:
+    client = scope.get("client")
+    host = client[0] if client else "unknown"
+    if not is_trusted_proxy(host):
+        return host
+    # Each proxy appends the address it received from; walk back from the
+    # nearest until a hop is not a proxy we trust (left of it is client-supplied)
+    hops = [
+        hop.strip()
+        for value in headers.getlist("x-forwarded-for")
+        for hop in value.split(",")
+        if hop.strip()
+    ]
+    for hop in reversed(hops):
+        host = hop
+        if not is_trusted_proxy(hop):
+            break
+    return host
+
+
+def client_key(scope: Scope) -> str:
+    headers = Headers(scope=scope)
+    user_id = bearer_subject(headers.get("authorization"))
+    if user_id:
+        return f"user:{user_id}"
+    return f"ip:{client_ip(scope, headers)}"
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, backend=None):
+        self.app = app
+        self.backend = backend or create_backend()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_route(scope["path"])
+        limit, window = settings.RATE_LIMITS[route_class]
+        rate = limit / window
+        try:
+            decision = await self.backend.take(f"{route_class}:{client_key(scope)}", limit, rate)
+        except Exception:
+            RATE_LIMIT_BACKEND_ERRORS.inc()
+            logger.warning("Rate limit backend unavailable; allowing request", exc_info=True)
+            await self.app(scope, receive, send)
+            return
+
+        rate_headers = {
+            "RateLimit-Limit": str(limit),
+            "RateLimit-Remaining": str(int(decision.remaining)),
+            "RateLimit-Reset": str(math.ceil((limit - decision.remaining) / rate)),
+            "RateLimit-Policy": f"{limit};w={window}",
+        }
+
+        if not decision.allowed:
+            RATE_LIMITED.labels(route_class).inc()
+            retry_after = math.ceil((1 - decision.remaining) / rate)
+            response = FastJSONResponse(
+                {"detail": "Too many requests. Please slow down."},
+                status_code=429,
+                headers={**rate_headers, "Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                for name, value in rate_headers.items():
+                    headers.append(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,42 @@
+# core/route_classes.py
+"""
+Coarse route classes used to tune per-route behaviour (compression level,
+and later limits) without annotating every endpoint.
+
+    auth      - login/register: bcrypt hashing
+    llm       - OpenAI-backed endpoints, and the job endpoint that queues them
+    analytics - aggregate scans over a user's whole history, and the report
+                endpoints that queue builds
+    crud      - everything else: single-row reads/writes and plain lists
+"""
+import re
+from functools import lru_cache
+
+ROUTE_CLASSES = (
+    ("auth", re.compile(r"^/auth/(login|register)$")),
+    # Enqueueing costs what running inline does; polling a job is crud
+    ("llm", re.compile(r"^/checkin/journal/insights(/jobs)?$")),
+    (
+        "analytics",
+        re.compile(
+            r"^/(dashboard|weekly-summary|monthly-summary|tag-summary"
+            r"|journal/(stats|compare|journal/sentiment-analysis|journal/summary/weekly)"
+            r"|checkin/(streak|checkin/stats|journal/(calendar|heatmap|search|tags))"
+            r"|reports/(year|quarter|month)/[^/]+(/jobs)?)$"
+        ),
+    ),
+)
+
+DEFAULT_CLASS = "crud"
+
+# Operational endpoints that rate limiting and admission control leave alone
+EXEMPT_PATHS = frozenset({"/metrics", "/docs", "/redoc", "/openapi.json"})
+
+
+@lru_cache(maxsize=4096)
+def classify_route(path: str) -> str:
+    path = path.rstrip("/") or "/"
+    for name, pattern in ROUTE_CLASSES:
+        if pattern.match(path):
+            return name
+    return DEFAULT_CLASS
@@ -1,18 +1,25 @@
-from passlib.context import CryptContext
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
 from jose import jwt, JWTError
 from core.config import settings
 from fastapi import HTTPException
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=None)
+def pwd_context():
+    # passlib is only needed by password login/registration; import on first use
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta):
@@ -23,6 +30,32 @@ def create_access_token(data: dict, expires_delta: timedelta):
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
+@lru_cache(maxsize=4096)
+def _decode_bearer(token: str) -> Optional[tuple]:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub"), payload.get("exp")
+
+
+def bearer_subject(authorization: Optional[str]) -> Optional[str]:
+    """`sub` of a valid bearer token from an Authorization header, or None.
+    Checks signature and expiry only; no user lookup, so middlewares can
+    key per-user state without a database round trip. Decoded tokens are
+    cached, keeping this to microseconds on every request."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    claims = _decode_bearer(token)
+    if claims is None:
+        return None
+    subject, expires = claims
+    if expires is not None and expires <= time.time():
+        return None
+    return subject
+
+
 def verify_access_token(token: str):
     try:
         payload = jwt.decode(
@@ -0,0 +1,89 @@
+# core/server.py
+"""
+Helpers for the multi-process server in gunicorn.conf.py: the uvicorn
+worker class, CPU detection, per-worker connection pool sizing and the
+admission limits that keep requests inside that pool.
+"""
+import math
+import os
+from typing import Dict, Tuple
+
+from uvicorn.workers import UvicornWorker
+
+from core.config import settings
+
+
+class UvloopWorker(UvicornWorker):
+    # Explicit instead of "auto" so a missing uvloop/httptools fails loudly
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask capped by a cgroup v2 quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def pool_sizes(budget: int, workers: int) -> Tuple[int, int]:
+    """
+    Split a global Postgres connection budget across workers as
+    (pool_size, max_overflow): two thirds kept open, the rest as burst
+    overflow, and at least two connections per worker.
+    """
+    per_worker = max(2, budget // workers)
+    pool_size = max(1, per_worker * 2 // 3)
+    return pool_size, per_worker - pool_size
+
+
+def dashboard_connections() -> int:
+    """Connections a worker's dashboard sections may hold together (crud/dashboard.py)."""
+    pool = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    return settings.DASHBOARD_MAX_CONNECTIONS or max(1, pool // 3)
+
+
+def admission_limits() -> Dict[str, Tuple[int, int, float]]:
+    """
+    ADMISSION_LIMITS with the per-class concurrency scaled down to fit this
+    worker's pool. An admitted request holds at most one connection, so the
+    classes together are allowed DB_POOL_SIZE + DB_MAX_OVERFLOW less the
+    JOB_WORKERS job runners, which hold connections whenever they run (none
+    are reserved with JOB_WORKERS=0). Dashboard sections get no reservation:
+    they only run inside an admitted analytics request, under their own cap
+    (dashboard_connections), and wait on the pool like any burst. Requests
+    then queue (or are shed) at the gate instead of waiting on the pool with
+    their deadline running.
+
+    Every class keeps at least one slot and the rest of the budget is shared
+    in proportion to the configured values, largest remainders first, so no
+    slot is lost to rounding. Queue sizes and timeouts are unchanged.
+    """
+    limits = dict(settings.ADMISSION_LIMITS)
+    pool = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    budget = max(len(limits), pool - settings.JOB_WORKERS)
+    total = sum(concurrency for concurrency, _, _ in limits.values())
+    if total <= budget:
+        return limits
+
+    spare, configured_spare = budget - len(limits), total - len(limits)
+    shares = {
+        route_class: (concurrency - 1) * spare / configured_spare
+        for route_class, (concurrency, _, _) in limits.items()
+    }
+    slots = {route_class: 1 + int(share) for route_class, share in shares.items()}
+    leftover = budget - sum(slots.values())
+    for route_class in sorted(shares, key=lambda name: shares[name] % 1, reverse=True)[:leftover]:
+        slots[route_class] += 1
+    return {
+        route_class: (slots[route_class], max_queue, timeout)
+        for route_class, (_, max_queue, timeout) in limits.items()
+    }
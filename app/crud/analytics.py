@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
 from db.tables import Tables
+from utils.stats import count_tags
 
 tables = Tables()
 
@@ -138,19 +139,9 @@ async def get_user_tag_summary(user_id: str, db: AsyncSession):
     query = select(checkins.c.tags).where(checkins.c.user_id == user_id)
     result = await db.execute(query)
 
-    all_tags = []
-    for row in result.fetchall():
-        if row.tags:
-            all_tags.extend(row.tags if isinstance(row.tags, list) else [])
-
-    tag_count = {}
-    for tag in all_tags:
-        tag_count[tag] = tag_count.get(tag, 0) + 1
-
-    top_tags = sorted(
-        [{"tag": k, "count": v} for k, v in tag_count.items()],
-        key=lambda x: x["count"],
-        reverse=True,
+    all_tags = (
+        tag for tags in result.scalars() if isinstance(tags, list) for tag in tags
     )
+    top_tags = [{"tag": tag, "count": n} for tag, n in count_tags(all_tags)]
 
     return {"top_tags": top_tags}
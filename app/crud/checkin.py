@@ -3,8 +3,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from schemas.checkin import CheckinCreate, CheckinUpdate
 from db.tables import Tables
 from sqlalchemy import select, insert, update, delete, and_
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from fastapi import HTTPException, status
+from typing import List, Optional
+from utils.fields import select_columns
+from utils.stats import compute_streaks
 
 
 def get_current_timestamp():
@@ -14,11 +17,33 @@ def get_current_timestamp():
 tables = Tables()
 
 
+CHECKIN_FIELDS = (
+    "id",
+    "date",
+    "mood",
+    "focus_percent",
+    "tags",
+    "note",
+    "preview",
+    "sleep_duration",
+    "created_at",
+    "updated_at",
+)
+CHECKIN_SUMMARY_FIELDS = ("id", "date", "mood", "focus_percent", "tags", "preview")
+
+
 # Get all check-ins
-async def get_all_checkins(user_id: UUID, db: AsyncSession):
+async def get_all_checkins(
+    user_id: UUID, db: AsyncSession, fields: Optional[List[str]] = None
+):
     checkin_table = tables.daily_checkins
+    if fields:
+        query = select(*select_columns(checkin_table, fields, preview_of="note"))
+    else:
+        query = select(checkin_table)
+
     query = (
-        select(checkin_table)
+        query
         .where(checkin_table.c.user_id == user_id)
         .order_by(checkin_table.c.created_at.desc())
     )
@@ -26,6 +51,16 @@ async def get_all_checkins(user_id: UUID, db: AsyncSession):
     return result.mappings().all()
 
 
+async def has_checked_in_today(user_id: UUID, db: AsyncSession) -> bool:
+    checkin_table = tables.daily_checkins
+    query = select(checkin_table.c.id).where(
+        checkin_table.c.user_id == user_id,
+        checkin_table.c.date == date.today(),
+    )
+    result = await db.execute(query)
+    return result.first() is not None
+
+
 # # Create a check-in
 # async def create_checkin(user_id: UUID, payload: CheckinCreate, db: AsyncSession):
 #     # Check if one already exists
@@ -168,17 +203,23 @@ async def update_checkin_by_id(
 ):
     # Check existence
     exists = await db.execute(
-        select(tables.daily_checkins).where(
+        select(tables.daily_checkins.c.date).where(
             tables.daily_checkins.c.id == checkin_id,
             tables.daily_checkins.c.user_id == user_id,
         )
     )
-    if not exists.first():
+    checkin_date = exists.scalar()
+    if checkin_date is None:
         raise HTTPException("Check-in not found")
 
+    # date narrows the write to one partition
     update_stmt = (
         update(tables.daily_checkins)
-        .where(tables.daily_checkins.c.id == checkin_id)
+        .where(
+            tables.daily_checkins.c.id == checkin_id,
+            tables.daily_checkins.c.user_id == user_id,
+            tables.daily_checkins.c.date == checkin_date,
+        )
         .values(
             mood=payload.mood,
             note=payload.note,
@@ -194,18 +235,20 @@ async def update_checkin_by_id(
 # Delete check-in
 async def delete_checkin_by_id(user_id: UUID, checkin_id: UUID, db: AsyncSession):
     exists = await db.execute(
-        select(tables.daily_checkins).where(
+        select(tables.daily_checkins.c.date).where(
             tables.daily_checkins.c.id == checkin_id,
             tables.daily_checkins.c.user_id == user_id,
         )
     )
-    if not exists.first():
+    checkin_date = exists.scalar()
+    if checkin_date is None:
         raise HTTPException("Check-in not found")
 
     await db.execute(
         delete(tables.daily_checkins).where(
             tables.daily_checkins.c.id == checkin_id,
             tables.daily_checkins.c.user_id == user_id,
+            tables.daily_checkins.c.date == checkin_date,
         )
     )
     await db.commit()
@@ -223,7 +266,7 @@ async def get_user_streak(user_id: UUID, db: AsyncSession) -> dict:
 
     try:
         result = await db.execute(query)
-        dates = [row.date for row in result.fetchall()]
+        dates = result.scalars().all()
 
         if not dates:
             return {
@@ -233,28 +276,8 @@ async def get_user_streak(user_id: UUID, db: AsyncSession) -> dict:
                 "last_checkin_date": None,
             }
 
-        longest_streak = 1
-        streak = 1
-
-        for i in range(1, len(dates)):
-            if dates[i] == dates[i - 1] + timedelta(days=1):
-                streak += 1
-            else:
-                if streak > longest_streak:
-                    longest_streak = streak
-                streak = 1
-        if streak > longest_streak:
-            longest_streak = streak
-
-        # Calculate current streak from the latest date backward
+        current_streak, longest_streak = compute_streaks(dates)
         last_checkin_date = dates[-1]
-        current_streak = 0
-        for i in range(len(dates) - 1, -1, -1):
-            expected_date = last_checkin_date - timedelta(days=current_streak)
-            if dates[i] == expected_date:
-                current_streak += 1
-            else:
-                break
 
         return {
             "user_id": user_id,
@@ -0,0 +1,82 @@
+import asyncio
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+from core.server import dashboard_connections
+from crud.analytics import get_user_weekly_summary
+from crud.checkin import get_user_streak, has_checked_in_today
+from crud.goals import get_user_goal_data
+from crud.journal import get_sentiment_analysis_data, get_user_journal_stats
+from db.session import shards
+
+# name -> coroutine factory taking a session; each section runs on its own
+# pooled connection so they can proceed concurrently, within a per-worker
+# cap on the connections dashboards hold (see _get_slots)
+SECTIONS = {
+    "streak": lambda user_id, db: get_user_streak(user_id, db),
+    "checked_in_today": lambda user_id, db: has_checked_in_today(user_id, db),
+    "journal_stats": lambda user_id, db: get_user_journal_stats(user_id, db),
+    "weekly_summary": lambda user_id, db: get_user_weekly_summary(user_id, db),
+    "goal": lambda user_id, db: _data(get_user_goal_data(user_id, db)),
+    "sentiment_trend": lambda user_id, db: _data(get_sentiment_analysis_data(user_id, db)),
+}
+
+
+async def _data(coro):
+    return (await coro)["data"]
+
+
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_slots() -> asyncio.Semaphore:
+    # Shared by every dashboard request of this worker, so concurrent
+    # dashboards queue for connections instead of draining the pool that
+    # crud requests need. Created lazily so it binds to the running loop
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(dashboard_connections())
+    return _slots
+
+
+async def _run_section(name: str, user_id: UUID):
+    async with _get_slots():
+        async with shards.session_for(user_id) as db:
+            return await SECTIONS[name](user_id, db)
+
+
+async def get_dashboard_data(user_id: UUID) -> dict:
+    """
+    Run every dashboard section concurrently under a shared timeout, which
+    includes waiting for a connection slot. Sections that time out or fail are returned as null and listed in
+    `errors`; a 404 from a section (no data yet) is just null.
+    """
+    names = list(SECTIONS)
+    results = await asyncio.gather(
+        *(
+            asyncio.wait_for(
+                _run_section(name, user_id), settings.DASHBOARD_SECTION_TIMEOUT_SECONDS
+            )
+            for name in names
+        ),
+        return_exceptions=True,
+    )
+
+    data, errors = {}, {}
+    for name, result in zip(names, results):
+        if isinstance(result, asyncio.TimeoutError):
+            data[name], errors[name] = None, "timeout"
+        elif isinstance(result, HTTPException):
+            data[name] = None
+            if result.status_code != status.HTTP_404_NOT_FOUND:
+                errors[name] = result.detail
+        elif isinstance(result, Exception):
+            data[name], errors[name] = None, str(result)
+        else:
+            data[name] = result
+
+    data["errors"] = errors
+    return data
@@ -1,92 +1,240 @@
+import base64
 from fastapi import status, HTTPException
-from typing import List, Dict
+from typing import List, Dict, Optional
 from uuid import UUID
-from sqlalchemy import text, select, and_
+from sqlalchemy import text, select, and_, func, case, cast, distinct, Date, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import date, datetime, timedelta, timezone
 from schemas.checkin import *
 from db.tables import Tables
+from db.session import shards
 from crud.insights import *
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import or_
-from openai import AsyncOpenAI, OpenAIError
 from core.config import settings
+from crud.summaries import build_insight_context
+from crud.sync import get_user_cursor
+from utils.llm import LLMError, complete
+from utils.local_insights import build_local_insights
+from utils.sentiment import get_sentiment_score
+from utils.fields import select_columns
+from utils.cache import TTLCache
 
-OPENAI_API_KEY = settings.OPENAI_API_KEY
 tables = Tables()
 
-openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
+async def get_journal_fingerprint(user_id: UUID, db: AsyncSession) -> dict:
+    """Cheap change detector for a user's journal: entry count plus the
+    highest change_seq, off the (user_id, change_seq) index. Every insert or
+    edit raises the latter and every delete lowers the former."""
+    journal_entries = tables.journal_entries
+
+    query = select(
+        func.count().label("entry_count"),
+        func.md5(
+            func.concat(func.count(), ":", func.coalesce(func.max(journal_entries.c.change_seq), 0))
+        ).label("fingerprint"),
+    ).where(journal_entries.c.user_id == user_id)
+
+    result = await db.execute(query)
+    row = result.mappings().first()
+    return {"entry_count": row["entry_count"], "fingerprint": row["fingerprint"]}
+
+
+async def get_cached_insights(user_id: UUID, fingerprint: str, db: AsyncSession):
+    insights = tables.journal_insights
+    expires_after = datetime.now(timezone.utc) - timedelta(
+        hours=settings.INSIGHTS_CACHE_TTL_HOURS
+    )
+
+    query = select(insights).where(
+        insights.c.user_id == user_id,
+        insights.c.fingerprint == fingerprint,
+        insights.c.generated_at > expires_after,
+    )
+    result = await db.execute(query)
+    return result.mappings().first()
+
+
+async def save_insights(
+    user_id: UUID, fingerprint: dict, data: dict, db: AsyncSession
+) -> dict:
+    insights = tables.journal_insights
+    values = {
+        "fingerprint": fingerprint["fingerprint"],
+        "entry_count": fingerprint["entry_count"],
+        "mood_summary": data["mood_summary"],
+        "focus_score": data["focus_score"],
+        "top_keywords": data["top_keywords"],
+        "generated_at": datetime.now(timezone.utc),
+    }
+
+    upsert_stmt = (
+        pg_insert(insights)
+        .values(user_id=user_id, **values)
+        .on_conflict_do_update(index_elements=[insights.c.user_id], set_=values)
+        .returning(insights)
+    )
+    result = await db.execute(upsert_stmt)
+    await db.commit()
+    return result.mappings().first()
+
+
+def _insights_payload(row, cached: bool) -> dict:
+    return {
+        "mood_summary": row["mood_summary"],
+        "focus_score": row["focus_score"],
+        "top_keywords": row["top_keywords"] or [],
+        "generated_at": row["generated_at"].isoformat(),
+        "cached": cached,
+        "engine": "openai",
+    }
+
+
+def parse_insight_response(parsed: str) -> dict:
+    lines = parsed.splitlines()
+
+    # Extract mood summary
+    mood_summary = (
+        next((line for line in lines if "mood" in line.lower()), "")
+        .split(":", 1)[-1]
+        .strip()
+    )
 
-async def generate_journal_insights(user_id: UUID, db: AsyncSession) -> dict:
+    # Extract and safely parse focus score
+    try:
+        focus_line = next((line for line in lines if "focus" in line.lower()), "Focus: 0")
+        raw_focus = focus_line.split(":")[-1].strip().split()[0]
+        focus_score = int(float(raw_focus))  # 💡 Safe parsing
+    except (ValueError, IndexError):
+        focus_score = 0  # Default to 0 if parsing fails
+
+    # Extract keywords
+    keywords_line = next((line for line in lines if "keyword" in line.lower()), "")
+    top_keywords = [
+        kw.strip().strip(".,") for kw in keywords_line.split(":")[-1].split(",") if kw.strip()
+    ]
+
+    return {
+        "mood_summary": mood_summary,
+        "focus_score": focus_score,
+        "top_keywords": top_keywords,
+    }
+
+
+async def generate_local_insights(user_id: UUID, db: AsyncSession) -> dict:
+    """Insights from the offline engine; milliseconds, no external calls."""
     journal_entries = tables.journal_entries
+    checkins = tables.daily_checkins
 
-    query = (
-        select(journal_entries)
+    journal_query = (
+        select(
+            func.concat_ws(
+                " ",
+                journal_entries.c.title,
+                func.left(journal_entries.c.content, settings.SUMMARY_ENTRY_CHARS),
+            ).label("text"),
+            journal_entries.c.mood,
+            journal_entries.c.focus_percent,
+        )
         .where(journal_entries.c.user_id == user_id)
         .order_by(journal_entries.c.created_at.desc())
+        .limit(settings.LOCAL_INSIGHTS_MAX_ENTRIES)
     )
-    result = await db.execute(query)
-    entries = [row.content for row in result.fetchall()]
+    journal_rows = (await db.execute(journal_query)).fetchall()
 
-    if not entries:
+    if not journal_rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="No journal entries found."
         )
 
-    combined_text = "\n".join(entries)[-4000:]
+    checkin_query = (
+        select(checkins.c.mood, checkins.c.focus_percent, checkins.c.note)
+        .where(checkins.c.user_id == user_id)
+        .order_by(checkins.c.date.desc())
+        .limit(settings.LOCAL_INSIGHTS_MAX_CHECKINS)
+    )
+    checkin_rows = (await db.execute(checkin_query)).fetchall()
 
-    prompt = f"""
-    You are a journal analysis assistant. Analyze the following journal content and provide:
-    1. A short summary of the user's overall mood.
-    2. A focus score from 0 to 100 based on how focused and productive the text sounds.
-    3. A list of the top 5 keywords that appear frequently.
+    # Check-ins are the daily signal; journal moods/focus fill in when there are none
+    mood_rows = checkin_rows or journal_rows
+    documents = [row.text for row in journal_rows]
+
+    data = build_local_insights(
+        documents=documents,
+        moods=[row.mood for row in mood_rows],
+        sentiments=[get_sentiment_score(row.note) for row in checkin_rows if row.note],
+        focus_history=[row.focus_percent for row in mood_rows],
+    )
+    data.update(
+        {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "cached": False,
+            "engine": "local",
+        }
+    )
+    return data
 
-    Journal Content:
-    {combined_text}
+
+async def generate_journal_insights(
+    user_id: UUID, db: AsyncSession, engine: str = "auto"
+) -> dict:
+    """
+    engine:
+        "openai" - LLM insights, 502 when the provider fails
+        "local"  - offline engine only
+        "auto"   - LLM insights, falling back to the offline engine on failure
     """
+    if engine == "local":
+        return await generate_local_insights(user_id, db)
 
-    try:
-        response = await openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
+    fingerprint = await get_journal_fingerprint(user_id, db)
+    if not fingerprint["entry_count"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No journal entries found."
         )
 
-        parsed = response.choices[0].message.content.strip()
-        lines = parsed.splitlines()
+    # Nothing changed since the last run and the result is still fresh
+    cached = await get_cached_insights(user_id, fingerprint["fingerprint"], db)
+    if cached:
+        return _insights_payload(cached, cached=True)
 
-        # Extract mood summary
-        mood_summary = (
-            next((line for line in lines if "mood" in line.lower()), "")
-            .split(":", 1)[-1]
-            .strip()
-        )
+    try:
+        # Built from stored weekly/monthly rollups; only changed weeks are re-summarized
+        context = await build_insight_context(user_id, db)
 
-        # Extract and safely parse focus score
-        try:
-            focus_line = next((line for line in lines if "focus" in line.lower()), "Focus: 0")
-            raw_focus = focus_line.split(":")[-1].strip().split()[0]
-            focus_score = int(float(raw_focus))  # 💡 Safe parsing
-        except (ValueError, IndexError):
-            focus_score = 0  # Default to 0 if parsing fails
-
-        # Extract keywords
-        keywords_line = next((line for line in lines if "keyword" in line.lower()), "")
-        top_keywords = [
-            kw.strip().strip(".,") for kw in keywords_line.split(":")[-1].split(",") if kw.strip()
-        ]
+        prompt = f"""
+    You are a journal analysis assistant. Analyze the following journal summaries
+    (most recent first) and provide:
+    1. A short summary of the user's overall mood.
+    2. A focus score from 0 to 100 based on how focused and productive the text sounds.
+    3. A list of the top 5 keywords that appear frequently.
 
-        return {
-            "mood_summary": mood_summary,
-            "focus_score": focus_score,
-            "top_keywords": top_keywords,
-        }
+    Journal Summaries:
+    {context}
+    """
 
-    except OpenAIError as e:
+        parsed = parse_insight_response(await complete(prompt))
+
+    except LLMError as e:
+        if engine == "auto":
+            return await generate_local_insights(user_id, db)
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail=f"OpenAI API error: {str(e)}",
         )
 
+    saved = await save_insights(user_id, fingerprint, parsed, db)
+    return _insights_payload(saved, cached=False)
+
+
+async def run_insight_job(user_id: UUID) -> dict:
+    """Job body: uses its own session so no request holds a connection
+    for the LLM round trip."""
+    async with shards.session_for(user_id) as db:
+        return await generate_journal_insights(user_id, db)
+
 
 async def get_top_journal_tags(user_id: int, db: AsyncSession) -> List[Dict[str, int]]:
     query = text(
@@ -165,31 +313,33 @@ async def search_journal_entries_by_keyword(
         )
 
 
-async def get_journal_calendar_data(user_id: UUID, db: AsyncSession) -> dict:
+CALENDAR_FIELDS = ("id", "note", "preview", "tags", "mood", "focus_percent")
+CALENDAR_DEFAULT_FIELDS = ("id", "note", "tags", "mood", "focus_percent")
+
+
+async def get_journal_calendar_data(
+    user_id: UUID, db: AsyncSession, fields: Optional[List[str]] = None
+) -> dict:
     checkins = tables.daily_checkins
+    fields = list(fields or CALENDAR_DEFAULT_FIELDS)
 
     query = (
-        select(checkins)
+        select(checkins.c.date, *select_columns(checkins, fields, preview_of="note"))
         .where(checkins.c.user_id == user_id)
         .order_by(checkins.c.date.desc())
     )
 
     try:
         result = await db.execute(query)
-        rows = result.fetchall()
+        rows = result.mappings().all()
 
         calendar_data = {}
         for row in rows:
-            date_str = row.date.isoformat()
-            calendar_data.setdefault(date_str, []).append(
-                {
-                    "id": str(row.id),
-                    "note": row.note,
-                    "tags": row.tags,
-                    "mood": row.mood,
-                    "focus_percent": row.focus_percent,
-                }
-            )
+            date_str = row["date"].isoformat()
+            item = {field: row[field] for field in fields}
+            if "id" in item:
+                item["id"] = str(item["id"])
+            calendar_data.setdefault(date_str, []).append(item)
 
         return calendar_data
 
@@ -198,3 +348,82 @@ async def get_journal_calendar_data(user_id: UUID, db: AsyncSession) -> dict:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch journal calendar data: {str(e)}",
         )
+
+
+# Year heatmap: one byte per day, mood code in the high nibble and focus
+# bucket in the low one (0 = no check-in / no focus), plus a bitmap of days
+# with journal entries (bit i of byte i // 8, least significant bit first)
+HEATMAP_MOODS = ("bad", "okay", "good", "great", "happy")
+HEATMAP_FOCUS_BUCKETS = 10  # 1 = 0-9%, ..., 10 = 90-100%
+
+_heatmap_cache = TTLCache(settings.HEATMAP_CACHE_SIZE, settings.HEATMAP_CACHE_TTL_SECONDS)
+
+
+async def get_year_heatmap(user_id: UUID, year: int, db: AsyncSession) -> dict:
+    checkins = tables.daily_checkins
+    journal_entries = tables.journal_entries
+    start = date(year, 1, 1)
+    end = date(year + 1, 1, 1)
+    days = (end - start).days
+
+    try:
+        cursor = await get_user_cursor(user_id, db)
+        cached = _heatmap_cache.get((user_id, year))
+        if cached is not None and cached["cursor"] == cursor:
+            return cached
+
+        mood_code = case(
+            {mood: code for code, mood in enumerate(HEATMAP_MOODS, 1)},
+            value=checkins.c.mood,
+            else_=0,
+        )
+        focus_bucket = case(
+            (checkins.c.focus_percent.is_(None), 0),
+            # Typed, so // stays integer division rather than FLOOR(x / 10) as float
+            else_=1 + func.least(checkins.c.focus_percent, 99, type_=Integer) // 10,
+        )
+        journal_day = cast(func.timezone("UTC", journal_entries.c.created_at), Date)
+        journal_days = (
+            select(func.array_agg(distinct(journal_day - start), type_=ARRAY(Integer)))
+            .where(
+                journal_entries.c.user_id == user_id,
+                journal_entries.c.created_at >= datetime(year, 1, 1, tzinfo=timezone.utc),
+                journal_entries.c.created_at < datetime(year + 1, 1, 1, tzinfo=timezone.utc),
+            )
+            .scalar_subquery()
+        )
+        query = select(
+            func.array_agg(checkins.c.date - start, type_=ARRAY(Integer)).label("days"),
+            func.array_agg(mood_code * 16 + focus_bucket, type_=ARRAY(Integer)).label("cells"),
+            journal_days.label("journal_days"),
+        ).where(
+            checkins.c.user_id == user_id,
+            checkins.c.date >= start,
+            checkins.c.date < end,
+        )
+        row = (await db.execute(query)).one()
+
+        cells = bytearray(days)
+        for day, cell in zip(row.days or (), row.cells or ()):
+            cells[day] = cell
+        bitmap = bytearray((days + 7) // 8)
+        for day in row.journal_days or ():
+            bitmap[day >> 3] |= 1 << (day & 7)
+
+        heatmap = {
+            "year": year,
+            "days": days,
+            "moods": list(HEATMAP_MOODS),
+            "focus_buckets": HEATMAP_FOCUS_BUCKETS,
+            "cells": base64.b64encode(bytes(cells)).decode(),
+            "journal": base64.b64encode(bytes(bitmap)).decode(),
+            "cursor": cursor,
+        }
+        _heatmap_cache.set((user_id, year), heatmap)
+        return heatmap
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to build journal heatmap: {str(e)}",
+        )
@@ -7,19 +7,49 @@ from fastapi import HTTPException
 from sqlalchemy import insert, update, delete, text
 from schemas.journal import *
 from db.tables import Tables
-from typing import Dict
+from typing import Dict, List, Optional
 from collections import Counter
 from datetime import date, timedelta
 from utils.sentiment import get_sentiment_score
+from utils.fields import select_columns
+from utils.stats import count_tags
 
 # Initialize table access
 tables = Tables()
 
+JOURNAL_FIELDS = (
+    "id",
+    "title",
+    "content",
+    "preview",
+    "mood",
+    "focus_percent",
+    "is_favorite",
+    "tags",
+    "created_at",
+)
+JOURNAL_SUMMARY_FIELDS = (
+    "id",
+    "title",
+    "preview",
+    "mood",
+    "focus_percent",
+    "is_favorite",
+    "tags",
+    "created_at",
+)
+
+
+async def get_journal_entries_by_user(
+    user_id: str, db: AsyncSession, fields: Optional[List[str]] = None
+):
+    journal_entries = tables.journal_entries
+    if fields:
+        query = select(*select_columns(journal_entries, fields, preview_of="content"))
+    else:
+        query = select(journal_entries)
 
-async def get_journal_entries_by_user(user_id: str, db: AsyncSession):
-    query = select(tables.journal_entries).where(
-        tables.journal_entries.c.user_id == user_id
-    )
+    query = query.where(journal_entries.c.user_id == user_id)
     result = await db.execute(query)
     return result.mappings().all()
 
@@ -76,11 +106,13 @@ async def update_journal_entry_service(
     if not existing_entry:
         raise HTTPException(status_code=404, detail="Entry not found")
 
+    # created_at narrows the write to one partition
     update_stmt = (
         update(tables.journal_entries)
         .where(
             tables.journal_entries.c.id == entry_id,
             tables.journal_entries.c.user_id == user_id,
+            tables.journal_entries.c.created_at == existing_entry["created_at"],
         )
         .values(**data.dict(exclude_unset=True))
         .returning(tables.journal_entries)
@@ -105,6 +137,7 @@ async def delete_journal_entry_service(entry_id: UUID, user_id: UUID, db: AsyncS
     delete_stmt = delete(tables.journal_entries).where(
         tables.journal_entries.c.id == entry_id,
         tables.journal_entries.c.user_id == user_id,
+        tables.journal_entries.c.created_at == entry["created_at"],
     )
     await db.execute(delete_stmt)
     await db.commit()
@@ -149,13 +182,7 @@ async def get_user_journal_stats(user_id: str, db: AsyncSession) -> Dict:
     )
 
     tag_result = await db.execute(tags_query, {"user_id": user_id})
-    tag_counter = {}
-    for row in tag_result.fetchall():
-        tag = row[0].strip().lower()
-        if tag:
-            tag_counter[tag] = tag_counter.get(tag, 0) + 1
-
-    top_tags = sorted(tag_counter.items(), key=lambda x: x[1], reverse=True)[:3]
+    top_tags = count_tags(tag_result.scalars(), normalize=True)[:3]
     top_tag_names = [tag for tag, _ in top_tags]
 
     return {
@@ -0,0 +1,338 @@
+import gzip
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import orjson
+from fastapi import HTTPException, status
+from sqlalchemy import Date, and_, cast, func, or_, select, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud.summaries import get_stored_summaries
+from crud.sync import get_user_cursor
+from db.session import shards
+from db.tables import Tables
+from utils.sentiment import get_sentiment_score
+from utils.stats import compute_streaks, count_tags
+
+tables = Tables()
+
+# Report kind -> length in months
+REPORT_KINDS = {"year": 12, "quarter": 3, "month": 1}
+REPORT_TOP_TAGS = 10
+
+PERIOD_FORMATS = {
+    "year": re.compile(r"^(\d{4})$"),
+    "quarter": re.compile(r"^(\d{4})-Q([1-4])$"),
+    "month": re.compile(r"^(\d{4})-(0[1-9]|1[0-2])$"),
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def parse_period(kind: str, period: str) -> Tuple[date, date]:
+    """[start, end) of a period written 2025, 2025-Q3 or 2025-07."""
+    match = PERIOD_FORMATS[kind].match(period)
+    if not match:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid {kind} period {period!r}",
+        )
+    year = int(match[1])
+    if kind == "year":
+        start = date(year, 1, 1)
+    elif kind == "quarter":
+        start = date(year, 3 * int(match[2]) - 2, 1)
+    else:
+        start = date(year, int(match[2]), 1)
+    return start, _add_months(start, REPORT_KINDS[kind])
+
+
+def period_months(start: date, end: date) -> List[date]:
+    months = []
+    month = start
+    while month < end:
+        months.append(month)
+        month = _add_months(month, 1)
+    return months
+
+
+def _utc(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+# ---------- Per-month partials ----------
+# Everything a report shows is derived from per-month sums and counters, so
+# a late check-in only costs rebuilding its month and re-merging.
+
+
+def _empty_month() -> dict:
+    return {
+        "checkins": 0,
+        "focus_sum": 0,
+        "focus_count": 0,
+        "moods": {},
+        "tags": {},
+        "sentiment_sum": 0.0,
+        "sentiment_count": 0,
+        "days_mask": 0,  # bit d - 1 set: checked in on day d
+        "journal_entries": 0,
+        "favorites": 0,
+        "journal_tags": {},
+    }
+
+
+def _month_ranges(column, months: Iterable[date], to_bound=lambda day: day):
+    # Bare-column ranges, so partitions are pruned
+    return or_(
+        *(and_(column >= to_bound(month), column < to_bound(_add_months(month, 1))) for month in months)
+    )
+
+
+async def build_months(user_id: UUID, months: List[date], db: AsyncSession) -> Dict[str, dict]:
+    checkins = tables.daily_checkins
+    journal_entries = tables.journal_entries
+    partials = {month: _empty_month() for month in months}
+
+    result = await db.execute(
+        select(
+            checkins.c.date,
+            checkins.c.mood,
+            checkins.c.focus_percent,
+            checkins.c.tags,
+            checkins.c.note,
+        ).where(checkins.c.user_id == user_id, _month_ranges(checkins.c.date, months))
+    )
+    tags: Dict[date, List[str]] = {month: [] for month in months}
+    for row in result:
+        month = row.date.replace(day=1)
+        partial = partials[month]
+        partial["checkins"] += 1
+        partial["days_mask"] |= 1 << (row.date.day - 1)
+        if row.focus_percent is not None:
+            partial["focus_sum"] += row.focus_percent
+            partial["focus_count"] += 1
+        if row.mood:
+            partial["moods"][row.mood] = partial["moods"].get(row.mood, 0) + 1
+        if row.note:
+            partial["sentiment_sum"] += get_sentiment_score(row.note)
+            partial["sentiment_count"] += 1
+        tags[month].extend(tag for tag in row.tags or () if tag)
+
+    result = await db.execute(
+        select(journal_entries.c.created_at, journal_entries.c.is_favorite, journal_entries.c.tags).where(
+            journal_entries.c.user_id == user_id,
+            _month_ranges(journal_entries.c.created_at, months, _utc),
+        )
+    )
+    journal_tags: Dict[date, List[str]] = {month: [] for month in months}
+    for row in result:
+        month = row.created_at.astimezone(timezone.utc).date().replace(day=1)
+        partial = partials[month]
+        partial["journal_entries"] += 1
+        partial["favorites"] += bool(row.is_favorite)
+        journal_tags[month].extend(tag for tag in row.tags or () if tag)
+
+    for month, partial in partials.items():
+        partial["tags"] = dict(count_tags(tags[month], normalize=True))
+        partial["journal_tags"] = dict(count_tags(journal_tags[month], normalize=True))
+    return {month.strftime("%Y-%m"): partial for month, partial in partials.items()}
+
+
+async def changed_months(
+    user_id: UUID, start: date, end: date, since: int, db: AsyncSession
+) -> Optional[Set[date]]:
+    """Months of [start, end) holding check-ins or journal entries written
+    after cursor `since`. None when one of those was deleted since: a
+    tombstone does not say which month the row was in."""
+    checkins = tables.daily_checkins
+    journal_entries = tables.journal_entries
+    tombstones = tables.sync_tombstones
+
+    deleted = await db.scalar(
+        select(
+            select(tombstones.c.change_seq)
+            .where(
+                tombstones.c.user_id == user_id,
+                tombstones.c.change_seq > since,
+                tombstones.c.table_name.in_(("daily_checkins", "journal_entries")),
+            )
+            .exists()
+        )
+    )
+    if deleted:
+        return None
+
+    query = union(
+        select(cast(func.date_trunc("month", checkins.c.date), Date)).where(
+            checkins.c.user_id == user_id,
+            checkins.c.change_seq > since,
+            checkins.c.date >= start,
+            checkins.c.date < end,
+        ),
+        select(
+            cast(func.date_trunc("month", func.timezone("UTC", journal_entries.c.created_at)), Date)
+        ).where(
+            journal_entries.c.user_id == user_id,
+            journal_entries.c.change_seq > since,
+            journal_entries.c.created_at >= _utc(start),
+            journal_entries.c.created_at < _utc(end),
+        ),
+    )
+    result = await db.execute(query)
+    return set(result.scalars())
+
+
+# ---------- Report document ----------
+
+
+def _top(counts: Counter) -> List[dict]:
+    return [{"tag": tag, "count": n} for tag, n in counts.most_common(REPORT_TOP_TAGS)]
+
+
+def summarize_months(months: Dict[str, dict]) -> dict:
+    focus_sum = focus_count = sentiment_count = 0
+    sentiment_sum = 0.0
+    moods, tags, journal_tags = Counter(), Counter(), Counter()
+    checkin_dates = []
+    best_month = None
+    best_focus = -1.0
+
+    for key, partial in sorted(months.items()):
+        focus_sum += partial["focus_sum"]
+        focus_count += partial["focus_count"]
+        sentiment_sum += partial["sentiment_sum"]
+        sentiment_count += partial["sentiment_count"]
+        moods.update(partial["moods"])
+        tags.update(partial["tags"])
+        journal_tags.update(partial["journal_tags"])
+
+        year, month = map(int, key.split("-"))
+        mask = partial["days_mask"]
+        checkin_dates.extend(
+            date(year, month, day + 1) for day in range(31) if mask >> day & 1
+        )
+        if partial["focus_count"]:
+            average = partial["focus_sum"] / partial["focus_count"]
+            if average > best_focus:
+                best_month, best_focus = key, average
+
+    _, longest_streak = compute_streaks(checkin_dates)
+    return {
+        "checkin_days": len(checkin_dates),
+        "longest_streak": longest_streak,
+        "average_focus": round(focus_sum / focus_count) if focus_count else None,
+        "best_focus_month": best_month,
+        "mood_distribution": dict(moods),
+        "most_common_mood": moods.most_common(1)[0][0] if moods else None,
+        "average_sentiment": round(sentiment_sum / sentiment_count, 2) if sentiment_count else None,
+        "top_tags": _top(tags),
+        "journal_entries": sum(partial["journal_entries"] for partial in months.values()),
+        "favorites": sum(partial["favorites"] for partial in months.values()),
+        "top_journal_tags": _top(journal_tags),
+    }
+
+
+def encode_report(report: dict) -> bytes:
+    # Stored as the complete response body, so serving it is a passthrough
+    body = {"message": "Report fetched successfully.", "data": report}
+    return gzip.compress(orjson.dumps(body), compresslevel=6)
+
+
+def decode_report(body: bytes) -> dict:
+    return orjson.loads(gzip.decompress(body))["data"]
+
+
+# ---------- Storage ----------
+
+
+async def get_stored_report(user_id: UUID, kind: str, start: date, db: AsyncSession):
+    reports = tables.user_reports
+    result = await db.execute(
+        select(reports.c.cursor, reports.c.body, reports.c.generated_at).where(
+            reports.c.user_id == user_id,
+            reports.c.kind == kind,
+            reports.c.period_start == start,
+        )
+    )
+    return result.first()
+
+
+async def save_report(
+    user_id: UUID, kind: str, start: date, end: date, cursor: int, body: bytes, db: AsyncSession
+):
+    reports = tables.user_reports
+    stmt = pg_insert(reports).values(
+        user_id=user_id,
+        kind=kind,
+        period_start=start,
+        period_end=end,
+        cursor=cursor,
+        body=body,
+        generated_at=func.now(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[reports.c.user_id, reports.c.kind, reports.c.period_start],
+        set_={
+            "cursor": stmt.excluded.cursor,
+            "body": stmt.excluded.body,
+            "generated_at": stmt.excluded.generated_at,
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def refresh_report(user_id: UUID, kind: str, period: str, db: AsyncSession) -> dict:
+    """
+    Build or bring up to date the stored report for `period`. A report
+    stored at the current change cursor is left alone; otherwise only the
+    months written to since its cursor are rebuilt (all of them after a
+    delete), and the totals are re-derived from the per-month partials.
+    """
+    start, end = parse_period(kind, period)
+    # Read first: anything written while building moves the cursor past it
+    cursor = await get_user_cursor(user_id, db)
+    stored = await get_stored_report(user_id, kind, start, db)
+    if stored is not None and stored.cursor == cursor:
+        return {"kind": kind, "period": period, "cursor": cursor, "rebuilt_months": 0}
+
+    months = period_months(start, end)
+    partials = {}
+    if stored is not None:
+        changed = await changed_months(user_id, start, end, stored.cursor, db)
+        if changed is not None:
+            partials = decode_report(stored.body)["months"]
+            months = sorted(changed)
+    partials.update(await build_months(user_id, months, db) if months else {})
+
+    summaries = await get_stored_summaries(user_id, "month", db)
+    report = {
+        "kind": kind,
+        "period": period,
+        "start": start.isoformat(),
+        "end": (end - timedelta(days=1)).isoformat(),
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "cursor": cursor,
+        "summary": summarize_months(partials),
+        "months": dict(sorted(partials.items())),
+        "monthly_summaries": {
+            month.strftime("%Y-%m"): row["summary"]
+            for month, row in sorted(summaries.items())
+            if start <= month < end
+        },
+    }
+    await save_report(user_id, kind, start, end, cursor, encode_report(report), db)
+    return {"kind": kind, "period": period, "cursor": cursor, "rebuilt_months": len(months)}
+
+
+async def run_report_job(user_id: UUID, kind: str, period: str) -> dict:
+    """Job body: builds on its own session, off the request path."""
+    async with shards.session_for(user_id) as db:
+        return await refresh_report(user_id, kind, period, db)
@@ -0,0 +1,316 @@
+import asyncio
+import hashlib
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List
+from uuid import UUID
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.tables import Tables
+from utils.llm import complete
+
+tables = Tables()
+
+# Rough chars-per-token ratio used to keep prompts inside the token budget
+CHARS_PER_TOKEN = 4
+
+WEEK_PROMPT = """
+Summarize the following journal entries from one week in 3-4 sentences.
+Mention the dominant mood, what the writer focused on and any recurring topics.
+
+Entries:
+{entries}
+"""
+
+MONTH_PROMPT = """
+Combine the following weekly journal summaries into one monthly summary of 3-4 sentences.
+Keep the overall mood trend, focus pattern and recurring topics.
+
+Weekly summaries:
+{summaries}
+"""
+
+
+def _md5(parts: List[str]) -> str:
+    return hashlib.md5("|".join(parts).encode()).hexdigest()
+
+
+def summary_window_start(today: date = None) -> date:
+    """Monday of the oldest of the SUMMARY_MAX_WEEKS weeks summarized, the
+    current (UTC) week included."""
+    today = today or datetime.now(timezone.utc).date()
+    return today - timedelta(days=today.weekday(), weeks=settings.SUMMARY_MAX_WEEKS - 1)
+
+
+async def get_week_fingerprints(user_id: UUID, start: date, db: AsyncSession) -> List[dict]:
+    """
+    Entry count and fingerprint per week since `start`, newest first. Like
+    get_journal_fingerprint in crud/insights.py, the fingerprint is the
+    count plus the highest change_seq: an insert or edit raises the latter,
+    a delete lowers the former, and no entry text is read. The created_at
+    bound keeps older history (and its partitions) out of the scan.
+    """
+    journal_entries = tables.journal_entries
+    week = func.date(
+        func.date_trunc("week", func.timezone("UTC", journal_entries.c.created_at))
+    ).label("week")
+
+    query = (
+        select(
+            week,
+            func.count().label("entry_count"),
+            func.md5(
+                func.concat(func.count(), ":", func.max(journal_entries.c.change_seq))
+            ).label("fingerprint"),
+        )
+        .where(
+            journal_entries.c.user_id == user_id,
+            journal_entries.c.created_at >= datetime.combine(start, time.min, tzinfo=timezone.utc),
+        )
+        .group_by(week)
+        .order_by(week.desc())
+    )
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def get_stored_summaries(user_id: UUID, period: str, db: AsyncSession) -> Dict[date, dict]:
+    summaries = tables.journal_summaries
+
+    query = (
+        select(
+            summaries.c.period_start,
+            summaries.c.summary,
+            summaries.c.entry_count,
+            summaries.c.fingerprint,
+        )
+        .where(summaries.c.user_id == user_id, summaries.c.period == period)
+        .order_by(summaries.c.period_start.desc())
+    )
+    result = await db.execute(query)
+    return {row["period_start"]: dict(row) for row in result.mappings().all()}
+
+
+async def fetch_week_entries(user_id: UUID, week_start: date, db: AsyncSession) -> List[dict]:
+    journal_entries = tables.journal_entries
+    start = datetime.combine(week_start, time.min, tzinfo=timezone.utc)
+
+    query = (
+        select(
+            journal_entries.c.title,
+            func.left(journal_entries.c.content, settings.SUMMARY_ENTRY_CHARS).label("content"),
+            journal_entries.c.mood,
+            journal_entries.c.created_at,
+        )
+        .where(
+            journal_entries.c.user_id == user_id,
+            journal_entries.c.created_at >= start,
+            journal_entries.c.created_at < start + timedelta(days=7),
+        )
+        .order_by(journal_entries.c.created_at.asc())
+        .limit(settings.SUMMARY_WEEK_ENTRY_LIMIT)
+    )
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def save_summary(
+    user_id: UUID,
+    period: str,
+    period_start: date,
+    summary: str,
+    entry_count: int,
+    fingerprint: str,
+    db: AsyncSession,
+):
+    summaries = tables.journal_summaries
+    values = {
+        "summary": summary,
+        "entry_count": entry_count,
+        "fingerprint": fingerprint,
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+    upsert_stmt = (
+        pg_insert(summaries)
+        .values(user_id=user_id, period=period, period_start=period_start, **values)
+        .on_conflict_do_update(
+            index_elements=[
+                summaries.c.user_id,
+                summaries.c.period,
+                summaries.c.period_start,
+            ],
+            set_=values,
+        )
+    )
+    await db.execute(upsert_stmt)
+
+
+async def complete_all(prompts: List[str]) -> list:
+    """
+    Completions for `prompts`, in order, with failures (LLMError) in place
+    of the text. At most OPENAI_MAX_CONCURRENCY run at a time, so each
+    call's deadline starts when it gets a slot rather than while the rest
+    of a 52-week first run queues ahead of it.
+    """
+    limit = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+
+    async def run(prompt):
+        async with limit:
+            return await complete(prompt)
+
+    return await asyncio.gather(*(run(prompt) for prompt in prompts), return_exceptions=True)
+
+
+def _format_entries(entries: List[dict]) -> str:
+    return "\n\n".join(
+        f"[{row['created_at']:%a %Y-%m-%d}] {row['title']} (mood: {row['mood'] or 'n/a'})\n"
+        f"{row['content'] or ''}"
+        for row in entries
+    )
+
+
+async def refresh_weekly_summaries(user_id: UUID, db: AsyncSession) -> Dict[date, dict]:
+    """Map step: summarize only the weeks whose entries changed since the
+    stored summary was written."""
+    start = summary_window_start()
+    weeks = await get_week_fingerprints(user_id, start, db)
+    stored = await get_stored_summaries(user_id, "week", db)
+
+    stale = [
+        week
+        for week in weeks
+        if stored.get(week["week"], {}).get("fingerprint") != week["fingerprint"]
+    ]
+
+    # Weeks in the window whose entries were all deleted
+    current = {week["week"] for week in weeks}
+    gone = [week for week in stored if week >= start and week not in current]
+    if gone:
+        summaries = tables.journal_summaries
+        await db.execute(
+            delete(summaries).where(
+                summaries.c.user_id == user_id,
+                summaries.c.period == "week",
+                summaries.c.period_start.in_(gone),
+            )
+        )
+        for week in gone:
+            stored.pop(week)
+
+    errors = []
+    if stale:
+        batches = [await fetch_week_entries(user_id, week["week"], db) for week in stale]
+        texts = await complete_all(
+            [WEEK_PROMPT.format(entries=_format_entries(batch)) for batch in batches]
+        )
+
+        for week, text in zip(stale, texts):
+            if isinstance(text, BaseException):
+                errors.append(text)
+                continue
+            await save_summary(
+                user_id, "week", week["week"], text, week["entry_count"], week["fingerprint"], db
+            )
+            stored[week["week"]] = {
+                "period_start": week["week"],
+                "summary": text,
+                "entry_count": week["entry_count"],
+                "fingerprint": week["fingerprint"],
+            }
+
+    if stale or gone:
+        # Weeks that did get summarized are kept; the next run retries the rest
+        await db.commit()
+    if errors:
+        raise errors[0]
+
+    return stored
+
+
+async def refresh_monthly_summaries(
+    user_id: UUID, weekly: Dict[date, dict], db: AsyncSession
+) -> Dict[date, dict]:
+    """Reduce step: roll weekly summaries up into months, again only for
+    months whose weekly inputs changed."""
+    by_month: Dict[date, List[dict]] = {}
+    for start in sorted(weekly):
+        by_month.setdefault(start.replace(day=1), []).append(weekly[start])
+
+    stored = await get_stored_summaries(user_id, "month", db)
+
+    stale = []
+    for month, weeks in by_month.items():
+        fingerprint = _md5([week["fingerprint"] for week in weeks])
+        if stored.get(month, {}).get("fingerprint") != fingerprint:
+            stale.append((month, weeks, fingerprint))
+
+    errors = []
+    if stale:
+        texts = await complete_all(
+            [
+                MONTH_PROMPT.format(
+                    summaries="\n\n".join(
+                        f"Week of {week['period_start']}: {week['summary']}" for week in weeks
+                    )
+                )
+                for _, weeks, _ in stale
+            ]
+        )
+
+        for (month, weeks, fingerprint), text in zip(stale, texts):
+            if isinstance(text, BaseException):
+                errors.append(text)
+                continue
+            entry_count = sum(week["entry_count"] for week in weeks)
+            await save_summary(user_id, "month", month, text, entry_count, fingerprint, db)
+            stored[month] = {
+                "period_start": month,
+                "summary": text,
+                "entry_count": entry_count,
+                "fingerprint": fingerprint,
+            }
+        await db.commit()
+    if errors:
+        raise errors[0]
+
+    return {month: stored[month] for month in by_month if month in stored}
+
+
+async def build_insight_context(user_id: UUID, db: AsyncSession) -> str:
+    """
+    Build the insight prompt context from stored rollups, newest first:
+    the weekly summaries of the current month, then monthly summaries for
+    older months, until the token budget is spent.
+    """
+    weekly = await refresh_weekly_summaries(user_id, db)
+    monthly = await refresh_monthly_summaries(user_id, weekly, db)
+
+    if not weekly:
+        return ""
+
+    current_month = max(weekly).replace(day=1)
+    sections = [
+        f"Week of {start}: {weekly[start]['summary']}"
+        for start in sorted(weekly, reverse=True)
+        if start >= current_month
+    ]
+    sections += [
+        f"Month of {month:%B %Y}: {monthly[month]['summary']}"
+        for month in sorted(monthly, reverse=True)
+        if month < current_month
+    ]
+
+    budget = settings.INSIGHTS_TOKEN_BUDGET * CHARS_PER_TOKEN
+    context = []
+    for section in sections:
+        if len(section) > budget:
+            context.append(section[:budget])
+            break
+        context.append(section)
+        budget -= len(section) + 1
+
+    return "\n".join(context)
@@ -0,0 +1,102 @@
+import heapq
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.tables import Tables
+
+tables = Tables()
+
+# response key -> table; every synced table carries user_id and change_seq
+# (database/V8__delta_sync.sql)
+SYNC_TABLES = {
+    "journal_entries": "journal_entries",
+    "checkins": "daily_checkins",
+    "goals": "goals",
+}
+
+
+async def _tombstones_pruned_through(db: AsyncSession) -> int:
+    state = tables.sync_state
+    value = await db.scalar(
+        select(state.c.value).where(state.c.key == "tombstones_pruned_through")
+    )
+    return value or 0
+
+
+async def get_user_cursor(user_id: UUID, db: AsyncSession) -> int:
+    """Highest change cursor across the user's check-ins, journal entries and
+    deletes: three index-only lookups, and it moves on every write. Cached
+    per-user artifacts (heatmaps, reports) are valid while it stays put."""
+    cursors = [
+        select(func.max(table.c.change_seq)).where(table.c.user_id == user_id).scalar_subquery()
+        for table in (tables.daily_checkins, tables.journal_entries, tables.sync_tombstones)
+    ]
+    return await db.scalar(select(func.coalesce(func.greatest(*cursors), 0)))
+
+
+async def get_changes(user_id: UUID, since: int, limit: int, db: AsyncSession) -> dict:
+    """
+    Rows changed and deleted after cursor `since`, oldest first, at most
+    `limit` across all synced tables. Each source is read with an index
+    range scan for at most limit + 1 rows; merging those gives the global
+    first `limit` changes and tells whether more remain.
+
+    since=0 is an initial sync: every live row, no tombstones. A cursor
+    older than the pruned tombstones cannot be brought up to date and gets
+    `reset: true`, telling the client to drop local state and start from 0.
+
+    All reads share one REPEATABLE READ snapshot. Under READ COMMITTED each
+    would see its own, and a journal entry and then a check-in committed
+    between the journal and check-in reads would return the check-in's
+    cursor without the entry below it. Writes for a user are serialized
+    (sync_lock_user), so within a snapshot the cursor has no gaps.
+    """
+    # Ends the transaction the caller's user lookup began, so the next one
+    # can start with the isolation level
+    await db.rollback()
+    await db.connection(
+        execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+    )
+
+    if since and since < await _tombstones_pruned_through(db):
+        return {"reset": True, "cursor": 0, "has_more": True}
+
+    streams = []
+    for key, table_name in SYNC_TABLES.items():
+        table = getattr(tables, table_name)
+        result = await db.execute(
+            select(table)
+            .where(table.c.user_id == user_id, table.c.change_seq > since)
+            .order_by(table.c.change_seq)
+            .limit(limit + 1)
+        )
+        streams.append([(row["change_seq"], key, row) for row in result.mappings()])
+
+    if since:
+        tombstones = tables.sync_tombstones
+        result = await db.execute(
+            select(tombstones.c.change_seq, tombstones.c.table_name, tombstones.c.row_id)
+            .where(tombstones.c.user_id == user_id, tombstones.c.change_seq > since)
+            .order_by(tombstones.c.change_seq)
+            .limit(limit + 1)
+        )
+        streams.append([(row.change_seq, "deleted", row) for row in result])
+
+    changes = list(heapq.merge(*streams, key=lambda change: change[0]))
+    page = changes[:limit]
+
+    data = {key: [] for key in SYNC_TABLES}
+    data["deleted"] = []
+    table_keys = {table_name: key for key, table_name in SYNC_TABLES.items()}
+    for _, key, row in page:
+        if key == "deleted":
+            data["deleted"].append({"type": table_keys[row.table_name], "id": row.row_id})
+        else:
+            data[key].append(row)
+
+    data["cursor"] = page[-1][0] if page else since
+    data["has_more"] = len(changes) > limit
+    data["reset"] = False
+    return data
@@ -0,0 +1,79 @@
+import asyncio
+import uuid
+
+from sqlalchemy import delete, insert, select
+
+from db.session import shards
+from db.tables import Tables
+
+tables = Tables()
+
+
+async def find_user(*criteria):
+    """
+    The users row matching `criteria` (email, OAuth provider id), wherever
+    it lives. Callers only know the user id after this, so every shard is
+    asked at once; with a single database it is one query.
+    """
+
+    async def lookup(name):
+        async with shards.sessionmakers[name]() as db:
+            result = await db.execute(select(tables.users).where(*criteria))
+            return result.first()
+
+    rows = await asyncio.gather(*(lookup(name) for name in shards.names))
+    return next((row for row in rows if row is not None), None)
+
+
+async def find_user_by_email(email: str):
+    """
+    The users row for `email`: its id from the user_directory on the home
+    shard, then the row from that user's shard. Users not in the directory
+    yet (see `python -m scripts.reshard directory`) are looked up on every
+    shard instead.
+    """
+    directory = tables.user_directory
+    async with shards.sessionmakers[shards.home]() as db:
+        user_id = await db.scalar(select(directory.c.user_id).where(directory.c.email == email))
+    if user_id is None:
+        return await find_user(tables.users.c.email == email)
+    async with shards.session_for(user_id) as db:
+        result = await db.execute(select(tables.users).where(tables.users.c.id == user_id))
+        return result.first()
+
+
+async def insert_user(**values):
+    """
+    Insert a users row on the shard its (new) id maps to; returns the row.
+
+    users.email is only unique within one database, so the email is first
+    claimed in the user_directory on the home shard. A taken email raises
+    IntegrityError there, before anything is written on the user's shard.
+    When that shard is the home shard both inserts share a transaction;
+    otherwise the claim is committed first and released if the users
+    insert fails.
+    """
+    values.setdefault("id", uuid.uuid4())
+    directory = tables.user_directory
+    claim = insert(directory).values(email=values["email"], user_id=values["id"])
+    returning = insert(tables.users).values(**values).returning(tables.users)
+
+    if shards.shard_for(values["id"]) == shards.home:
+        async with shards.session_for(values["id"]) as db:
+            await db.execute(claim)
+            result = await db.execute(returning)
+            await db.commit()
+            return result.first()
+
+    async with shards.sessionmakers[shards.home]() as home:
+        await home.execute(claim)
+        await home.commit()
+        try:
+            async with shards.session_for(values["id"]) as db:
+                result = await db.execute(returning)
+                await db.commit()
+                return result.first()
+        except BaseException:
+            await home.execute(delete(directory).where(directory.c.user_id == values["id"]))
+            await home.commit()
+            raise
@@ -0,0 +1,199 @@
+-- Monthly range partitioning for journal_entries (created_at) and
+-- daily_checkins (date).
+--
+-- Existing tables are migrated online: this file creates partitioned shadow
+-- tables (<table>_partitioned) and mirrors every write into them with a
+-- trigger; `python -m scripts.partitions backfill` copies history in small
+-- batches and `... swap` renames the shadow into place in one short
+-- transaction. Empty tables (fresh installs) are swapped right here.
+--
+-- Partitions are <table>_pYYYYMM. ensure_monthly_partitions() runs at startup
+-- and should also run daily (cron / pg_cron) so future months always exist;
+-- rows outside every partition land in <table>_default.
+
+-- Rows with a NULL partition key could not be routed
+UPDATE journal_entries SET created_at = now() WHERE created_at IS NULL;
+
+CREATE TABLE IF NOT EXISTS journal_entries_partitioned (
+    LIKE journal_entries INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    PRIMARY KEY (id, created_at),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX IF NOT EXISTS ix_journal_entries_part_user_created
+    ON journal_entries_partitioned (user_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_journal_entries_part_user_change
+    ON journal_entries_partitioned (user_id, change_seq);
+CREATE TABLE IF NOT EXISTS journal_entries_default
+    PARTITION OF journal_entries_partitioned DEFAULT;
+
+CREATE TABLE IF NOT EXISTS daily_checkins_partitioned (
+    LIKE daily_checkins INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    PRIMARY KEY (id, date),
+    UNIQUE (user_id, date),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) PARTITION BY RANGE (date);
+
+CREATE INDEX IF NOT EXISTS ix_daily_checkins_part_user_change
+    ON daily_checkins_partitioned (user_id, change_seq);
+CREATE INDEX IF NOT EXISTS ix_daily_checkins_part_mood ON daily_checkins_partitioned (mood);
+CREATE INDEX IF NOT EXISTS ix_daily_checkins_part_focus ON daily_checkins_partitioned (focus_percent);
+CREATE TABLE IF NOT EXISTS daily_checkins_default
+    PARTITION OF daily_checkins_partitioned DEFAULT;
+
+-- Creates the partition of `parent` for the month containing `month`;
+-- returns its name, or NULL if it already exists. Rows of that month already
+-- sitting in the default partition are moved into it (on the live table they
+-- pass through the sync triggers and reach clients as a delete + re-insert).
+CREATE OR REPLACE FUNCTION create_monthly_partition(parent REGCLASS, month DATE) RETURNS TEXT AS $$
+DECLARE
+    base TEXT := regexp_replace(parent::text, '_partitioned$', '');
+    start_month DATE := date_trunc('month', month)::date;
+    end_month DATE := (date_trunc('month', month) + interval '1 month')::date;
+    partition_name TEXT := format('%s_p%s', base, to_char(start_month, 'YYYYMM'));
+    default_name TEXT := base || '_default';
+    key_column TEXT;
+    key_type REGTYPE;
+    lower_bound TEXT;
+    upper_bound TEXT;
+    stranded BOOLEAN;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT a.attname, a.atttypid::regtype INTO key_column, key_type
+    FROM pg_partitioned_table p
+    JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+    WHERE p.partrelid = parent;
+
+    IF key_type = 'date'::regtype THEN
+        lower_bound := start_month::text;
+        upper_bound := end_month::text;
+    ELSE
+        -- timestamptz: month boundaries in UTC
+        lower_bound := (start_month::timestamp AT TIME ZONE 'UTC')::text;
+        upper_bound := (end_month::timestamp AT TIME ZONE 'UTC')::text;
+    END IF;
+
+    EXECUTE format(
+        'SELECT EXISTS (SELECT 1 FROM %I WHERE %I >= %L AND %I < %L)',
+        default_name, key_column, lower_bound, key_column, upper_bound
+    ) INTO stranded;
+    IF stranded THEN
+        EXECUTE format('CREATE TEMP TABLE %I (LIKE %s)', partition_name || '_stranded', parent);
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            default_name, key_column, lower_bound, key_column, upper_bound,
+            partition_name || '_stranded'
+        );
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+        partition_name, parent, lower_bound, upper_bound
+    );
+
+    IF stranded THEN
+        EXECUTE format('INSERT INTO %s SELECT * FROM %I', parent, partition_name || '_stranded');
+        EXECUTE format('DROP TABLE %I', partition_name || '_stranded');
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions from `from_month` through `months_ahead` months past the current
+-- one. No-op (returns 0) when `parent` is not partitioned yet.
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent REGCLASS, from_month DATE, months_ahead INT)
+RETURNS INT AS $$
+DECLARE
+    month DATE := date_trunc('month', from_month)::date;
+    last_month DATE := (date_trunc('month', now()) + make_interval(months => months_ahead))::date;
+    created INT := 0;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = parent) THEN
+        RETURN 0;
+    END IF;
+    WHILE month <= last_month LOOP
+        IF create_monthly_partition(parent, month) IS NOT NULL THEN
+            created := created + 1;
+        END IF;
+        month := (month + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row triggers on a partitioned table see the partition in TG_TABLE_NAME, so
+-- the logical table name is passed as an argument
+CREATE OR REPLACE FUNCTION sync_record_delete() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM sync_lock_user(OLD.user_id);
+    INSERT INTO sync_tombstones (user_id, table_name, row_id)
+    VALUES (OLD.user_id, COALESCE(TG_ARGV[0], TG_TABLE_NAME), OLD.id);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Mirror writes on the live table into its shadow while the backfill runs.
+-- Runs AFTER the sync trigger, so change_seq / updated_at are carried over.
+CREATE OR REPLACE FUNCTION mirror_to_partitioned() RETURNS TRIGGER AS $$
+DECLARE
+    shadow TEXT := TG_TABLE_NAME || '_partitioned';
+    key_column TEXT := TG_ARGV[0];
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        EXECUTE format('DELETE FROM %I WHERE id = ($1).id AND %I = ($1).%I', shadow, key_column, key_column)
+        USING OLD;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        EXECUTE format('INSERT INTO %I SELECT ($1).* ON CONFLICT DO NOTHING', shadow) USING NEW;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_journal_entries_mirror ON journal_entries;
+CREATE TRIGGER trg_journal_entries_mirror AFTER INSERT OR UPDATE OR DELETE ON journal_entries
+    FOR EACH ROW EXECUTE FUNCTION mirror_to_partitioned('created_at');
+DROP TRIGGER IF EXISTS trg_daily_checkins_mirror ON daily_checkins;
+CREATE TRIGGER trg_daily_checkins_mirror AFTER INSERT OR UPDATE OR DELETE ON daily_checkins
+    FOR EACH ROW EXECUTE FUNCTION mirror_to_partitioned('date');
+
+-- Swap the backfilled shadow into place. The old table is kept as
+-- <name>_unpartitioned for rollback; drop it once satisfied.
+CREATE OR REPLACE FUNCTION finish_partition_migration(name TEXT) RETURNS VOID AS $$
+BEGIN
+    EXECUTE format('LOCK TABLE %I, %I IN ACCESS EXCLUSIVE MODE', name, name || '_partitioned');
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', 'trg_' || name || '_mirror', name);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', 'trg_' || name || '_sync', name);
+    EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', 'trg_' || name || '_tombstone', name);
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', name, name || '_unpartitioned');
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', name || '_partitioned', name);
+    EXECUTE format(
+        'CREATE TRIGGER %I BEFORE INSERT OR UPDATE ON %I FOR EACH ROW EXECUTE FUNCTION sync_touch_row()',
+        'trg_' || name || '_sync', name
+    );
+    EXECUTE format(
+        'CREATE TRIGGER %I AFTER DELETE ON %I FOR EACH ROW EXECUTE FUNCTION sync_record_delete(%L)',
+        'trg_' || name || '_tombstone', name, name
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Months from now on exist before the mirror starts writing; history is
+-- created by the backfill
+SELECT ensure_monthly_partitions('journal_entries_partitioned', current_date, 3);
+SELECT ensure_monthly_partitions('daily_checkins_partitioned', current_date, 3);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM journal_entries) THEN
+        PERFORM finish_partition_migration('journal_entries');
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM daily_checkins) THEN
+        PERFORM finish_partition_migration('daily_checkins');
+    END IF;
+END;
+$$;
@@ -0,0 +1,21 @@
+-- Global change-cursor indexes for incremental exports (scripts/export_parquet.py).
+-- The sync indexes lead with user_id, so "every row after cursor N" across
+-- all users would otherwise scan the whole table. Covers the partitioned
+-- shadows too while a V10 migration is still in progress.
+DO $$
+DECLARE
+    name TEXT;
+BEGIN
+    FOREACH name IN ARRAY ARRAY[
+        'journal_entries', 'journal_entries_partitioned',
+        'daily_checkins', 'daily_checkins_partitioned',
+        'goals'
+    ] LOOP
+        IF to_regclass(name) IS NOT NULL THEN
+            EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON %I (change_seq)', 'ix_' || name || '_change_seq', name);
+        END IF;
+    END LOOP;
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS ix_user_streaks_updated_at ON user_streaks (updated_at);
@@ -0,0 +1,17 @@
+-- Precomputed long-range reports (crud/reports.py): one gzip-compressed JSON
+-- artifact per user and period, and the change cursor it reflects. Writes
+-- after that cursor mark it stale; the next refresh rebuilds only the
+-- months they touched.
+CREATE TABLE IF NOT EXISTS user_reports (
+    user_id UUID NOT NULL,
+    kind VARCHAR(10) NOT NULL CHECK (kind IN ('year', 'quarter', 'month')),
+    period_start DATE NOT NULL,
+    period_end DATE NOT NULL,     -- exclusive
+    cursor BIGINT NOT NULL,
+    body BYTEA NOT NULL,
+    generated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+
+    PRIMARY KEY (user_id, kind, period_start),
+
+    CONSTRAINT fk_user_report FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
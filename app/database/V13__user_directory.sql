@@ -0,0 +1,15 @@
+-- Email -> user id for the users of every shard (db/shards.py). Only the
+-- copy on the home shard is used: emails are unique per database, so a
+-- registration first claims its email here, where two concurrent claims
+-- collide even when the users rows would land on different shards.
+CREATE TABLE IF NOT EXISTS user_directory (
+    email VARCHAR PRIMARY KEY,
+    user_id UUID NOT NULL UNIQUE,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+
+-- Existing users of this database. With several shards, fill the home
+-- shard's directory from all of them: python -m scripts.reshard directory
+INSERT INTO user_directory (email, user_id)
+SELECT email, id FROM users
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,29 @@
+-- Background jobs (core/jobs.py), shared by every worker process. Only the
+-- table on the home shard (db/shards.py) is used. Any worker claims the
+-- next due job with FOR UPDATE SKIP LOCKED and holds it for a lease; a job
+-- whose worker died is claimed again once the lease runs out.
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    kind VARCHAR(32) NOT NULL,
+    key VARCHAR NOT NULL,             -- coalescing key
+    owner VARCHAR NOT NULL,
+    params JSONB NOT NULL DEFAULT '{}',
+    status VARCHAR(10) NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    attempts INT NOT NULL DEFAULT 0,
+    result JSONB,
+    error TEXT,
+    error_status INT,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT now(),  -- retry backoff
+    locked_until TIMESTAMPTZ,                       -- lease of a running job
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ
+);
+
+-- One queued or running job per key: concurrent submits coalesce
+CREATE UNIQUE INDEX IF NOT EXISTS ux_jobs_active_key ON jobs (key)
+    WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS ix_jobs_active ON jobs (created_at)
+    WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS ix_jobs_finished_at ON jobs (finished_at)
+    WHERE finished_at IS NOT NULL;
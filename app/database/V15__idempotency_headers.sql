@@ -0,0 +1,5 @@
+-- Response headers replayed with a stored idempotent response (Location,
+-- ETag, Content-Type, ...), as a JSON array of [name, value] pairs in the
+-- order they were sent. NULL on rows stored before this column existed,
+-- which fall back to content_type.
+ALTER TABLE idempotency_keys ADD COLUMN IF NOT EXISTS headers JSONB;
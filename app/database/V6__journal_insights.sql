@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS journal_insights (
+    user_id UUID PRIMARY KEY,
+    fingerprint VARCHAR(32) NOT NULL, -- md5 over the entries that fed the insight
+    entry_count INT NOT NULL DEFAULT 0,
+    mood_summary TEXT,
+    focus_score INT,
+    top_keywords TEXT[] DEFAULT '{}',
+    generated_at TIMESTAMPTZ DEFAULT now(),
+
+    CONSTRAINT fk_user_insights FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
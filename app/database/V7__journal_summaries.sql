@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS journal_summaries (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    period VARCHAR(10) NOT NULL CHECK (period IN ('week', 'month')),
+    period_start DATE NOT NULL,   -- Monday of the week / first day of the month
+    summary TEXT NOT NULL,
+    entry_count INT NOT NULL DEFAULT 0,
+    fingerprint VARCHAR(32) NOT NULL, -- md5 of the inputs the summary was built from
+    updated_at TIMESTAMPTZ DEFAULT now(),
+
+    UNIQUE(user_id, period, period_start),
+
+    CONSTRAINT fk_user_summary FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Range fetches of a single week's entries
+CREATE INDEX IF NOT EXISTS ix_journal_entries_user_created ON journal_entries (user_id, created_at);
@@ -0,0 +1,124 @@
+-- Delta sync: updated_at on every user table, a global change cursor on the
+-- synced tables (journal_entries, daily_checkins, goals) and tombstones for
+-- hard deletes, so clients can ask for "everything after cursor N".
+
+CREATE SEQUENCE IF NOT EXISTS sync_change_seq;
+
+-- Existing rows get distinct cursor values from the column default
+ALTER TABLE journal_entries
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT nextval('sync_change_seq');
+UPDATE journal_entries SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE journal_entries ALTER COLUMN updated_at SET DEFAULT now();
+
+ALTER TABLE daily_checkins
+    ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT nextval('sync_change_seq');
+
+ALTER TABLE goals
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now(),
+    ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT nextval('sync_change_seq');
+
+CREATE INDEX IF NOT EXISTS ix_journal_entries_user_change ON journal_entries (user_id, change_seq);
+CREATE INDEX IF NOT EXISTS ix_daily_checkins_user_change ON daily_checkins (user_id, change_seq);
+CREATE INDEX IF NOT EXISTS ix_goals_user_change ON goals (user_id, change_seq);
+
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    change_seq BIGINT PRIMARY KEY DEFAULT nextval('sync_change_seq'),
+    user_id UUID NOT NULL,          -- no FK: rows outlive a cascading user delete
+    table_name VARCHAR(32) NOT NULL,
+    row_id UUID NOT NULL,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_sync_tombstones_user_change ON sync_tombstones (user_id, change_seq);
+
+-- Highest tombstone cursor removed by prune_sync_tombstones(); clients
+-- behind it must do a full resync
+CREATE TABLE IF NOT EXISTS sync_state (
+    key VARCHAR(32) PRIMARY KEY,
+    value BIGINT NOT NULL
+);
+INSERT INTO sync_state (key, value) VALUES ('tombstones_pruned_through', 0)
+ON CONFLICT (key) DO NOTHING;
+
+-- Writes for one user are serialized on a transaction-scoped advisory lock
+-- before taking a cursor value, so per user the cursor order is the commit
+-- order and a reader can never see N+1 committed while N is still in flight.
+CREATE OR REPLACE FUNCTION sync_lock_user(uid UUID) RETURNS VOID AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtextextended(uid::text, 0));
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_touch_row() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM sync_lock_user(NEW.user_id);
+    NEW.updated_at := now();
+    NEW.change_seq := nextval('sync_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION sync_record_delete() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM sync_lock_user(OLD.user_id);
+    INSERT INTO sync_tombstones (user_id, table_name, row_id)
+    VALUES (OLD.user_id, TG_TABLE_NAME, OLD.id);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_journal_entries_sync ON journal_entries;
+CREATE TRIGGER trg_journal_entries_sync BEFORE INSERT OR UPDATE ON journal_entries
+    FOR EACH ROW EXECUTE FUNCTION sync_touch_row();
+DROP TRIGGER IF EXISTS trg_journal_entries_tombstone ON journal_entries;
+CREATE TRIGGER trg_journal_entries_tombstone AFTER DELETE ON journal_entries
+    FOR EACH ROW EXECUTE FUNCTION sync_record_delete();
+
+DROP TRIGGER IF EXISTS trg_daily_checkins_sync ON daily_checkins;
+CREATE TRIGGER trg_daily_checkins_sync BEFORE INSERT OR UPDATE ON daily_checkins
+    FOR EACH ROW EXECUTE FUNCTION sync_touch_row();
+DROP TRIGGER IF EXISTS trg_daily_checkins_tombstone ON daily_checkins;
+CREATE TRIGGER trg_daily_checkins_tombstone AFTER DELETE ON daily_checkins
+    FOR EACH ROW EXECUTE FUNCTION sync_record_delete();
+
+DROP TRIGGER IF EXISTS trg_goals_sync ON goals;
+CREATE TRIGGER trg_goals_sync BEFORE INSERT OR UPDATE ON goals
+    FOR EACH ROW EXECUTE FUNCTION sync_touch_row();
+DROP TRIGGER IF EXISTS trg_goals_tombstone ON goals;
+CREATE TRIGGER trg_goals_tombstone AFTER DELETE ON goals
+    FOR EACH ROW EXECUTE FUNCTION sync_record_delete();
+
+-- Not synced, but keep updated_at honest
+DROP TRIGGER IF EXISTS trg_users_touch ON users;
+CREATE TRIGGER trg_users_touch BEFORE UPDATE ON users
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+DROP TRIGGER IF EXISTS trg_user_streaks_touch ON user_streaks;
+CREATE TRIGGER trg_user_streaks_touch BEFORE UPDATE ON user_streaks
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+-- Run periodically (cron / pg_cron): SELECT prune_sync_tombstones(interval '90 days');
+CREATE OR REPLACE FUNCTION prune_sync_tombstones(retention INTERVAL) RETURNS BIGINT AS $$
+DECLARE
+    pruned_through BIGINT;
+BEGIN
+    WITH pruned AS (
+        DELETE FROM sync_tombstones WHERE deleted_at < now() - retention
+        RETURNING change_seq
+    )
+    SELECT max(change_seq) INTO pruned_through FROM pruned;
+
+    IF pruned_through IS NOT NULL THEN
+        UPDATE sync_state SET value = GREATEST(value, pruned_through)
+        WHERE key = 'tombstones_pruned_through';
+    END IF;
+    RETURN pruned_through;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,28 @@
+-- Idempotency-Key store (core/idempotency.py): one row per (user, key) with a
+-- hash of the original request and the response it got. status_code is NULL
+-- while the first request is still in flight.
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    user_id UUID NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    request_hash BYTEA NOT NULL,
+    status_code SMALLINT,
+    content_type VARCHAR(100),
+    body BYTEA,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (user_id, key)
+);
+
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);
+
+-- Expired keys are reclaimed on reuse; run periodically (cron / pg_cron) to
+-- drop the rest: SELECT prune_idempotency_keys();
+CREATE OR REPLACE FUNCTION prune_idempotency_keys() RETURNS BIGINT AS $$
+DECLARE
+    pruned BIGINT;
+BEGIN
+    DELETE FROM idempotency_keys WHERE expires_at < now();
+    GET DIAGNOSTICS pruned = ROW_COUNT;
+    RETURN pruned;
+END;
+$$ LANGUAGE plpgsql;
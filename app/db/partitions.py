@@ -0,0 +1,27 @@
+# db/partitions.py
+from sqlalchemy import text
+
+from core.config import settings
+from db.session import shards
+
+# Monthly range-partitioned tables and their partition keys
+# (database/V10__partition_time_series.sql)
+PARTITIONED_TABLES = {
+    "journal_entries": "created_at",
+    "daily_checkins": "date",
+}
+
+
+async def ensure_partitions(months_ahead: int = settings.PARTITION_MONTHS_AHEAD) -> int:
+    """Create any missing partitions up to `months_ahead` months out, on every
+    shard, for the partitioned tables and for shadows still being backfilled."""
+    created = 0
+    for engine in shards.engines.values():
+        async with engine.begin() as conn:
+            for table in PARTITIONED_TABLES:
+                for name in (table, f"{table}_partitioned"):
+                    created += await conn.scalar(
+                        text("SELECT ensure_monthly_partitions(to_regclass(:name), current_date, :months)"),
+                        {"name": name, "months": months_ahead},
+                    )
+    return created
@@ -1,12 +1,25 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from core.config import settings
+from core.security import bearer_subject
+from db.shards import ShardRouter, shard_urls
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_async_engine(DATABASE_URL, echo=False)
-async_session = async_sessionmaker(engine, expire_on_commit=False)
+shards = ShardRouter(shard_urls(), settings.SHARD_VNODES)
+
+# Home shard: the only database unless DATABASE_SHARDS is set
+engine = shards.engines[shards.home]
+async_session = shards.sessionmakers[shards.home]
 
 
-async def get_db() -> AsyncSession:
-    async with async_session() as session:
+async def get_db(request: Request) -> AsyncSession:
+    # Session on the shard of the user the bearer token names; requests
+    # without one (login, registration, OAuth) start on the home shard
+    user_id = bearer_subject(request.headers.get("authorization"))
+    sessionmaker = (
+        shards.sessionmakers[shards.shard_for(user_id)] if user_id else async_session
+    )
+    async with sessionmaker() as session:
         yield session
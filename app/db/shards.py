@@ -0,0 +1,82 @@
+# db/shards.py
+"""
+User-id sharding across several Postgres databases.
+
+Every shard carries the full schema. A user's rows, the users row itself
+included, live on the shard a consistent-hash ring picks for their id, so
+every query in the app (all scoped by user_id) stays on one database and
+foreign keys keep working. Each shard owns SHARD_VNODES points on the ring,
+so adding a shard moves only about 1/N of the users (scripts/reshard.py).
+
+With DATABASE_SHARDS unset there is one shard, "default", at DATABASE_URL.
+"""
+import bisect
+import hashlib
+from typing import Dict, List, Tuple, Union
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from core.config import settings
+
+DEFAULT_SHARD = "default"
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    def __init__(self, names: List[str], vnodes: int):
+        if not names:
+            raise ValueError("A hash ring needs at least one shard")
+        points: List[Tuple[int, str]] = sorted(
+            (_hash(f"{name}#{i}"), name) for name in names for i in range(vnodes)
+        )
+        self.names = sorted(names)
+        self._hashes = [point for point, _ in points]
+        self._owners = [name for _, name in points]
+
+    def node_for(self, key: Union[str, UUID]) -> str:
+        index = bisect.bisect(self._hashes, _hash(str(key)))
+        return self._owners[index % len(self._owners)]
+
+
+def shard_urls() -> Dict[str, str]:
+    return dict(settings.DATABASE_SHARDS) or {DEFAULT_SHARD: settings.DATABASE_URL}
+
+
+class ShardRouter:
+    def __init__(self, urls: Dict[str, str], vnodes: int):
+        self.urls = urls
+        self.ring = HashRing(list(urls), vnodes)
+        self.engines: Dict[str, AsyncEngine] = {
+            name: create_async_engine(
+                url,
+                echo=False,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+            )
+            for name, url in urls.items()
+        }
+        self.sessionmakers: Dict[str, async_sessionmaker] = {
+            name: async_sessionmaker(engine, expire_on_commit=False)
+            for name, engine in self.engines.items()
+        }
+        # Shard for work not tied to a user (reflection, health checks)
+        self.home = self.ring.names[0]
+
+    @property
+    def names(self) -> List[str]:
+        return self.ring.names
+
+    def shard_for(self, user_id: Union[str, UUID]) -> str:
+        if len(self.engines) == 1:
+            return self.home
+        return self.ring.node_for(user_id)
+
+    def engine_for(self, user_id: Union[str, UUID]) -> AsyncEngine:
+        return self.engines[self.shard_for(user_id)]
+
+    def session_for(self, user_id: Union[str, UUID]) -> AsyncSession:
+        return self.sessionmakers[self.shard_for(user_id)]()
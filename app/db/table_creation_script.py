@@ -19,7 +19,7 @@ def table_exists(cursor, table_name):
 
 def extract_version(filename):
     # Use regex to find the numeric part of the filename
-    match = re.search(r"V(\d+)", filename)
+    match = re.search(r"V(\d+)", filename, re.IGNORECASE)
     return (
         int(match.group(1)) if match else float("inf")
     )  # Return a large number if no match
@@ -44,12 +44,12 @@ async def table_exists(conn, table_name: str) -> bool:
 
 
 def extract_version(filename):
-    match = re.search(r"V(\d+)", filename)
+    match = re.search(r"V(\d+)", filename, re.IGNORECASE)
     return int(match.group(1)) if match else float("inf")
 
 
-async def execute_sql_files():
-    conn = await asyncpg.connect(DATABASE_URL)
+async def execute_sql_files(database_url: str = DATABASE_URL):
+    conn = await asyncpg.connect(database_url)
 
     # Ensure the migrations table exists
     await conn.execute(
@@ -9,9 +9,11 @@ class Tables:
         self.metadata = MetaData()
 
     async def reflect_metadata(self):
-        # Reflect metadata from the DB using a synchronous call wrapped in run_sync
+        # Reflect only the tables exposed below (each property is named after
+        # its table) rather than everything in the schema
+        names = [name for name, value in vars(type(self)).items() if isinstance(value, property)]
         async with engine.connect() as conn:
-            await conn.run_sync(self.metadata.reflect)
+            await conn.run_sync(lambda sync_conn: self.metadata.reflect(sync_conn, only=names))
 
     @property
     def users(self):
@@ -32,3 +34,35 @@ class Tables:
     @property
     def goals(self):
         return self.metadata.tables.get("goals")
+
+    @property
+    def journal_insights(self):
+        return self.metadata.tables.get("journal_insights")
+
+    @property
+    def journal_summaries(self):
+        return self.metadata.tables.get("journal_summaries")
+
+    @property
+    def sync_tombstones(self):
+        return self.metadata.tables.get("sync_tombstones")
+
+    @property
+    def sync_state(self):
+        return self.metadata.tables.get("sync_state")
+
+    @property
+    def idempotency_keys(self):
+        return self.metadata.tables.get("idempotency_keys")
+
+    @property
+    def user_reports(self):
+        return self.metadata.tables.get("user_reports")
+
+    @property
+    def user_directory(self):
+        return self.metadata.tables.get("user_directory")
+
+    @property
+    def jobs(self):
+        return self.metadata.tables.get("jobs")
@@ -0,0 +1,68 @@
+"""
+Production server: gunicorn managing uvicorn workers (uvloop + httptools).
+
+    gunicorn main:app            # picks up this file from the working directory
+
+- one worker per available CPU (cgroup quota aware), or WEB_CONCURRENCY;
+  background jobs are stored in the database, so any worker runs and
+  answers them (core/jobs.py)
+- the app is preloaded in the master, which runs migrations, reflection and
+  warm-up once before forking (main.prepare_before_fork)
+- each worker's DB pool is its share of DB_CONNECTION_BUDGET
+- SIGTERM drains: workers stop accepting, finish in-flight requests and run
+  the lifespan shutdown within GRACEFUL_TIMEOUT_SECONDS
+- workers are recycled after MAX_REQUESTS (+ jitter) requests
+- Prometheus metrics are aggregated across workers
+
+For local development keep using `uvicorn main:app --reload`.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.config import settings  # noqa: E402
+from core.server import available_cpus, pool_sizes  # noqa: E402
+
+workers = settings.WEB_CONCURRENCY or available_cpus()
+worker_class = "core.server.UvloopWorker"
+bind = f"0.0.0.0:{settings.PORT}"
+preload_app = True
+
+max_requests = settings.MAX_REQUESTS
+max_requests_jitter = settings.MAX_REQUESTS_JITTER
+graceful_timeout = settings.GRACEFUL_TIMEOUT_SECONDS
+timeout = max(60, settings.GRACEFUL_TIMEOUT_SECONDS * 2)
+keepalive = 5
+
+accesslog = None
+errorlog = "-"
+
+# Read by db.session when the preloaded app creates its engine
+settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW = pool_sizes(
+    settings.DB_CONNECTION_BUDGET, workers
+)
+
+# Must be set before prometheus_client is first imported (by the preload)
+if workers > 1 and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+
+
+def on_starting(server):
+    import main
+
+    server.log.info(
+        "Preparing app: %d workers, DB pool %d+%d per worker",
+        workers,
+        settings.DB_POOL_SIZE,
+        settings.DB_MAX_OVERFLOW,
+    )
+    main.prepare_before_fork()
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,7 +1,13 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.sessions import SessionMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
+from sqlalchemy.exc import DBAPIError
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from api.routes import (
     auth,
     github,
@@ -13,28 +19,141 @@ from api.routes import (
     insights,
     goals,
     journal_compare,
+    dashboard,
+    sync,
+    reports,
 )
 from core.config import settings
-
+from core.jobs import job_queue
+from core.compression import CompressionMiddleware
+from core.deadlines import (
+    DeadlineExceeded,
+    DeadlineMiddleware,
+    deadline_db_exception_handler,
+    deadline_exceeded_handler,
+    deadline_http_exception_handler,
+)
+from core.admission import AdmissionMiddleware
+from core.idempotency import IdempotencyMiddleware
+from core.rate_limit import RateLimitMiddleware
+from core.metrics import MetricsMiddleware, metrics_endpoint
+from core.profiling import SQLProfilerMiddleware
+from utils.response import FastJSONResponse
+
+from core.security import pwd_context
+from db.partitions import ensure_partitions
+from db.session import shards
 from db.table_creation_script import execute_sql_files
 from db.tables import Tables
-import nltk
+from utils.sentiment import _initialize_sentiment_analyzer
 
+logger = logging.getLogger(__name__)
 tables = Tables()
-app = FastAPI(title=settings.PROJECT_NAME)
-
-# ✅ Startup event
+_prepared_before_fork = False
 
 
-@app.on_event("startup")
-async def startup_event():
-    await execute_sql_files()
+async def _prepare_database():
+    # Every shard carries the full schema
+    await asyncio.gather(
+        *(
+            execute_sql_files(url.replace("postgresql+asyncpg", "postgresql"))
+            for url in shards.urls.values()
+        )
+    )
+    await ensure_partitions()
     await tables.reflect_metadata()
-    nltk.download("vader_lexicon")
+
+
+async def _open_pool():
+    # Establish the pool's connections up front, in parallel, instead of one
+    # at a time on the first burst of requests
+    async def checkout(engine):
+        async with engine.connect():
+            pass
+
+    await asyncio.gather(
+        *(
+            checkout(engine)
+            for engine in shards.engines.values()
+            for _ in range(engine.pool.size())
+        )
+    )
+
+
+# Lazily imported SDKs (nltk + VADER lexicon, passlib), loaded ahead of the
+# first request that needs them
+WARM_UP_STEPS = (_initialize_sentiment_analyzer, pwd_context)
+
+
+def _run_warm_up_step(init):
+    try:
+        init()
+    except Exception:
+        logger.exception("Warm-up step %s failed", init.__name__)
+
+
+async def _warm_up():
+    # Off the event loop, once the app is serving
+    for init in WARM_UP_STEPS:
+        await asyncio.to_thread(_run_warm_up_step, init)
+
+
+def prepare_before_fork():
+    """One-time startup work for the gunicorn master (see gunicorn.conf.py):
+    migrations, reflection and warm-up run once and workers inherit the
+    result. Connections opened here are closed so no socket crosses a fork."""
+    global _prepared_before_fork
+
+    async def prepare():
+        await _prepare_database()
+        await asyncio.gather(*(engine.dispose() for engine in shards.engines.values()))
+
+    asyncio.run(prepare())
+    for init in WARM_UP_STEPS:
+        _run_warm_up_step(init)
+    _prepared_before_fork = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if _prepared_before_fork:
+        await _open_pool()
+        warm_up = None
+    else:
+        # Independent initialization runs concurrently; migrations must still
+        # precede reflection, so they form one chain
+        await asyncio.gather(_prepare_database(), _open_pool())
+        warm_up = asyncio.create_task(_warm_up()) if settings.WARM_UP_ON_STARTUP else None
+    # Runners claim jobs from the database: after migrations and reflection
+    job_queue.start()
+    yield
+    if warm_up is not None:
+        warm_up.cancel()
+    await job_queue.stop()
+
+
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
+)
 
 
 # ✅ Middleware
 
+# Innermost, so replayed responses still get CORS headers and compression
+app.add_middleware(IdempotencyMiddleware)
+
+# The deadline clock starts once a request is admitted
+app.add_middleware(DeadlineMiddleware)
+
+# Inside the rate limiter, so throttled requests never take a queue slot
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
+# Inside CORS so browsers can read 429s and their Retry-After
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -48,6 +167,8 @@ app.add_middleware(
 
 # python-3.12.7
 
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     SessionMiddleware,
     secret_key=settings.SESSION_SECRET_KEY,
@@ -56,6 +177,16 @@ app.add_middleware(
     max_age=3600,
 )
 
+app.add_middleware(SQLProfilerMiddleware)
+
+# Outermost, so latency includes every other middleware
+app.add_middleware(MetricsMiddleware)
+
+# Statement/lock timeouts surface as 504/503, also when a route wrapped them
+app.add_exception_handler(StarletteHTTPException, deadline_http_exception_handler)
+app.add_exception_handler(DBAPIError, deadline_db_exception_handler)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+
 # ✅ Routes
 app.include_router(auth.router)
 app.include_router(github.router)
@@ -67,6 +198,10 @@ app.include_router(analytics.router)
 app.include_router(insights.router)
 app.include_router(goals.router)
 app.include_router(journal_compare.router)
+app.include_router(dashboard.router)
+app.include_router(sync.router)
+app.include_router(reports.router)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 
 def custom_openapi():
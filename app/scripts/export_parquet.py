@@ -0,0 +1,226 @@
+"""
+Columnar export of check-ins, journal metadata, goals and streaks for the
+analytics pipeline.
+
+    python -m scripts.export_parquet --out exports/
+    python -m scripts.export_parquet --out exports/ --table daily_checkins --table goals
+    python -m scripts.export_parquet --out exports/ --user <uuid> --full
+
+Files are Hive-partitioned, so Spark, DuckDB, Athena and pandas read a
+table's directory as one dataset:
+
+    <out>/<table>/export_run=<UTC timestamp>/shard=<name>/part-0.parquet
+
+Rows stream from a server-side cursor on each shard and are written one row
+group (--row-group rows) at a time, so memory stays flat however large the
+table is. journal_entries `content` is left out unless --include-content.
+
+Runs are incremental: <out>/_watermarks.json records, per shard and table,
+the last change cursor exported (change_seq; updated_at for user_streaks),
+and the next run picks up only rows written after it. A changed row is
+exported again with its new values; keep the one with the highest
+change_seq / updated_at per id. Hard deletes arrive as sync_tombstones rows
+(table_name, row_id). A run stops at the first row written in the last
+--settle seconds, leaving it and everything after it for the next run, so
+a write transaction still in flight is never skipped; keep it well above
+the longest request deadline. --full ignores and does not advance the
+watermarks.
+
+Needs pyarrow (`pip install pyarrow`).
+"""
+import argparse
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import asyncpg
+
+from core.config import settings
+from db.shards import HashRing, shard_urls
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only this script needs it
+    pa = pq = None
+
+# Table -> (cursor column, time column the --settle window applies to)
+EXPORTS = {
+    "daily_checkins": ("change_seq", "updated_at"),
+    "journal_entries": ("change_seq", "updated_at"),
+    "goals": ("change_seq", "updated_at"),
+    "user_streaks": ("updated_at", "updated_at"),
+    "sync_tombstones": ("change_seq", "deleted_at"),
+}
+PRIVATE_COLUMNS = {"journal_entries": ["content"]}
+WATERMARKS_FILE = "_watermarks.json"
+
+
+def arrow_type(pg_type: str):
+    types = {
+        "uuid": pa.string(),
+        "text": pa.string(),
+        "varchar": pa.string(),
+        "bool": pa.bool_(),
+        "int2": pa.int16(),
+        "int4": pa.int32(),
+        "int8": pa.int64(),
+        "numeric": pa.float64(),
+        "float8": pa.float64(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us"),
+        "timestamptz": pa.timestamp("us", tz="UTC"),
+        # asyncpg's names for array types
+        "text[]": pa.list_(pa.string()),
+        "varchar[]": pa.list_(pa.string()),
+    }
+    return types.get(pg_type, pa.string())
+
+
+def to_arrow_value(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def load_watermarks(out: str) -> dict:
+    path = os.path.join(out, WATERMARKS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_watermarks(out: str, watermarks: dict) -> None:
+    path = os.path.join(out, WATERMARKS_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+async def export_table(conn: asyncpg.Connection, table: str, since, directory: str, args):
+    """Stream `table` rows after `since` into `directory`; returns
+    (rows written, new watermark)."""
+    cursor_column, time_column = EXPORTS[table]
+    skipped = [] if args.include_content else PRIVATE_COLUMNS.get(table, [])
+
+    conditions = []
+    params = [args.settle]
+    if since is not None:
+        params.append(datetime.fromisoformat(since) if cursor_column == "updated_at" else since)
+        conditions.append(f"{cursor_column} > ${len(params)}")
+    if args.user:
+        params.append(UUID(args.user))
+        conditions.append(f"user_id = ${len(params)}")
+
+    path = os.path.join(directory, "part-0.parquet")
+    writer = None
+    written = 0
+    watermark = since
+
+    # A server-side cursor only lives inside a transaction; one snapshot
+    # for the whole table. The describe runs in it too: a prepare outside
+    # leaves asyncpg in an implicit transaction that BEGIN ... ISOLATION
+    # LEVEL then fails in.
+    async with conn.transaction(isolation="repeatable_read", readonly=True):
+        describe = await conn.prepare(f"SELECT * FROM {table} LIMIT 0")
+        attributes = [a for a in describe.get_attributes() if a.name not in skipped]
+        schema = pa.schema([(a.name, arrow_type(a.type.name)) for a in attributes])
+        names = schema.names
+        columns = [[] for _ in names]
+        # Rows come in cursor order and the export stops at the first one
+        # written in the last --settle seconds. Filtering those out instead
+        # would let a settled row with a higher cursor (its transaction
+        # began earlier but drew its change_seq later) move the watermark
+        # past them for good.
+        query = (
+            f"SELECT {', '.join(names)}, "
+            f"({time_column} IS NULL OR {time_column} < now() - make_interval(secs => $1)) AS settled "
+            f"FROM {table} {'WHERE ' + ' AND '.join(conditions) if conditions else ''} "
+            f"ORDER BY {cursor_column}"
+        )
+
+        def flush():
+            nonlocal writer, columns, written
+            if not columns[0]:
+                return
+            if writer is None:
+                os.makedirs(directory, exist_ok=True)
+                writer = pq.ParquetWriter(path + ".tmp", schema, compression="zstd")
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+            written += len(columns[0])
+            columns = [[] for _ in names]
+
+        cursor_index = names.index(cursor_column)
+        async for record in conn.cursor(query, *params, prefetch=min(args.row_group, 10000)):
+            if not record["settled"]:
+                break
+            for values, value in zip(columns, record):
+                values.append(to_arrow_value(value))
+            watermark = record[cursor_index]
+            if len(columns[0]) >= args.row_group:
+                flush()
+    flush()
+
+    if writer is not None:
+        writer.close()
+        os.replace(path + ".tmp", path)
+    if isinstance(watermark, datetime):
+        watermark = watermark.isoformat()
+    return written, watermark
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--out", required=True, help="output directory (local path)")
+    parser.add_argument("--table", action="append", choices=EXPORTS, help="default: all")
+    parser.add_argument("--user", help="export one user's rows only")
+    parser.add_argument("--full", action="store_true", help="ignore and keep the watermarks")
+    parser.add_argument("--include-content", action="store_true", help="export journal text")
+    parser.add_argument("--row-group", type=int, default=50_000, help="rows per Parquet row group")
+    parser.add_argument("--settle", type=float, default=120.0, help="seconds before a write is exported")
+    args = parser.parse_args()
+    if pa is None:
+        raise SystemExit("scripts.export_parquet needs pyarrow: pip install pyarrow")
+
+    urls = shard_urls()
+    if args.user:
+        # A user's rows all live on one shard
+        name = HashRing(list(urls), settings.SHARD_VNODES).node_for(args.user)
+        urls = {name: urls[name]}
+    scope = f"user:{args.user}" if args.user else "all"
+    run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    os.makedirs(args.out, exist_ok=True)
+    watermarks = load_watermarks(args.out)
+    marks = watermarks.setdefault(scope, {})
+    for shard, url in urls.items():
+        conn = await asyncpg.connect(url.replace("postgresql+asyncpg", "postgresql"))
+        try:
+            for table in args.table or EXPORTS:
+                since = None if args.full else marks.get(shard, {}).get(table)
+                directory = os.path.join(args.out, table, f"export_run={run}", f"shard={shard}")
+                rows, watermark = await export_table(conn, table, since, directory, args)
+                print(f"{shard}/{table}: {rows} rows")
+                if not args.full and watermark is not None:
+                    marks.setdefault(shard, {})[table] = watermark
+        finally:
+            await conn.close()
+        # Per shard, after its files are complete
+        if not args.full:
+            save_watermarks(args.out, watermarks)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
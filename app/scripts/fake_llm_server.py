@@ -0,0 +1,137 @@
+"""
+Minimal OpenAI-compatible chat completions server for local runs.
+
+    python scripts/fake_llm_server.py --port 8089
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 uvicorn main:app
+
+Answers are deterministic: insight prompts get the mood / focus / keywords
+lines the parser expects, summary prompts get the first words of the input.
+
+Fault injection for exercising timeouts, retries and the circuit breaker:
+
+    --latency 0.5 --jitter 0.2   add 0.5s +/- 0.2s to every response
+    --failure-rate 0.3           answer 30% of calls with --failure-status
+    --hang-rate 0.05             never answer 5% of calls within 5 minutes
+"""
+import argparse
+import json
+import random
+import re
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STOPWORDS = {
+    "the", "and", "for", "that", "with", "this", "was", "are", "have", "from",
+    "week", "summary", "journal", "mood", "focus", "entries", "month",
+}
+
+
+def _keywords(text: str, n: int = 5):
+    words = re.findall(r"[a-z]{4,}", text.lower())
+    counts = Counter(word for word in words if word not in STOPWORDS)
+    return [word for word, _ in counts.most_common(n)]
+
+
+def fake_completion(prompt: str) -> str:
+    if "focus score" in prompt.lower():
+        return (
+            "1. Mood: Mostly steady with a few stressful days.\n"
+            f"2. Focus score: {40 + len(prompt) % 50}\n"
+            f"3. Keywords: {', '.join(_keywords(prompt))}"
+        )
+    body = prompt.split(":", 2)[-1]
+    return " ".join(body.split()[:60])
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    jitter = 0.0
+    failure_rate = 0.0
+    failure_status = 500
+    hang_rate = 0.0
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if random.random() < self.hang_rate:
+            time.sleep(300)
+            return
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < self.failure_rate:
+            self._send_json(
+                self.failure_status,
+                {"error": {"message": "Injected failure", "type": "server_error"}},
+            )
+            return
+
+        prompt = "\n".join(m.get("content", "") for m in payload.get("messages", []))
+        content = fake_completion(prompt)
+
+        self._send_json(
+            200,
+            {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4,
+                    "completion_tokens": len(content) // 4,
+                    "total_tokens": (len(prompt) + len(content)) // 4,
+                },
+            },
+        )
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-status", type=int, default=500)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    FakeLLMHandler.latency = args.latency
+    FakeLLMHandler.jitter = args.jitter
+    FakeLLMHandler.failure_rate = args.failure_rate
+    FakeLLMHandler.failure_status = args.failure_status
+    FakeLLMHandler.hang_rate = args.hang_rate
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeLLMHandler)
+    print(f"Fake LLM listening on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Minimal Google / LinkedIn OAuth provider for load tests.
+
+    python scripts/fake_oauth_server.py --port 8090
+    GOOGLE_TOKEN_URL=http://127.0.0.1:8090/token \\
+    GOOGLE_USERINFO_URL=http://127.0.0.1:8090/userinfo \\
+    LINKEDIN_TOKEN_URL=http://127.0.0.1:8090/token \\
+    LINKEDIN_USERINFO_URL=http://127.0.0.1:8090/userinfo uvicorn main:app
+
+Any authorization code is accepted. The access token is the code itself and
+the user it resolves to is derived from it, so `/auth/google/callback?code=user-42`
+always logs in the same user (user-42@oauth.loadtest), creating it on first use.
+
+    --latency 0.2 --jitter 0.1   add 0.2s +/- 0.1s to every response
+"""
+import argparse
+import json
+import random
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOAuthHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    jitter = 0.0
+
+    def _delay(self):
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def do_POST(self):
+        if not self.path.startswith("/token"):
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        form = urllib.parse.parse_qs(self.rfile.read(length).decode())
+        code = form.get("code", [""])[0]
+        self._delay()
+        if not code:
+            self._send_json(400, {"error": "invalid_grant"})
+            return
+        self._send_json(
+            200,
+            {"access_token": code, "token_type": "Bearer", "expires_in": 3600},
+        )
+
+    def do_GET(self):
+        if not self.path.startswith("/userinfo"):
+            self.send_error(404)
+            return
+
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        self._delay()
+        if not token:
+            self._send_json(401, {"error": "invalid_token"})
+            return
+        self._send_json(
+            200,
+            {
+                # Google and LinkedIn field names
+                "id": token,
+                "sub": token,
+                "email": f"{token}@oauth.loadtest",
+                "name": f"Load Test {token}",
+            },
+        )
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    args = parser.parse_args()
+
+    FakeOAuthHandler.latency = args.latency
+    FakeOAuthHandler.jitter = args.jitter
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeOAuthHandler)
+    print(f"Fake OAuth provider listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Maintenance for the monthly partitioned journal_entries and daily_checkins
+(database/V10__partition_time_series.sql).
+
+    python -m scripts.partitions status
+    python -m scripts.partitions backfill [--table daily_checkins] [--batch 5000]
+    python -m scripts.partitions swap [--table daily_checkins]
+    python -m scripts.partitions ensure [--months-ahead 3]
+    python -m scripts.partitions archive --keep-months 36
+
+Migrating an existing table online: V10 created <table>_partitioned and
+mirrors live writes into it. `backfill` creates the historical partitions
+and copies rows in id order, one short transaction per batch. Each batch
+locks its source rows FOR SHARE, so a concurrent delete either waits for the
+copy (and is then mirrored) or has already happened. Re-running resumes
+safely. `swap` checks that both tables hold the same rows and renames the
+shadow into place. It waits at most --lock-timeout for its lock, so it
+never stalls traffic behind a long transaction. The old table stays as
+<table>_unpartitioned.
+
+`archive` detaches whole months older than --keep-months and moves them to
+the `archive` schema, where they can be dumped and dropped. Archived rows
+are no longer visible to the API. Each month is one short transaction whose
+lock waits at most --lock-timeout (DETACH ... CONCURRENTLY is not an option:
+Postgres refuses it while the table has a default partition).
+
+Every command runs on each database in DATABASE_SHARDS in turn (just
+DATABASE_URL when it is unset).
+"""
+import argparse
+import asyncio
+import re
+from datetime import date
+
+import asyncpg
+
+from core.config import settings
+from db.partitions import PARTITIONED_TABLES
+from db.shards import shard_urls
+
+
+async def connect(url: str) -> asyncpg.Connection:
+    return await asyncpg.connect(url.replace("postgresql+asyncpg", "postgresql"))
+
+
+async def is_partitioned(conn: asyncpg.Connection, table: str) -> bool:
+    return await conn.fetchval(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass($1))",
+        table,
+    )
+
+
+async def status(conn: asyncpg.Connection, table: str, args) -> None:
+    if await is_partitioned(conn, table):
+        rows = await conn.fetch(
+            """
+            SELECT c.relname, c.reltuples::bigint AS estimated_rows
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = $1::regclass
+            ORDER BY c.relname
+            """,
+            table,
+        )
+        print(f"{table}: partitioned, {len(rows)} partitions")
+        for row in rows:
+            print(f"  {row['relname']:<32} ~{max(row['estimated_rows'], 0)} rows")
+    elif await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", f"{table}_partitioned"):
+        source, shadow = await conn.fetchrow(
+            f"SELECT (SELECT count(*) FROM {table}), (SELECT count(*) FROM {table}_partitioned)"
+        )
+        print(f"{table}: migrating, {shadow}/{source} rows copied")
+    else:
+        print(f"{table}: not partitioned")
+
+
+async def backfill(conn: asyncpg.Connection, table: str, args) -> None:
+    if await is_partitioned(conn, table):
+        print(f"{table}: already partitioned")
+        return
+    shadow = f"{table}_partitioned"
+    key = PARTITIONED_TABLES[table]
+
+    first = await conn.fetchval(f"SELECT min({key})::date FROM {table}")
+    if first is not None:
+        created = await conn.fetchval(
+            "SELECT ensure_monthly_partitions($1::regclass, $2, $3)",
+            shadow, first, settings.PARTITION_MONTHS_AHEAD,
+        )
+        print(f"{table}: created {created} partitions from {first:%Y-%m}")
+
+    last_id = None
+    copied = 0
+    while True:
+        async with conn.transaction():
+            row = await conn.fetchrow(
+                f"""
+                WITH batch AS (
+                    SELECT * FROM {table}
+                    WHERE ($1::uuid IS NULL OR id > $1) AND {key} IS NOT NULL
+                    ORDER BY id
+                    LIMIT $2
+                    FOR SHARE
+                ),
+                copied AS (
+                    INSERT INTO {shadow} SELECT * FROM batch ON CONFLICT DO NOTHING
+                )
+                SELECT (SELECT id FROM batch ORDER BY id DESC LIMIT 1) AS last_id,
+                       (SELECT count(*) FROM batch) AS rows
+                """,
+                last_id, args.batch,
+            )
+        if not row["rows"]:
+            break
+        last_id = row["last_id"]
+        copied += row["rows"]
+        print(f"\r{table}: {copied} rows", end="", flush=True)
+        if args.pause:
+            await asyncio.sleep(args.pause)
+    print(f"\r{table}: backfilled {copied} rows")
+
+
+async def swap(conn: asyncpg.Connection, table: str, args) -> None:
+    if await is_partitioned(conn, table):
+        print(f"{table}: already partitioned")
+        return
+    key = PARTITIONED_TABLES[table]
+
+    # One snapshot for both sides; the mirror trigger writes in the same
+    # transaction as the source row, so they must agree exactly
+    async with conn.transaction(isolation="repeatable_read", readonly=True):
+        missing = await conn.fetchval(
+            f"""
+            SELECT count(*) FROM {table} s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {table}_partitioned p WHERE p.id = s.id AND p.{key} = s.{key}
+            )
+            """
+        )
+        extra = await conn.fetchval(
+            f"SELECT (SELECT count(*) FROM {table}_partitioned) - (SELECT count(*) FROM {table})"
+        ) + missing
+    if missing or extra:
+        raise SystemExit(
+            f"{table}: {missing} rows missing from and {extra} extra rows in the shadow; "
+            "run backfill first"
+        )
+
+    async with conn.transaction():
+        await conn.execute(f"SET LOCAL lock_timeout = '{int(args.lock_timeout * 1000)}ms'")
+        await conn.execute("SELECT finish_partition_migration($1)", table)
+    print(f"{table}: swapped in; old table kept as {table}_unpartitioned")
+
+
+async def ensure(conn: asyncpg.Connection, table: str, args) -> None:
+    for name in (table, f"{table}_partitioned"):
+        created = await conn.fetchval(
+            "SELECT ensure_monthly_partitions(to_regclass($1), current_date, $2)",
+            name, args.months_ahead,
+        )
+        if created:
+            print(f"{name}: created {created} partitions")
+
+
+async def archive(conn: asyncpg.Connection, table: str, args) -> None:
+    if not await is_partitioned(conn, table):
+        print(f"{table}: not partitioned")
+        return
+    today = date.today()
+    months = today.year * 12 + today.month - 1 - args.keep_months
+    cutoff = date(months // 12, months % 12 + 1, 1)
+
+    await conn.execute("CREATE SCHEMA IF NOT EXISTS archive")
+    partitions = await conn.fetch(
+        """
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = $1::regclass ORDER BY c.relname
+        """,
+        table,
+    )
+    for row in partitions:
+        match = re.fullmatch(rf"{table}_p(\d{{4}})(\d{{2}})", row["relname"])
+        if not match or date(int(match[1]), int(match[2]), 1) >= cutoff:
+            continue
+        # DETACH takes an ACCESS EXCLUSIVE lock on the table for a moment;
+        # the move to `archive` commits with it
+        async with conn.transaction():
+            await conn.execute(f"SET LOCAL lock_timeout = '{int(args.lock_timeout * 1000)}ms'")
+            await conn.execute(f"ALTER TABLE {table} DETACH PARTITION {row['relname']}")
+            await conn.execute(f"ALTER TABLE {row['relname']} SET SCHEMA archive")
+        print(f"{table}: archived {row['relname']}")
+
+
+COMMANDS = {
+    "status": status,
+    "backfill": backfill,
+    "swap": swap,
+    "ensure": ensure,
+    "archive": archive,
+}
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("--table", choices=PARTITIONED_TABLES, help="default: all")
+    parser.add_argument("--batch", type=int, default=5000, help="backfill rows per transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds between backfill batches")
+    parser.add_argument(
+        "--lock-timeout", type=float, default=5.0, help="swap, archive: seconds to wait for locks"
+    )
+    parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--keep-months", type=int, help="archive: months of data to keep")
+    args = parser.parse_args()
+    if args.command == "archive" and args.keep_months is None:
+        parser.error("archive requires --keep-months")
+
+    urls = shard_urls()
+    for shard, url in urls.items():
+        if len(urls) > 1:
+            print(f"shard {shard}:")
+        conn = await connect(url)
+        try:
+            for table in [args.table] if args.table else PARTITIONED_TABLES:
+                await COMMANDS[args.command](conn, table, args)
+        finally:
+            await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
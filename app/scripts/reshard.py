@@ -0,0 +1,216 @@
+"""
+Move users between shards after DATABASE_SHARDS changes (db/shards.py).
+
+    python -m scripts.reshard plan --to shards.json
+    python -m scripts.reshard move --to shards.json [--batch 100]
+    python -m scripts.reshard verify [--to shards.json]
+    python -m scripts.reshard directory [--to shards.json]
+
+shards.json is the new DATABASE_SHARDS map ({"name": "postgresql+asyncpg://..."}).
+Every database in it must already carry the schema (start the app against it
+once, or run db/table_creation_script.py). Users are read from the shards in
+both the new map and --from (default: the current DATABASE_SHARDS), so a
+shard being retired is drained by leaving it out of the new map only.
+
+`plan` counts the users whose ring placement changes, per source -> target.
+`move` copies each such user's rows to the new shard in one transaction and
+then deletes them from the old one in another. A failure in between leaves
+the user on both sides; re-running copies nothing new and finishes the
+delete. Run it in a maintenance window with the API stopped, then deploy
+with the new DATABASE_SHARDS. `verify` reports users stored on the wrong
+shard or on more than one.
+
+`directory` rebuilds the email directory (user_directory, crud/users.py) on
+the home shard, the first name of the map, from the users of every shard,
+and drops entries whose user no longer exists. Run it once after first
+splitting a database into shards, and after a move that changes the home
+shard; moves that keep it need nothing, as entries hold ids, not shards.
+It reports emails registered on more than one shard before the directory.
+
+Moved rows get fresh change_seq values on the target, whose sequence is
+first raised past the source's, so delta-sync clients pick them up again
+without a full resync.
+"""
+import argparse
+import asyncio
+import json
+from collections import Counter
+from typing import Dict
+
+import asyncpg
+
+from core.config import settings
+from db.shards import HashRing, shard_urls
+
+# Copy order (parents first); deletes run in reverse. Key column per table.
+USER_TABLES = [
+    ("users", "id"),
+    ("password_reset_tokens", "user_id"),
+    ("journal_entries", "user_id"),
+    ("daily_checkins", "user_id"),
+    ("user_streaks", "user_id"),
+    ("goals", "user_id"),
+    ("journal_insights", "user_id"),
+    ("journal_summaries", "user_id"),
+    ("sync_tombstones", "user_id"),
+    ("idempotency_keys", "user_id"),
+    ("user_reports", "user_id"),
+]
+
+
+def load_map(path) -> Dict[str, str]:
+    if path is None:
+        return shard_urls()
+    with open(path) as f:
+        return json.load(f)
+
+
+async def connect_all(urls: Dict[str, str]) -> Dict[str, asyncpg.Connection]:
+    return {
+        name: await asyncpg.connect(url.replace("postgresql+asyncpg", "postgresql"))
+        for name, url in urls.items()
+    }
+
+
+async def misplaced(conns, ring: HashRing):
+    """(user_id, source, target) for every user not on its ring shard."""
+    moves = []
+    for name, conn in conns.items():
+        for row in await conn.fetch("SELECT id FROM users ORDER BY id"):
+            target = ring.node_for(row["id"])
+            if target != name:
+                moves.append((row["id"], name, target))
+    return moves
+
+
+async def plan(conns, ring, args) -> None:
+    moves = await misplaced(conns, ring)
+    total = sum([await conn.fetchval("SELECT count(*) FROM users") for conn in conns.values()])
+    for (source, target), count in sorted(Counter((s, t) for _, s, t in moves).items()):
+        print(f"  {source} -> {target}: {count} users")
+    print(f"{len(moves)} of {total} users move")
+
+
+async def copy_user(source: asyncpg.Connection, target: asyncpg.Connection, user_id) -> int:
+    copied = 0
+    async with target.transaction():
+        # Keep change_seq increasing for this user across the move
+        seq = await source.fetchval("SELECT last_value FROM sync_change_seq")
+        await target.execute(
+            "SELECT setval('sync_change_seq', greatest($1, (SELECT last_value FROM sync_change_seq)))",
+            seq,
+        )
+        for table, key in USER_TABLES:
+            rows = await source.fetch(f"SELECT * FROM {table} WHERE {key} = $1", user_id)
+            if not rows:
+                continue
+            columns = list(rows[0].keys())
+            if "change_seq" in columns:
+                # Drawn again from the target's sequence (trigger or default)
+                columns.remove("change_seq")
+            placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+            await target.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+                "ON CONFLICT DO NOTHING",
+                [[row[column] for column in columns] for row in rows],
+            )
+            copied += len(rows)
+    return copied
+
+
+async def move_user(source: asyncpg.Connection, target: asyncpg.Connection, user_id) -> int:
+    copied = 0
+    # The copy is one transaction: a users row on the target means it committed
+    # and only the delete is left. (Tombstones have no key but change_seq,
+    # which is drawn afresh, so copying them twice would duplicate them.)
+    if await target.fetchval("SELECT 1 FROM users WHERE id = $1", user_id) is None:
+        copied = await copy_user(source, target, user_id)
+    async with source.transaction():
+        for table, key in reversed(USER_TABLES):
+            await source.execute(f"DELETE FROM {table} WHERE {key} = $1", user_id)
+        # Tombstones the deletes above just wrote; the user is gone from here
+        await source.execute("DELETE FROM sync_tombstones WHERE user_id = $1", user_id)
+    return copied
+
+
+async def move(conns, ring, args) -> None:
+    moves = await misplaced(conns, ring)
+    rows = 0
+    for done, (user_id, source, target) in enumerate(moves, 1):
+        rows += await move_user(conns[source], conns[target], user_id)
+        if done % args.batch == 0 or done == len(moves):
+            print(f"\rmoved {done}/{len(moves)} users, {rows} rows", end="", flush=True)
+    print(f"\rmoved {len(moves)} users, {rows} rows")
+
+
+async def verify(conns, ring, args) -> None:
+    homes: Dict[str, list] = {}
+    for name, conn in conns.items():
+        for row in await conn.fetch("SELECT id FROM users"):
+            homes.setdefault(str(row["id"]), []).append(name)
+    wrong = {uid: names for uid, names in homes.items() if names != [ring.node_for(uid)]}
+    for uid, names in sorted(wrong.items())[:20]:
+        print(f"  {uid}: on {', '.join(names)}, belongs on {ring.node_for(uid)}")
+    print(f"{len(wrong)} of {len(homes)} users misplaced")
+    if wrong:
+        raise SystemExit(1)
+
+
+async def directory(conns, ring, args) -> None:
+    users: Dict[str, list] = {}
+    for conn in conns.values():
+        for row in await conn.fetch("SELECT id, email FROM users ORDER BY created_at, id"):
+            users.setdefault(row["email"], []).append(row["id"])
+    home = conns[ring.names[0]]
+    async with home.transaction():
+        ids = [user_id for user_ids in users.values() for user_id in user_ids]
+        dropped = await home.execute("DELETE FROM user_directory WHERE user_id <> ALL($1::uuid[])", ids)
+        # The oldest users row keeps an email that more than one shard has
+        await home.executemany(
+            "INSERT INTO user_directory (email, user_id) VALUES ($1, $2) ON CONFLICT DO NOTHING",
+            [(email, user_ids[0]) for email, user_ids in users.items()],
+        )
+        entries = await home.fetchval("SELECT count(*) FROM user_directory")
+    duplicates = {email: user_ids for email, user_ids in users.items() if len(user_ids) > 1}
+    for email, user_ids in sorted(duplicates.items())[:20]:
+        print(f"  {email}: users {', '.join(map(str, user_ids))}")
+    print(f"{entries} directory entries on {ring.names[0]}, {dropped.split()[-1]} dropped")
+    print(f"{len(duplicates)} emails on more than one user")
+    if duplicates:
+        raise SystemExit(1)
+
+
+COMMANDS = {
+    "plan": plan,
+    "move": move,
+    "verify": verify,
+    "directory": directory,
+}
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("--to", help="JSON file with the new DATABASE_SHARDS map")
+    parser.add_argument("--from", dest="source", help="JSON file with the current map (default: settings)")
+    parser.add_argument("--vnodes", type=int, default=settings.SHARD_VNODES)
+    parser.add_argument("--batch", type=int, default=100, help="move: users between progress lines")
+    args = parser.parse_args()
+    if args.command in ("plan", "move") and args.to is None:
+        parser.error(f"{args.command} requires --to")
+
+    new_map = load_map(args.to)
+    urls = {**load_map(args.source), **new_map}
+    ring = HashRing(list(new_map), args.vnodes)
+    conns = await connect_all(urls)
+    try:
+        await COMMANDS[args.command](conns, ring, args)
+    finally:
+        for conn in conns.values():
+            await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
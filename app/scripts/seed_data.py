@@ -0,0 +1,228 @@
+"""
+Synthetic data generator for load tests and query tuning.
+
+Creates `--users` users with `--years` of daily check-ins (streaky: a user
+who checked in yesterday is likely to check in today), tags, notes, sleep,
+journal entries, goals and streak rows, bulk-loaded with COPY.
+
+    python -m scripts.seed_data --users 2000 --years 3      # ~1.7M check-ins, ~1M entries
+    python -m scripts.seed_data --users 50 --reset          # drop earlier seed users first
+
+Every seeded user is loadtest-<n>@example.com with the password given by
+--password, which is what benchmarks/load.py logs in with. Output is
+deterministic for a given --seed.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import date, datetime, time as dtime, timedelta, timezone
+
+import asyncpg
+
+from core.config import settings
+from core.security import hash_password
+
+EMAIL_PATTERN = "loadtest-{}@example.com"
+MOODS = ["bad", "okay", "good", "great", "happy"]
+TAGS = [
+    "work", "deep-work", "coding", "meetings", "gym", "reading", "family",
+    "tired", "travel", "sick", "focus", "walk", "music", "friends", "study",
+    "writing", "late-night", "early-start", "meditation", "cooking",
+]
+# Zipf-like weights: a few tags dominate, like real tagging
+TAG_WEIGHTS = [1 / (rank + 1) for rank in range(len(TAGS))]
+PHRASES = [
+    "Worked through the backlog and closed a few tickets.",
+    "Felt scattered in the morning, better after a walk.",
+    "Long meetings drained most of the afternoon.",
+    "Deep work session on the parser went really well.",
+    "Slept badly, hard to concentrate today.",
+    "Read two chapters before bed and felt calm.",
+    "Gym in the morning, productive rest of the day.",
+    "Spent the evening with family, no screens.",
+    "Stressed about the deadline but made progress.",
+    "Great focus after switching off notifications.",
+    "Travel day, not much done but good conversations.",
+    "Tried a new recipe and cooked with friends.",
+]
+FLUSH_ROWS = 50_000
+
+
+class Batches:
+    """Buffers rows per table and COPYs them in chunks."""
+
+    COLUMNS = {
+        "users": ("id", "email", "password", "full_name", "is_active", "created_at"),
+        "user_directory": ("email", "user_id"),
+        "daily_checkins": (
+            "id", "user_id", "date", "mood", "focus_percent", "tags", "note",
+            "sleep_duration", "created_at", "updated_at",
+        ),
+        "journal_entries": (
+            "id", "user_id", "title", "content", "mood", "focus_percent",
+            "is_favorite", "tags", "created_at",
+        ),
+        "user_streaks": (
+            "id", "user_id", "current_streak", "longest_streak", "last_checkin_date",
+        ),
+        "goals": (
+            "id", "user_id", "goal", "target_days", "completed_days", "status", "created_at",
+        ),
+    }
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+        self.rows = {table: [] for table in self.COLUMNS}
+        self.counts = {table: 0 for table in self.COLUMNS}
+
+    async def add(self, table: str, row: tuple):
+        self.rows[table].append(row)
+        if len(self.rows[table]) >= FLUSH_ROWS:
+            await self.flush(table)
+
+    async def flush(self, table: str = None):
+        # Users first so foreign keys hold when everything is flushed at once
+        for name in [table] if table else list(self.COLUMNS):
+            if name != "users" and self.rows["users"]:
+                await self.flush("users")
+            if not self.rows[name]:
+                continue
+            await self.conn.copy_records_to_table(
+                name, records=self.rows[name], columns=self.COLUMNS[name]
+            )
+            self.counts[name] += len(self.rows[name])
+            self.rows[name] = []
+
+
+def _tags(rng: random.Random, k_max: int):
+    k = rng.randint(0, k_max)
+    return sorted(set(rng.choices(TAGS, weights=TAG_WEIGHTS, k=k)))
+
+
+def _text(rng: random.Random, sentences: int) -> str:
+    return " ".join(rng.choice(PHRASES) for _ in range(sentences))
+
+
+async def seed_user(batches: Batches, rng: random.Random, n: int, start: date, days: int, password: str):
+    user_id = uuid.uuid4()
+    joined = datetime.combine(start, dtime(8), tzinfo=timezone.utc)
+    await batches.add(
+        "users",
+        (user_id, EMAIL_PATTERN.format(n), password, f"Load Test {n}", True, joined),
+    )
+    await batches.add("user_directory", (EMAIL_PATTERN.format(n), user_id))
+
+    # Per-user personality: baseline mood/focus and how habitual they are
+    base_mood = rng.uniform(1.0, 3.5)
+    base_focus = rng.uniform(35, 80)
+    stickiness = rng.uniform(0.75, 0.97)
+    entry_rate = rng.uniform(0.1, 0.8)
+
+    checked_yesterday = False
+    run = longest = 0
+    last_checkin = None
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        weekend = day.weekday() >= 5
+        if rng.random() < (stickiness if checked_yesterday else 0.45):
+            checked_yesterday = True
+            run += 1
+            longest = max(longest, run)
+            last_checkin = day
+
+            mood_score = min(max(rng.gauss(base_mood + (0.4 if weekend else 0), 0.9), 0), 4)
+            focus = int(min(max(rng.gauss(base_focus - (10 if weekend else 0), 15), 0), 100))
+            stamp = datetime.combine(day, dtime(rng.randint(6, 23), rng.randint(0, 59)), tzinfo=timezone.utc)
+            await batches.add(
+                "daily_checkins",
+                (
+                    uuid.uuid4(), user_id, day, MOODS[round(mood_score)], focus,
+                    _tags(rng, 3),
+                    _text(rng, rng.randint(1, 2)) if rng.random() < 0.4 else None,
+                    round(min(max(rng.gauss(7, 1.2), 3), 11), 1),
+                    stamp, stamp,
+                ),
+            )
+        else:
+            checked_yesterday = False
+            run = 0
+
+        if rng.random() < entry_rate:
+            stamp = datetime.combine(day, dtime(rng.randint(6, 23), rng.randint(0, 59)), tzinfo=timezone.utc)
+            await batches.add(
+                "journal_entries",
+                (
+                    uuid.uuid4(), user_id, f"{day:%A} notes", _text(rng, rng.randint(2, 25)),
+                    rng.choice(MOODS), rng.randint(0, 100), rng.random() < 0.08,
+                    _tags(rng, 4), stamp,
+                ),
+            )
+
+    await batches.add("user_streaks", (uuid.uuid4(), user_id, run, longest, last_checkin))
+    for _ in range(rng.randint(0, 3)):
+        target = rng.choice([7, 14, 30, 60])
+        completed = rng.randint(0, target)
+        status = "completed" if completed == target else rng.choice(["in_progress", "failed"])
+        created = start + timedelta(days=rng.randint(0, max(days - 1, 0)))
+        await batches.add(
+            "goals",
+            (uuid.uuid4(), user_id, rng.choice(PHRASES), target, completed, status, created),
+        )
+
+
+async def reset(conn: asyncpg.Connection):
+    pattern = EMAIL_PATTERN.format("%")
+    # goals.user_id has no ON DELETE CASCADE
+    await conn.execute(
+        "DELETE FROM goals WHERE user_id IN (SELECT id FROM users WHERE email LIKE $1)", pattern
+    )
+    await conn.execute("DELETE FROM user_directory WHERE email LIKE $1", pattern)
+    status = await conn.execute("DELETE FROM users WHERE email LIKE $1", pattern)
+    print(f"Removed earlier seed users ({status})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--first", type=int, default=0, help="number of the first seeded user")
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="delete earlier seed users first")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    days = int(args.years * 365)
+    start = date.today() - timedelta(days=days - 1)
+    password = hash_password(args.password)  # bcrypt once, shared by all users
+
+    conn = await asyncpg.connect(settings.DATABASE_URL.replace("postgresql+asyncpg", "postgresql"))
+    try:
+        if args.reset:
+            await reset(conn)
+
+        started = time.perf_counter()
+        batches = Batches(conn)
+        async with conn.transaction():
+            for n in range(args.first, args.first + args.users):
+                await seed_user(batches, rng, n, start, days, password)
+            await batches.flush()
+
+        for table in Batches.COLUMNS:
+            await conn.execute(f"ANALYZE {table}")
+
+        elapsed = time.perf_counter() - started
+        total = sum(batches.counts.values())
+        for table, count in batches.counts.items():
+            print(f"{table:<16} {count:>10,}")
+        print(f"{total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
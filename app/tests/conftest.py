@@ -0,0 +1,106 @@
+"""
+Shared fixtures.
+
+Unit tests run anywhere. Tests taking the `database` fixture (directly or
+through `db` / `user_id`) need a scratch Postgres server; point
+TEST_DATABASE_URL at a database name on it:
+
+    docker run -d -p 5432:5432 -e POSTGRES_HOST_AUTH_METHOD=trust postgres:16
+    TEST_DATABASE_URL=postgresql+asyncpg://postgres@localhost:5432/focus_test pytest
+
+That database (and <name>_b for the multi-shard tests) is dropped, created
+and migrated at the start of the run. Without TEST_DATABASE_URL those tests
+are skipped.
+"""
+import os
+import uuid
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+# Settings are read at import time; required values get placeholders
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+asyncpg://localhost/focus_test"
+os.environ["DATABASE_SHARDS"] = "{}"
+os.environ["WARM_UP_ON_STARTUP"] = "false"
+for name in (
+    "SECRET_KEY",
+    "GOOGLE_CLIENT_ID",
+    "GOOGLE_CLIENT_SECRET",
+    "GOOGLE_CALLBACK_URL",
+    "GITHUB_CLIENT_ID",
+    "GITHUB_CLIENT_SECRET",
+    "LINKEDIN_CLIENT_ID",
+    "LINKEDIN_CLIENT_SECRET",
+    "LINKEDIN_CALLBACK_URL",
+    "SESSION_SECRET_KEY",
+    "LINKEDIN_SCOPE",
+    "OPENAI_API_KEY",
+):
+    os.environ.setdefault(name, "test")
+
+import pytest  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from db.session import async_session, shards  # noqa: E402
+from db.tables import Tables  # noqa: E402
+from tests.databases import fetchval, recreate_database  # noqa: E402
+from tests.llm_stub import StubLLM  # noqa: E402
+from utils import llm  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+async def database():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    await recreate_database(TEST_DATABASE_URL)
+    await Tables().reflect_metadata()
+    yield TEST_DATABASE_URL
+    for engine in shards.engines.values():
+        await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def second_database(database):
+    """A second migrated database, for tests that need two shards."""
+    url = f"{database}_b"
+    await recreate_database(url)
+    return url
+
+
+@pytest.fixture
+async def db(database):
+    async with async_session() as session:
+        yield session
+
+
+@pytest.fixture
+def run_sql(database):
+    """Runs a statement on a connection of its own, so it is committed
+    independently of the `db` session; returns the first value."""
+
+    async def run(sql, *args):
+        return await fetchval(database, sql, *args)
+
+    return run
+
+
+@pytest.fixture
+async def user_id(run_sql):
+    """A fresh users row on the test database."""
+    return await run_sql(
+        "INSERT INTO users (id, email) VALUES ($1, $2) RETURNING id",
+        uuid.uuid4(),
+        f"{uuid.uuid4().hex}@example.com",
+    )
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """A fresh breaker and semaphore, no real backoff sleeps, and a stub provider."""
+    monkeypatch.setattr(llm, "breaker", llm.CircuitBreaker(failure_threshold=3, reset_timeout=30))
+    monkeypatch.setattr(llm, "_semaphore", None)
+    monkeypatch.setattr(settings, "OPENAI_RETRY_BACKOFF_SECONDS", 0.5)
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "OPENAI_TIMEOUT_SECONDS", 5)
+    fake = StubLLM()
+    monkeypatch.setattr(llm, "_create", fake)
+    return fake
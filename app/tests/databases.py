@@ -0,0 +1,29 @@
+import asyncpg
+
+from db.table_creation_script import execute_sql_files
+
+
+def asyncpg_dsn(url: str) -> str:
+    return url.replace("postgresql+asyncpg", "postgresql")
+
+
+async def recreate_database(url: str, migrate: bool = True) -> None:
+    """Drop the database `url` names, create it again and migrate it."""
+    server, _, name = asyncpg_dsn(url).rpartition("/")
+    conn = await asyncpg.connect(f"{server}/postgres")
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+        await conn.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await conn.close()
+    if migrate:
+        await execute_sql_files(asyncpg_dsn(url))
+
+
+async def fetchval(url: str, sql: str, *args):
+    """Run one statement on a connection of its own; returns the first value."""
+    conn = await asyncpg.connect(asyncpg_dsn(url))
+    try:
+        return await conn.fetchval(sql, *args)
+    finally:
+        await conn.close()
@@ -0,0 +1,32 @@
+import asyncio
+
+import httpx
+import openai
+
+
+def connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+
+
+class StubLLM:
+    """Stands in for utils.llm._create: answers after `delay` seconds, or
+    raises the next of `failures` first. Tracks calls and peak concurrency."""
+
+    def __init__(self, delay: float = 0, failures=()):
+        self.delay = delay
+        self.failures = list(failures)
+        self.prompts = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, prompt, max_tokens, temperature, timeout):
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                raise self.failures.pop(0)
+            return f"summary {len(self.prompts)}"
+        finally:
+            self.in_flight -= 1
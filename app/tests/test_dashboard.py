@@ -0,0 +1,57 @@
+import asyncio
+import uuid
+
+import pytest
+
+from core.config import settings
+from crud import dashboard
+
+
+@pytest.fixture
+def sections(monkeypatch):
+    """Sections that hold their (unused) session for a moment and record
+    how many run at once."""
+    state = {"running": 0, "peak": 0}
+
+    def section(name):
+        async def run(user_id, db):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.01)
+            state["running"] -= 1
+            return name
+
+        return lambda user_id, db: run(user_id, db)
+
+    monkeypatch.setattr(dashboard, "SECTIONS", {name: section(name) for name in dashboard.SECTIONS})
+    monkeypatch.setattr(dashboard, "_slots", None)
+    return state
+
+
+async def test_sections_share_a_per_worker_connection_cap(sections, monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_MAX_CONNECTIONS", 2)
+
+    results = await asyncio.gather(*(dashboard.get_dashboard_data(uuid.uuid4()) for _ in range(4)))
+
+    assert sections["peak"] == 2
+    for data in results:
+        assert data["errors"] == {}
+        assert data["streak"] == "streak"
+
+
+async def test_cap_defaults_to_a_third_of_the_pool(sections, monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_MAX_CONNECTIONS", None)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 5)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 10)
+
+    await asyncio.gather(*(dashboard.get_dashboard_data(uuid.uuid4()) for _ in range(4)))
+    assert sections["peak"] == 5
+
+
+async def test_waiting_for_a_slot_counts_against_the_timeout(sections, monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_MAX_CONNECTIONS", 1)
+    monkeypatch.setattr(settings, "DASHBOARD_SECTION_TIMEOUT_SECONDS", 0.025)
+
+    data = await dashboard.get_dashboard_data(uuid.uuid4())
+    assert data["streak"] == "streak"
+    assert "timeout" in data["errors"].values()
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+import asyncpg
+import pytest
+
+from scripts import export_parquet
+from tests.databases import asyncpg_dsn
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture
+async def conn(database):
+    conn = await asyncpg.connect(asyncpg_dsn(database))
+    yield conn
+    await conn.close()
+
+
+def options(user_id, **values):
+    defaults = {"include_content": False, "user": str(user_id), "row_group": 2, "settle": 0}
+    return argparse.Namespace(**{**defaults, **values})
+
+
+async def export(conn, table, since, tmp_path, run, args):
+    directory = os.path.join(tmp_path, table, f"export_run={run}")
+    rows, watermark = await export_parquet.export_table(conn, table, since, directory, args)
+    exported = pq.read_table(directory).to_pylist() if rows else []
+    return exported, watermark
+
+
+async def test_runs_pick_up_only_rows_written_since_the_watermark(conn, user_id, tmp_path):
+    args = options(user_id)
+    ids = [
+        await conn.fetchval(
+            "INSERT INTO journal_entries (user_id, title, content, tags) "
+            "VALUES ($1, $2, 'private', '{work}') RETURNING id",
+            user_id,
+            title,
+        )
+        for title in ("one", "two", "three")
+    ]
+    await conn.execute("INSERT INTO user_streaks (user_id, current_streak) VALUES ($1, 1)", user_id)
+
+    entries, entries_mark = await export(conn, "journal_entries", None, tmp_path, 1, args)
+    streaks, streaks_mark = await export(conn, "user_streaks", None, tmp_path, 1, args)
+    assert [row["title"] for row in entries] == ["one", "two", "three"]  # three row groups
+    assert "content" not in entries[0]
+    assert entries[0]["tags"] == ["work"]
+    assert entries_mark == max(row["change_seq"] for row in entries)
+    assert [row["current_streak"] for row in streaks] == [1]
+
+    # Nothing new: nothing exported, watermarks kept
+    assert await export(conn, "journal_entries", entries_mark, tmp_path, 2, args) == ([], entries_mark)
+    assert await export(conn, "user_streaks", streaks_mark, tmp_path, 2, args) == ([], streaks_mark)
+
+    await conn.execute("UPDATE journal_entries SET title = 'edited' WHERE id = $1", ids[0])
+    await conn.execute("DELETE FROM journal_entries WHERE id = $1", ids[1])
+    await conn.execute("UPDATE user_streaks SET current_streak = 2 WHERE user_id = $1", user_id)
+
+    entries, _ = await export(conn, "journal_entries", entries_mark, tmp_path, 3, args)
+    streaks, _ = await export(conn, "user_streaks", streaks_mark, tmp_path, 3, args)
+    tombstones, _ = await export(conn, "sync_tombstones", None, tmp_path, 3, args)
+    assert [row["title"] for row in entries] == ["edited"]
+    assert [row["current_streak"] for row in streaks] == [2]
+    assert [row["row_id"] for row in tombstones] == [str(ids[1])]
+
+
+async def test_an_unsettled_row_holds_back_later_ones(conn, database, user_id, tmp_path):
+    # `late` starts its transaction first but draws its change_seq after
+    # `early`, so it is older by updated_at yet later by change_seq
+    late = await asyncpg.connect(asyncpg_dsn(database))
+    try:
+        async with late.transaction():
+            await late.execute("SELECT now()")
+            await asyncio.sleep(1.2)
+            early_id = await conn.fetchval(
+                "INSERT INTO journal_entries (user_id, title) VALUES ($1, 'early') RETURNING id", user_id
+            )
+            await late.execute("INSERT INTO journal_entries (user_id, title) VALUES ($1, 'late')", user_id)
+    finally:
+        await late.close()
+
+    # `early` is still inside the settle window: exporting `late` now would
+    # move the watermark past `early` for good
+    entries, watermark = await export(conn, "journal_entries", None, tmp_path, 1, options(user_id, settle=1))
+    assert entries == [] and watermark is None
+
+    entries, watermark = await export(conn, "journal_entries", None, tmp_path, 2, options(user_id))
+    assert [row["title"] for row in entries] == ["early", "late"]
+    assert entries[0]["id"] == str(early_id)
+
+
+async def test_main_saves_watermarks_per_shard_and_table(conn, user_id, tmp_path, monkeypatch, capsys):
+    await conn.execute("INSERT INTO journal_entries (user_id, title) VALUES ($1, 'one')", user_id)
+    argv = ["export_parquet", "--out", str(tmp_path), "--user", str(user_id), "--settle", "0"]
+    monkeypatch.setattr(sys, "argv", argv + ["--table", "journal_entries"])
+
+    await export_parquet.main()
+    await export_parquet.main()
+
+    out = capsys.readouterr().out
+    assert out.splitlines() == ["default/journal_entries: 1 rows", "default/journal_entries: 0 rows"]
+    with open(tmp_path / export_parquet.WATERMARKS_FILE) as f:
+        marks = json.load(f)[f"user:{user_id}"]["default"]
+    assert marks["journal_entries"] == await conn.fetchval(
+        "SELECT change_seq FROM journal_entries WHERE user_id = $1", user_id
+    )
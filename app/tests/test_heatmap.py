@@ -0,0 +1,67 @@
+import base64
+from datetime import date, datetime, timezone
+
+import httpx
+from fastapi import FastAPI
+
+from api.routes import insights
+from core.dependencies import get_current_user
+from crud.insights import get_year_heatmap
+
+
+def decode(heatmap):
+    cells = base64.b64decode(heatmap["cells"])
+    bitmap = base64.b64decode(heatmap["journal"])
+    journal = [day for day in range(heatmap["days"]) if bitmap[day >> 3] & (1 << (day & 7))]
+    return cells, journal
+
+
+async def test_year_heatmap_packs_checkins_and_journal_days(run_sql, db, user_id):
+    for day, mood, focus in ((date(2024, 1, 1), "bad", 0), (date(2024, 12, 31), "happy", 100)):
+        await run_sql(
+            "INSERT INTO daily_checkins (user_id, date, mood, focus_percent) VALUES ($1, $2, $3, $4)",
+            user_id, day, mood, focus,
+        )
+    await run_sql(
+        "INSERT INTO daily_checkins (user_id, date, mood) VALUES ($1, $2, 'good')", user_id, date(2025, 1, 1)
+    )
+    for created_at in (
+        datetime(2024, 2, 29, 23, 59, tzinfo=timezone.utc),
+        datetime(2024, 2, 29, 8, tzinfo=timezone.utc),
+        datetime(2023, 12, 31, 23, 59, tzinfo=timezone.utc),
+    ):
+        await run_sql(
+            "INSERT INTO journal_entries (user_id, title, created_at) VALUES ($1, 'day', $2)", user_id, created_at
+        )
+
+    heatmap = await get_year_heatmap(user_id, 2024, db)
+
+    assert heatmap["days"] == 366
+    cells, journal = decode(heatmap)
+    assert len(cells) == 366
+    assert cells[0] == 1 * 16 + 1  # bad, 0-9%
+    assert cells[365] == 5 * 16 + 10  # happy, 90-100%
+    assert sum(1 for cell in cells if cell) == 2
+    assert journal == [59]  # Feb 29, once
+
+    # A write moves the sync cursor, so the cached heatmap is not served
+    await run_sql(
+        "INSERT INTO daily_checkins (user_id, date, mood) VALUES ($1, $2, 'okay')", user_id, date(2024, 6, 1)
+    )
+    refreshed = await get_year_heatmap(user_id, 2024, db)
+    assert refreshed["cursor"] > heatmap["cursor"]
+    assert decode(refreshed)[0][date(2024, 6, 1).timetuple().tm_yday - 1] == 2 * 16
+
+
+async def test_heatmap_route_rejects_years_it_cannot_cover(db, user_id):
+    app = FastAPI()
+    app.include_router(insights.router)
+    app.dependency_overrides[get_current_user] = lambda: {"id": user_id}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        last = await client.get("/checkin/journal/heatmap", params={"year": 9998})
+        beyond = await client.get("/checkin/journal/heatmap", params={"year": 9999})
+
+    assert last.status_code == 200
+    assert last.json()["data"]["days"] == 365
+    assert beyond.status_code == 422
@@ -0,0 +1,78 @@
+import uuid
+from datetime import timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI, Response
+
+from core import idempotency
+from core.idempotency import IdempotencyMiddleware
+from core.security import create_access_token
+
+
+@pytest.fixture
+def client(database):
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware)
+    app.state.created = 0
+
+    @app.post("/items")
+    async def create_item():
+        app.state.created += 1
+        response = Response(
+            b'{"id": 1}',
+            status_code=201,
+            headers={"Location": f"/items/{app.state.created}", "ETag": f'"v{app.state.created}"'},
+            media_type="application/vnd.focus+json",
+        )
+        response.headers.append("Link", "</items>; rel=collection")
+        response.headers.append("Link", "</help>; rel=help")
+        response.set_cookie("seen", "1")
+        return response
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test"), app
+
+
+async def test_replay_keeps_the_original_headers(client, user_id):
+    http, app = client
+    token = create_access_token({"sub": str(user_id)}, timedelta(minutes=5))
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": uuid.uuid4().hex}
+
+    async with http:
+        first = await http.post("/items", headers=headers)
+        cached = await http.post("/items", headers=headers)
+        # A retry on another worker reads the stored row
+        idempotency._completed.pop((user_id, headers["Idempotency-Key"]))
+        stored = await http.post("/items", headers=headers)
+
+    assert app.state.created == 1
+    assert first.status_code == 201 and "idempotent-replayed" not in first.headers
+    for replay in (cached, stored):
+        assert replay.status_code == 201
+        assert replay.content == first.content
+        assert replay.headers["idempotent-replayed"] == "true"
+        for name in ("location", "etag", "content-type", "content-length"):
+            assert replay.headers[name] == first.headers[name]
+        assert replay.headers.get_list("link") == first.headers.get_list("link")
+        assert "set-cookie" not in replay.headers
+
+
+async def test_rows_stored_without_headers_still_replay(client, user_id, run_sql):
+    http, app = client
+    token = create_access_token({"sub": str(user_id)}, timedelta(minutes=5))
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": uuid.uuid4().hex}
+
+    async with http:
+        first = await http.post("/items", headers=headers)
+        await run_sql(
+            "UPDATE idempotency_keys SET headers = NULL WHERE user_id = $1 AND key = $2",
+            user_id,
+            headers["Idempotency-Key"],
+        )
+        idempotency._completed.pop((user_id, headers["Idempotency-Key"]))
+        replay = await http.post("/items", headers=headers)
+
+    assert app.state.created == 1
+    assert replay.status_code == 201
+    assert replay.headers["content-type"] == first.headers["content-type"]
+    assert "location" not in replay.headers
@@ -0,0 +1,41 @@
+from sqlalchemy import delete, insert, update
+
+from crud.insights import get_journal_fingerprint
+from db.tables import Tables
+
+tables = Tables()
+
+
+async def test_fingerprint_tracks_inserts_edits_and_deletes(db, user_id):
+    journal_entries = tables.journal_entries
+    empty = await get_journal_fingerprint(user_id, db)
+    assert empty["entry_count"] == 0
+
+    ids = []
+    for title in ("one", "two"):
+        result = await db.execute(
+            insert(journal_entries)
+            .values(user_id=user_id, title=title, content=title)
+            .returning(journal_entries.c.id)
+        )
+        ids.append(result.scalar_one())
+    await db.commit()
+    written = await get_journal_fingerprint(user_id, db)
+    assert written["entry_count"] == 2
+    assert written != empty
+    assert await get_journal_fingerprint(user_id, db) == written
+
+    await db.execute(
+        update(journal_entries).where(journal_entries.c.id == ids[0]).values(content="edited")
+    )
+    await db.commit()
+    edited = await get_journal_fingerprint(user_id, db)
+    assert edited["entry_count"] == 2
+    assert edited["fingerprint"] != written["fingerprint"]
+
+    # The oldest entry: the highest change_seq stays, the count drops
+    await db.execute(delete(journal_entries).where(journal_entries.c.id == ids[1]))
+    await db.commit()
+    deleted = await get_journal_fingerprint(user_id, db)
+    assert deleted["entry_count"] == 1
+    assert deleted["fingerprint"] != edited["fingerprint"]
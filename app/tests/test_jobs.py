@@ -0,0 +1,138 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from api.routes import insights
+from core.dependencies import get_current_user
+from core.jobs import JobQueue, QueueFullError, job_queue
+
+
+class Handlers:
+    """Job bodies shared by the queue instances of a test, like the same
+    code running in several worker processes."""
+
+    def __init__(self):
+        self.calls = []
+        self.failures = []
+        self.delay = 0
+
+    async def echo(self, value):
+        self.calls.append(value)
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            raise self.failures.pop(0)
+        return {"value": value, "id": uuid.UUID(int=1)}
+
+
+@pytest.fixture
+async def handlers(run_sql):
+    await run_sql("DELETE FROM jobs")
+    return Handlers()
+
+
+@pytest.fixture
+async def queues(handlers):
+    """Makes JobQueue instances, each standing in for one worker process."""
+    made = []
+
+    def make(workers=1, **values):
+        options = {
+            "max_queue": 10,
+            "timeout": 2,
+            "max_retries": 1,
+            "backoff_base": 0.01,
+            "result_ttl": 60,
+            "poll_interval": 0.05,
+        }
+        queue = JobQueue(workers=workers, **{**options, **values})
+        queue.register("echo", handlers.echo)
+        made.append(queue)
+        return queue
+
+    yield make
+    for queue in made:
+        await queue.stop()
+
+
+async def test_a_job_is_run_and_polled_by_other_processes(queues, handlers):
+    accepting, running, polling = queues(workers=0), queues(), queues(workers=0)
+
+    job = await accepting.submit("echo", "echo:a", "owner", {"value": "a"})
+    assert (await polling.submit("echo", "echo:a", "owner", {"value": "a"})).id == job.id  # coalesced
+    running.start()
+    done = await polling.wait(await polling.get(job.id), 5)
+
+    assert done.status == "succeeded"
+    assert done.result == {"value": "a", "id": str(uuid.UUID(int=1))}
+    assert done.owner == "owner" and done.finished_at >= done.created_at
+    assert handlers.calls == ["a"]
+    # Finished: the key is free again
+    assert (await accepting.submit("echo", "echo:a", "owner", {"value": "a"})).id != job.id
+
+
+async def test_a_job_outlives_the_process_running_it(queues, handlers, run_sql):
+    handlers.delay = 10
+    first = queues()
+    first.start()
+    job = await first.submit("echo", "echo:b", "owner", {"value": "b"})
+    while not handlers.calls:
+        await asyncio.sleep(0.01)
+    await first.stop()  # shutdown: the job is handed back
+    assert (await first.get(job.id)).status == "queued"
+
+    # A process killed outright leaves the job running until its lease ends
+    await run_sql(
+        "UPDATE jobs SET status = 'running', attempts = 1, locked_until = now() - interval '1 second'"
+        " WHERE id = $1",
+        uuid.UUID(job.id),
+    )
+    handlers.delay = 0
+    second = queues()
+    second.start()
+    done = await second.wait(job, 5)
+
+    assert done.status == "succeeded"
+    assert done.attempts == 2
+    assert handlers.calls == ["b", "b"]
+
+
+async def test_failures_are_retried_and_client_errors_are_not(queues, handlers):
+    queue = queues()
+    queue.start()
+    handlers.failures = [RuntimeError("flaky")]
+    retried = await queue.wait(await queue.submit("echo", "echo:c", "owner", {"value": "c"}), 5)
+    assert retried.status == "succeeded" and retried.attempts == 2
+
+    handlers.failures = [HTTPException(status_code=404, detail="No entries")]
+    failed = await queue.wait(await queue.submit("echo", "echo:d", "owner", {"value": "d"}), 5)
+    assert (failed.status, failed.attempts) == ("failed", 1)
+    assert (failed.error, failed.error_status) == ("No entries", 404)
+
+
+async def test_the_queue_bound_covers_every_process(queues):
+    first, second = queues(workers=0, max_queue=1), queues(workers=0, max_queue=1)
+    await first.submit("echo", "echo:e", "owner", {"value": "e"})
+
+    with pytest.raises(QueueFullError):
+        await second.submit("echo", "echo:f", "owner", {"value": "f"})
+    assert await second.get("not-a-uuid") is None
+
+
+async def test_insight_jobs_are_stored_for_their_owner(handlers, user_id):
+    app = FastAPI()
+    app.include_router(insights.router)
+    current = {"id": user_id}
+    app.dependency_overrides[get_current_user] = lambda: current
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        created = (await client.post("/checkin/journal/insights/jobs")).json()["data"]
+        polled = await client.get(f"/checkin/journal/insights/jobs/{created['job_id']}")
+        current = {"id": uuid.uuid4()}
+        other = await client.get(f"/checkin/journal/insights/jobs/{created['job_id']}")
+
+    stored = await job_queue.get(created["job_id"])
+    assert (stored.kind, stored.params) == ("insights", {"user_id": str(user_id)})
+    assert polled.json()["data"]["status"] == "queued"
+    assert other.status_code == 404
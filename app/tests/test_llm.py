@@ -0,0 +1,139 @@
+import asyncio
+
+import openai
+import pytest
+
+from core.config import settings
+from tests.llm_stub import connection_error
+from utils import llm
+
+
+@pytest.fixture
+def backoffs(monkeypatch):
+    """Upper bounds of the jittered backoff draws; every delay comes out 0."""
+    bounds = []
+
+    def uniform(low, high):
+        bounds.append(high)
+        return 0
+
+    monkeypatch.setattr(llm.random, "uniform", uniform)
+    return bounds
+
+
+async def test_retries_transient_errors_with_exponential_backoff(stub, backoffs):
+    stub.failures = [connection_error(), connection_error()]
+
+    assert await llm.complete("hello") == "summary 3"
+    assert len(stub.prompts) == 3
+    assert backoffs == [0.5, 1.0]
+    assert llm.breaker.state == "closed"
+
+
+async def test_gives_up_after_max_retries(stub, backoffs):
+    stub.failures = [connection_error() for _ in range(3)]
+
+    with pytest.raises(llm.LLMError) as raised:
+        await llm.complete("hello")
+    assert isinstance(raised.value.__cause__, openai.APIConnectionError)
+    assert len(stub.prompts) == 3
+    assert llm.breaker.failures == 1
+
+
+async def test_breaker_opens_after_consecutive_failures_and_probes(stub, backoffs, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 0)
+    stub.failures = [connection_error() for _ in range(3)]
+    for _ in range(3):
+        with pytest.raises(llm.LLMError):
+            await llm.complete("hello")
+    assert llm.breaker.state == "open"
+
+    with pytest.raises(llm.CircuitOpenError):
+        await llm.complete("hello")
+    assert len(stub.prompts) == 3  # failed fast, provider not called
+
+    # After reset_timeout one probe goes through and closes the breaker
+    llm.breaker.opened_at -= llm.breaker.reset_timeout
+    assert await llm.complete("hello") == "summary 4"
+    assert llm.breaker.state == "closed"
+
+
+async def test_failed_probe_reopens_the_breaker(stub, backoffs, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 0)
+    llm.breaker.state = "open"
+    llm.breaker.opened_at -= llm.breaker.reset_timeout
+    stub.failures = [connection_error()]
+
+    with pytest.raises(llm.LLMError):
+        await llm.complete("hello")
+    assert llm.breaker.state == "open"
+
+
+async def test_semaphore_bounds_concurrent_calls(stub, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_MAX_CONCURRENCY", 3)
+    stub.delay = 0.01
+
+    texts = await asyncio.gather(*(llm.complete(f"prompt {i}") for i in range(12)))
+    assert len(texts) == 12
+    assert stub.peak == 3
+
+
+async def test_waiting_for_a_slot_counts_against_the_deadline(stub, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_MAX_CONCURRENCY", 1)
+    stub.delay = 0.2
+
+    results = await asyncio.gather(
+        llm.complete("first"), llm.complete("second", deadline=0.05), return_exceptions=True
+    )
+    assert results[0] == "summary 1"
+    assert isinstance(results[1], llm.LLMDeadlineError)
+    assert llm.breaker.state == "closed"  # local saturation, not a provider failure
+
+
+async def test_a_cancelled_probe_frees_the_breaker_for_the_next_call(stub, monkeypatch):
+    llm.breaker.state = "open"
+    llm.breaker.opened_at -= llm.breaker.reset_timeout
+    stub.delay = 10
+
+    probe = asyncio.create_task(llm.complete("probe"))
+    await asyncio.sleep(0.01)
+    assert stub.in_flight == 1
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    stub.delay = 0
+    assert await llm.complete("next") == "summary 2"
+    assert llm.breaker.state == "closed"
+
+
+async def test_a_saturated_probe_frees_the_breaker(stub, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_MAX_CONCURRENCY", 1)
+    stub.delay = 0.2
+    running = asyncio.create_task(llm.complete("running"))
+    await asyncio.sleep(0.01)
+    llm.breaker.state = "half_open"
+
+    with pytest.raises(llm.LLMDeadlineError):
+        await llm.complete("probe", deadline=0.05)
+    assert llm.breaker.allow()  # the next call may probe
+    await running
+
+
+async def test_cancelling_a_call_waiting_for_a_slot_releases_nothing_it_does_not_hold(stub, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_MAX_CONCURRENCY", 1)
+    stub.delay = 0.05
+    running = asyncio.create_task(llm.complete("running"))
+    await asyncio.sleep(0.01)
+
+    waiting = asyncio.create_task(llm.complete("waiting"))
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    await running
+
+    # Still one slot: two calls run one after the other
+    stub.peak = 0
+    await asyncio.gather(llm.complete("a"), llm.complete("b"))
+    assert stub.peak == 1
@@ -0,0 +1,132 @@
+import argparse
+import os
+import sys
+import uuid
+from datetime import date, datetime, timezone
+
+import asyncpg
+import pytest
+
+from core.config import settings
+from db.table_creation_script import execute_sql_files, extract_version
+from scripts import partitions
+from tests.databases import asyncpg_dsn, recreate_database
+
+DATABASE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database")
+
+
+def options(**values):
+    defaults = {"batch": 2, "pause": 0, "lock_timeout": 5, "months_ahead": 3, "keep_months": 36}
+    return argparse.Namespace(**{**defaults, **values})
+
+
+@pytest.fixture
+async def legacy_database(database):
+    """A database migrated up to V9, before partitioning."""
+    url = f"{database}_legacy"
+    await recreate_database(url, migrate=False)
+    conn = await asyncpg.connect(asyncpg_dsn(url))
+    await conn.execute(
+        "CREATE TABLE migrations (id SERIAL PRIMARY KEY, file_name VARCHAR(255) NOT NULL UNIQUE,"
+        " executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    for file_name in sorted(os.listdir(DATABASE_DIR), key=extract_version):
+        if extract_version(file_name) < 10:
+            with open(os.path.join(DATABASE_DIR, file_name)) as f:
+                await conn.execute(f.read())
+            await conn.execute("INSERT INTO migrations (file_name) VALUES ($1)", file_name)
+    yield url, conn
+    await conn.close()
+
+
+async def partition_of(conn, table, row_id):
+    return await conn.fetchval(f"SELECT tableoid::regclass::text FROM {table} WHERE id = $1", row_id)
+
+
+async def test_populated_database_is_migrated_online(legacy_database):
+    url, conn = legacy_database
+    user_id = await conn.fetchval(
+        "INSERT INTO users (email) VALUES ($1) RETURNING id", f"{uuid.uuid4().hex}@example.com"
+    )
+    for month in (1, 2, 3, 7):
+        await conn.execute(
+            "INSERT INTO journal_entries (user_id, title, created_at) VALUES ($1, 'old', $2)",
+            user_id,
+            datetime(2024, month, 15, tzinfo=timezone.utc),
+        )
+        await conn.execute(
+            "INSERT INTO daily_checkins (user_id, date, mood) VALUES ($1, $2, 'good')",
+            user_id,
+            date(2024, month, 15),
+        )
+    seqs = dict(await conn.fetch("SELECT id, change_seq FROM journal_entries"))
+
+    await execute_sql_files(asyncpg_dsn(url))
+    assert not await partitions.is_partitioned(conn, "journal_entries")
+
+    # Live writes while migrating are mirrored into the shadow
+    live_id = await conn.fetchval(
+        "INSERT INTO journal_entries (user_id, title) VALUES ($1, 'live') RETURNING id", user_id
+    )
+    edited_id, deleted_id = list(seqs)[:2]
+    await conn.execute("UPDATE journal_entries SET title = 'edited' WHERE id = $1", edited_id)
+    await conn.execute("DELETE FROM journal_entries WHERE id = $1", deleted_id)
+
+    for table in partitions.PARTITIONED_TABLES:
+        await partitions.backfill(conn, table, options())
+        await partitions.swap(conn, table, options())
+        assert await partitions.is_partitioned(conn, table)
+
+    rows = {row["id"]: row for row in await conn.fetch("SELECT * FROM journal_entries")}
+    assert set(rows) == set(seqs) - {deleted_id} | {live_id}
+    assert rows[edited_id]["title"] == "edited"
+    untouched = set(seqs) - {edited_id, deleted_id}
+    assert all(rows[row_id]["change_seq"] == seqs[row_id] for row_id in untouched)
+    assert await partition_of(conn, "journal_entries", edited_id) == "journal_entries_p202401"
+    assert await conn.fetchval("SELECT count(*) FROM daily_checkins") == 4
+    assert await conn.fetchval("SELECT count(*) FROM daily_checkins_unpartitioned") == 4
+
+    # Sync triggers moved to the partitioned table
+    new_id = await conn.fetchval(
+        "INSERT INTO journal_entries (user_id, title) VALUES ($1, 'after') RETURNING id", user_id
+    )
+    new_seq = await conn.fetchval("SELECT change_seq FROM journal_entries WHERE id = $1", new_id)
+    assert new_seq > max(row["change_seq"] for row in rows.values())
+    await conn.execute("DELETE FROM journal_entries WHERE id = $1", new_id)
+    assert await conn.fetchval(
+        "SELECT table_name FROM sync_tombstones WHERE row_id = $1", new_id
+    ) == "journal_entries"
+
+
+async def test_archive_detaches_old_months_next_to_the_default_partition(run_sql, user_id):
+    await run_sql("SELECT create_monthly_partition('journal_entries'::regclass, '2020-01-01')")
+    old_id = await run_sql(
+        "INSERT INTO journal_entries (user_id, title, created_at) "
+        "VALUES ($1, 'old', '2020-01-10T00:00:00Z') RETURNING id",
+        user_id,
+    )
+    assert await run_sql("SELECT to_regclass('journal_entries_default') IS NOT NULL")
+
+    conn = await asyncpg.connect(asyncpg_dsn(settings.DATABASE_URL))
+    try:
+        await partitions.archive(conn, "journal_entries", options())
+    finally:
+        await conn.close()
+
+    assert await run_sql("SELECT to_regclass('archive.journal_entries_p202001') IS NOT NULL")
+    assert await run_sql("SELECT count(*) FROM journal_entries WHERE id = $1", old_id) == 0
+    assert await run_sql("SELECT count(*) FROM archive.journal_entries_p202001") == 1
+    assert await run_sql(
+        "SELECT count(*) FROM pg_inherits WHERE inhrelid = 'journal_entries_default'::regclass"
+    ) == 1
+
+
+async def test_commands_run_on_every_shard(database, second_database, monkeypatch, capsys):
+    monkeypatch.setattr(settings, "DATABASE_SHARDS", {"a": database, "b": second_database})
+    monkeypatch.setattr(sys, "argv", ["partitions", "status", "--table", "daily_checkins"])
+
+    await partitions.main()
+
+    out = capsys.readouterr().out
+    assert out.count("daily_checkins: partitioned") == 2
+    assert "shard a:" in out and "shard b:" in out
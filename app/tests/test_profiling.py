@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+import core.metrics  # noqa: F401  (instruments the engines)
+from core.profiling import RequestProfile, current_profile, explainable, normalize_sql
+from db.session import engine
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        ("SELECT * FROM users WHERE id = $1", True),
+        ("WITH recent AS (SELECT 1) SELECT * FROM recent", True),
+        ("SELECT updated_at FROM goals", True),
+        ("WITH moved AS (DELETE FROM goals RETURNING *) SELECT count(*) FROM moved", False),
+        ("WITH x AS (UPDATE users SET full_name = $1 RETURNING id) SELECT * FROM x", False),
+        ("SELECT * FROM users WHERE id = $1 FOR UPDATE", False),
+        ("SELECT nextval('sync_change_seq')", False),
+        ("INSERT INTO goals (user_id) VALUES ($1)", False),
+    ],
+)
+def test_only_read_only_statements_are_explained(sql, expected):
+    assert explainable(normalize_sql(sql)) is expected
+
+
+async def test_explain_does_not_rerun_data_modifying_ctes(db, user_id):
+    token = current_profile.set(RequestProfile(explain=True))
+    try:
+        await db.execute(
+            text(
+                "WITH renamed AS (UPDATE users SET full_name = coalesce(full_name, '') || 'x' "
+                "WHERE id = :id RETURNING id) SELECT count(*) FROM renamed"
+            ),
+            {"id": user_id},
+        )
+        profile = current_profile.get()
+        full_name = await db.scalar(text("SELECT full_name FROM users WHERE id = :id"), {"id": user_id})
+    finally:
+        current_profile.reset(token)
+    await db.rollback()
+
+    assert full_name == "x"
+    assert "plan" not in profile.statements[0]
+    assert "plan" in profile.statements[1]
+
+
+async def test_failed_statements_leave_no_timing_entries(database):
+    async with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(DBAPIError):
+                await conn.execute(text("SELECT 1 / 0"))
+            await conn.rollback()
+        await conn.execute(text("SELECT 1"))
+        info = (await conn.get_raw_connection()).info
+        assert info.get("query_started") == []
+        assert info.get("profile_started") == []
@@ -0,0 +1,38 @@
+import pytest
+
+from core.config import settings
+from core.rate_limit import client_key
+
+
+def scope(peer, forwarded=None):
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded or ()]
+    return {"type": "http", "path": "/auth/login", "headers": headers, "client": (peer, 50000)}
+
+
+@pytest.fixture
+def proxies(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["10.0.0.0/8", "192.168.1.5"])
+
+
+def test_untrusted_peer_ignores_forwarded_for(proxies):
+    assert client_key(scope("203.0.113.9", ["198.51.100.1"])) == "ip:203.0.113.9"
+
+
+def test_no_trusted_proxies_by_default():
+    assert client_key(scope("10.0.0.2", ["198.51.100.1"])) == "ip:10.0.0.2"
+
+
+def test_trusted_proxy_uses_nearest_untrusted_hop(proxies):
+    # The client can put anything left of the address our proxies saw
+    forwarded = ["1.2.3.4, 198.51.100.1", "192.168.1.5"]
+    assert client_key(scope("10.0.0.2", forwarded)) == "ip:198.51.100.1"
+
+
+def test_all_hops_trusted_falls_back_to_the_first(proxies):
+    assert client_key(scope("10.0.0.2", ["10.1.1.1, 10.2.2.2"])) == "ip:10.1.1.1"
+    assert client_key(scope("10.0.0.2")) == "ip:10.0.0.2"
+
+
+def test_wildcard_trusts_every_peer(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["*"])
+    assert client_key(scope("203.0.113.9", ["198.51.100.1"])) == "ip:198.51.100.1"
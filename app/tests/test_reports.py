@@ -0,0 +1,121 @@
+import gzip
+from datetime import date, datetime, timezone
+
+import httpx
+from fastapi import FastAPI
+
+from api.routes import reports as report_routes
+from core.compression import CompressionMiddleware
+from core.jobs import JobQueue
+from core.dependencies import get_current_user
+from crud.reports import decode_report, get_stored_report, refresh_report
+
+
+async def add_checkin(run_sql, user_id, day, mood="good", focus=50):
+    return await run_sql(
+        "INSERT INTO daily_checkins (user_id, date, mood, focus_percent) VALUES ($1, $2, $3, $4) RETURNING id",
+        user_id, day, mood, focus,
+    )
+
+
+async def stored_report(user_id, db):
+    stored = await get_stored_report(user_id, "year", date(2024, 1, 1), db)
+    await db.commit()  # a fresh snapshot for the next read
+    return stored, decode_report(stored.body)
+
+
+async def test_reports_are_stored_gzipped_and_rebuilt_by_changed_month(run_sql, db, user_id):
+    await add_checkin(run_sql, user_id, date(2024, 1, 10), "bad", 20)
+    await add_checkin(run_sql, user_id, date(2024, 1, 11))
+    entry_id = await run_sql(
+        "INSERT INTO journal_entries (user_id, title, created_at) VALUES ($1, 'march', $2) RETURNING id",
+        user_id, datetime(2024, 3, 31, 23, 30, tzinfo=timezone.utc),
+    )
+
+    assert (await refresh_report(user_id, "year", "2024", db))["rebuilt_months"] == 12
+    stored, report = await stored_report(user_id, db)
+    assert stored.body[:2] == b"\x1f\x8b"
+    assert gzip.decompress(stored.body).startswith(b'{"message":"Report fetched successfully."')
+    assert report["summary"]["checkin_days"] == 2
+    assert report["summary"]["longest_streak"] == 2
+    assert report["summary"]["average_focus"] == 35
+    assert report["months"]["2024-03"]["journal_entries"] == 1
+
+    # Same cursor: left alone
+    assert (await refresh_report(user_id, "year", "2024", db))["rebuilt_months"] == 0
+    assert (await stored_report(user_id, db))[0].generated_at == stored.generated_at
+
+    # A write outside the year moves the cursor and rebuilds nothing
+    await add_checkin(run_sql, user_id, date(2025, 2, 1))
+    assert (await refresh_report(user_id, "year", "2024", db))["rebuilt_months"] == 0
+    assert (await stored_report(user_id, db))[0].cursor > stored.cursor
+
+    # Only the months written to
+    await add_checkin(run_sql, user_id, date(2024, 5, 1), "great", 90)
+    await run_sql("UPDATE daily_checkins SET mood = 'okay' WHERE user_id = $1 AND date = '2024-01-10'", user_id)
+    assert (await refresh_report(user_id, "year", "2024", db))["rebuilt_months"] == 2
+    _, report = await stored_report(user_id, db)
+    assert report["summary"]["checkin_days"] == 3
+    assert report["summary"]["mood_distribution"] == {"okay": 1, "good": 1, "great": 1}
+    assert report["summary"]["best_focus_month"] == "2024-05"
+    assert report["months"]["2024-03"]["journal_entries"] == 1
+
+    # A delete does not say which month it was in: everything is rebuilt
+    await run_sql("DELETE FROM journal_entries WHERE id = $1", entry_id)
+    assert (await refresh_report(user_id, "year", "2024", db))["rebuilt_months"] == 12
+    _, report = await stored_report(user_id, db)
+    assert report["summary"]["journal_entries"] == 0
+    assert report["summary"]["checkin_days"] == 3
+
+
+async def test_stored_body_is_served_as_is_or_decompressed(run_sql, db, user_id):
+    await add_checkin(run_sql, user_id, date(2024, 7, 1))
+    await refresh_report(user_id, "month", "2024-07", db)
+    await db.commit()
+
+    app = FastAPI()
+    app.include_router(report_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: {"id": user_id}
+    transport = httpx.ASGITransport(app=CompressionMiddleware(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        gzipped = await client.get("/reports/month/2024-07", headers={"Accept-Encoding": "gzip"})
+        plain = await client.get("/reports/month/2024-07", headers={"Accept-Encoding": "identity"})
+        cached = await client.get(
+            "/reports/month/2024-07", headers={"If-None-Match": gzipped.headers["etag"]}
+        )
+
+    stored = await get_stored_report(user_id, "month", date(2024, 7, 1), db)
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["x-report-status"] == "fresh"
+    assert int(gzipped.headers["content-length"]) == len(stored.body)  # not compressed twice
+    assert gzipped.json() == plain.json()
+    assert "content-encoding" not in plain.headers
+    assert plain.json()["data"]["summary"]["checkin_days"] == 1
+    assert cached.status_code == 304
+
+
+async def test_report_jobs_are_polled_from_any_process(run_sql, db, user_id):
+    await add_checkin(run_sql, user_id, date(2024, 8, 1))
+    app = FastAPI()
+    app.include_router(report_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: {"id": user_id}
+    # Another process's runner; this one only accepts and polls
+    runner = JobQueue(
+        workers=1, max_queue=10, timeout=5, max_retries=0, backoff_base=0, result_ttl=60, poll_interval=0.05
+    )
+    runner.register("report", report_routes._run_report_job)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        accepted = await client.get("/reports/month/2024-08")
+        assert accepted.status_code == 202
+        runner.start()
+        try:
+            job_id = accepted.json()["data"]["job_id"]
+            polled = await client.get(f"/reports/jobs/{job_id}", params={"wait": 5})
+        finally:
+            await runner.stop()
+        served = await client.get("/reports/month/2024-08")
+
+    assert polled.json()["data"]["status"] == "succeeded"
+    assert polled.json()["data"]["result"]["rebuilt_months"] == 1
+    assert served.status_code == 200
+    assert served.json()["data"]["summary"]["checkin_days"] == 1
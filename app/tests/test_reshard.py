@@ -0,0 +1,107 @@
+import uuid
+from datetime import date
+
+import asyncpg
+import pytest
+
+from db.shards import HashRing
+from scripts.reshard import directory, move_user
+from tests.databases import asyncpg_dsn
+
+
+@pytest.fixture
+async def source_and_target(database, second_database):
+    source = await asyncpg.connect(asyncpg_dsn(database))
+    target = await asyncpg.connect(asyncpg_dsn(second_database))
+    yield source, target
+    await source.close()
+    await target.close()
+
+
+class FailingDeletes:
+    """A connection whose DELETEs fail, as if it dropped mid-move."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    async def execute(self, sql, *args):
+        if sql.startswith("DELETE"):
+            raise ConnectionResetError("connection lost")
+        return await self.conn.execute(sql, *args)
+
+
+async def user_rows(conn, user_id):
+    return {
+        "users": await conn.fetchval("SELECT count(*) FROM users WHERE id = $1", user_id),
+        "journal_entries": await conn.fetchval(
+            "SELECT count(*) FROM journal_entries WHERE user_id = $1", user_id
+        ),
+        "daily_checkins": await conn.fetchval(
+            "SELECT count(*) FROM daily_checkins WHERE user_id = $1", user_id
+        ),
+        "sync_tombstones": await conn.fetchval(
+            "SELECT count(*) FROM sync_tombstones WHERE user_id = $1", user_id
+        ),
+    }
+
+
+async def test_move_copies_then_deletes_and_keeps_change_seq_increasing(source_and_target):
+    source, target = source_and_target
+    # The source has handed out more change_seq values than the target
+    await source.execute("SELECT setval('sync_change_seq', (SELECT last_value FROM sync_change_seq) + 1000)")
+    user_id = await source.fetchval(
+        "INSERT INTO users (id, email) VALUES ($1, $2) RETURNING id",
+        uuid.uuid4(),
+        f"{uuid.uuid4().hex}@example.com",
+    )
+    for title in ("kept", "deleted"):
+        await source.execute("INSERT INTO journal_entries (user_id, title) VALUES ($1, $2)", user_id, title)
+    await source.execute("DELETE FROM journal_entries WHERE user_id = $1 AND title = 'deleted'", user_id)
+    await source.execute(
+        "INSERT INTO daily_checkins (user_id, date, mood) VALUES ($1, $2, 'good')", user_id, date(2026, 1, 5)
+    )
+    # What a client synced up to before the move
+    cursor = await source.fetchval(
+        "SELECT max(change_seq) FROM (SELECT change_seq FROM journal_entries WHERE user_id = $1"
+        " UNION ALL SELECT change_seq FROM daily_checkins WHERE user_id = $1"
+        " UNION ALL SELECT change_seq FROM sync_tombstones WHERE user_id = $1) seqs",
+        user_id,
+    )
+    moved = {"users": 1, "journal_entries": 1, "daily_checkins": 1, "sync_tombstones": 1}
+
+    # Copied in one transaction, then the delete fails: the user is on both sides
+    with pytest.raises(ConnectionResetError):
+        await move_user(FailingDeletes(source), target, user_id)
+    assert await user_rows(source, user_id) == moved
+    assert await user_rows(target, user_id) == moved
+
+    # Re-running copies nothing new and finishes the delete
+    assert await move_user(source, target, user_id) == 0
+    assert await user_rows(source, user_id) == dict.fromkeys(moved, 0)
+    assert await user_rows(target, user_id) == moved
+
+    seqs = await target.fetch(
+        "SELECT change_seq FROM journal_entries WHERE user_id = $1"
+        " UNION ALL SELECT change_seq FROM daily_checkins WHERE user_id = $1"
+        " UNION ALL SELECT change_seq FROM sync_tombstones WHERE user_id = $1",
+        user_id,
+    )
+    assert len(seqs) == 3
+    assert all(row["change_seq"] > cursor for row in seqs)
+
+
+async def test_directory_is_rebuilt_on_the_home_shard_from_every_shard(source_and_target):
+    source, target = source_and_target
+    email = f"{uuid.uuid4().hex}@example.com"
+    user_id = await target.fetchval("INSERT INTO users (email) VALUES ($1) RETURNING id", email)
+    await source.execute(
+        "INSERT INTO user_directory (email, user_id) VALUES ($1, $2)", "gone@example.com", uuid.uuid4()
+    )
+
+    await directory({"a": source, "b": target}, HashRing(["a", "b"], 8), None)
+
+    assert await source.fetchval("SELECT user_id FROM user_directory WHERE email = $1", email) == user_id
+    assert await source.fetchval("SELECT count(*) FROM user_directory WHERE email = 'gone@example.com'") == 0
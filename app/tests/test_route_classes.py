@@ -0,0 +1,23 @@
+import pytest
+
+from core.route_classes import classify_route
+
+
+@pytest.mark.parametrize(
+    "path, route_class",
+    [
+        ("/auth/login", "auth"),
+        ("/checkin/journal/insights", "llm"),
+        ("/checkin/journal/insights/jobs", "llm"),
+        ("/checkin/journal/insights/jobs/0f3c", "crud"),
+        ("/dashboard", "analytics"),
+        ("/checkin/journal/heatmap", "analytics"),
+        ("/reports/year/2025", "analytics"),
+        ("/reports/quarter/2025-Q3/jobs", "analytics"),
+        ("/reports/month/2025-07/", "analytics"),
+        ("/reports/jobs/0f3c", "crud"),
+        ("/journal/entries", "crud"),
+    ],
+)
+def test_classify_route(path, route_class):
+    assert classify_route(path) == route_class
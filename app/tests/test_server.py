@@ -0,0 +1,62 @@
+import pytest
+
+from core.config import settings
+from core.server import admission_limits, dashboard_connections, pool_sizes
+
+LIMITS = {
+    "crud": (32, 128, 1.0),
+    "analytics": (4, 16, 2.0),
+    "llm": (4, 8, 5.0),
+    "auth": (2, 32, 2.0),
+}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_LIMITS", LIMITS)
+    monkeypatch.setattr(settings, "DASHBOARD_MAX_CONNECTIONS", None)
+    monkeypatch.setattr(settings, "JOB_WORKERS", 4)
+
+    def size(pool_size, max_overflow):
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", pool_size)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", max_overflow)
+
+    return size
+
+
+def test_limits_that_fit_the_pool_are_kept(pool):
+    pool(*pool_sizes(80, 1))
+    assert admission_limits() == LIMITS
+
+
+@pytest.mark.parametrize("budget, workers", [(80, 4), (80, 8), (40, 8), (15, 1)])
+def test_gates_fill_before_the_pool(pool, budget, workers):
+    pool_size, max_overflow = pool_sizes(budget, workers)
+    pool(pool_size, max_overflow)
+    limits = admission_limits()
+
+    request_connections = sum(concurrency for concurrency, _, _ in limits.values())
+    # The whole budget is used; tiny pools still get one slot per class
+    assert request_connections == max(len(limits), pool_size + max_overflow - settings.JOB_WORKERS)
+    assert all(concurrency >= 1 for concurrency, _, _ in limits.values())
+    assert limits["crud"][0] >= limits["analytics"][0]
+    assert {name: limit[1:] for name, limit in limits.items()} == {
+        name: limit[1:] for name, limit in LIMITS.items()
+    }
+
+
+def test_default_pool_of_one_uvicorn_process(pool):
+    pool(5, 10)
+    limits = {name: limit[0] for name, limit in admission_limits().items()}
+    # 15 connections: 4 for the job runners, 11 for request gates
+    assert limits == {"crud": 7, "analytics": 2, "llm": 1, "auth": 1}
+    # Most request slots serve plain reads and writes; dashboard sections
+    # share the pool rather than holding connections back
+    assert limits["crud"] > sum(limits.values()) // 2
+    assert dashboard_connections() == 5
+
+
+def test_no_runners_no_reservation(pool, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_WORKERS", 0)
+    pool(5, 10)
+    assert sum(limit[0] for limit in admission_limits().values()) == 15
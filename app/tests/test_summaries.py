@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, insert, update
+
+from core.config import settings
+from crud.summaries import get_stored_summaries, refresh_weekly_summaries, summary_window_start
+from db.tables import Tables
+from tests.llm_stub import connection_error
+from utils import llm
+
+tables = Tables()
+
+
+async def write_weeks(user_id, weeks: int, db):
+    """One entry per week for the last `weeks` weeks; returns their ids, newest first."""
+    journal_entries = tables.journal_entries
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        insert(journal_entries).returning(journal_entries.c.id),
+        [
+            {
+                "user_id": user_id,
+                "title": f"week {i}",
+                "content": f"entry {i}",
+                "created_at": now - timedelta(weeks=i),
+            }
+            for i in range(weeks)
+        ],
+    )
+    ids = list(result.scalars())
+    await db.commit()
+    return ids
+
+
+async def test_first_run_fans_out_one_bounded_call_per_week(stub, db, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_MAX_CONCURRENCY", 4)
+    # 52 calls queued at once would take 13 * 0.03s, past the 0.2s deadline
+    monkeypatch.setattr(settings, "OPENAI_TIMEOUT_SECONDS", 0.2)
+    stub.delay = 0.03
+    await write_weeks(user_id, 60, db)
+
+    weekly = await refresh_weekly_summaries(user_id, db)
+
+    assert len(stub.prompts) == settings.SUMMARY_MAX_WEEKS == 52
+    assert stub.peak <= 4
+    assert len(weekly) == 52
+    assert len(await get_stored_summaries(user_id, "week", db)) == 52
+
+
+async def test_unchanged_weeks_reuse_their_stored_summary(stub, db, user_id):
+    ids = await write_weeks(user_id, 5, db)
+    await refresh_weekly_summaries(user_id, db)
+    assert len(stub.prompts) == 5
+
+    await refresh_weekly_summaries(user_id, db)
+    assert len(stub.prompts) == 5
+
+    journal_entries = tables.journal_entries
+    await db.execute(
+        update(journal_entries).where(journal_entries.c.id == ids[2]).values(content="edited")
+    )
+    await db.commit()
+    await refresh_weekly_summaries(user_id, db)
+    assert len(stub.prompts) == 6
+    assert "edited" in stub.prompts[-1]
+
+
+async def test_failed_weeks_are_retried_and_the_rest_kept(stub, db, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 0)
+    monkeypatch.setattr(settings, "OPENAI_MAX_CONCURRENCY", 1)  # the first call fails
+    stub.failures = [connection_error()]
+    await write_weeks(user_id, 5, db)
+
+    with pytest.raises(llm.LLMError):
+        await refresh_weekly_summaries(user_id, db)
+    assert len(await get_stored_summaries(user_id, "week", db)) == 4
+
+    weekly = await refresh_weekly_summaries(user_id, db)
+    assert len(stub.prompts) == 6
+    assert len(weekly) == 5
+
+
+async def test_a_week_emptied_by_deletes_loses_its_summary(stub, db, user_id):
+    ids = await write_weeks(user_id, 3, db)
+    await refresh_weekly_summaries(user_id, db)
+
+    journal_entries = tables.journal_entries
+    await db.execute(delete(journal_entries).where(journal_entries.c.id == ids[-1]))  # the oldest week
+    await db.commit()
+    weekly = await refresh_weekly_summaries(user_id, db)
+
+    assert len(weekly) == 2
+    assert len(await get_stored_summaries(user_id, "week", db)) == 2
+    assert len(stub.prompts) == 3
+
+
+def test_the_window_is_whole_weeks_ending_with_the_current_one(monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_MAX_WEEKS", 2)
+    assert summary_window_start(datetime(2026, 10, 21).date()) == datetime(2026, 10, 12).date()
+    assert summary_window_start(datetime(2026, 10, 19).date()) == datetime(2026, 10, 12).date()
@@ -0,0 +1,56 @@
+from datetime import date
+
+from crud.sync import get_changes
+
+
+async def test_page_is_one_snapshot_across_tables(run_sql, db, user_id, monkeypatch):
+    await run_sql("INSERT INTO journal_entries (user_id, title) VALUES ($1, 'before')", user_id)
+    written = []
+
+    async def commit_between_reads():
+        # Committed after the journal read, before the check-in read
+        written.append(
+            await run_sql(
+                "INSERT INTO journal_entries (user_id, title) VALUES ($1, 'between') RETURNING id",
+                user_id,
+            )
+        )
+        await run_sql(
+            "INSERT INTO daily_checkins (user_id, date, mood) VALUES ($1, $2, 'good')",
+            user_id,
+            date(2026, 1, 5),
+        )
+
+    execute = db.execute
+    reads = []
+
+    async def execute_then_write(*args, **kwargs):
+        result = await execute(*args, **kwargs)
+        reads.append(args[0])
+        if len(reads) == 1:
+            await commit_between_reads()
+        return result
+
+    monkeypatch.setattr(db, "execute", execute_then_write)
+    first = await get_changes(user_id, 0, 100, db)
+    monkeypatch.undo()
+
+    assert [row["title"] for row in first["journal_entries"]] == ["before"]
+    assert first["checkins"] == []
+
+    second = await get_changes(user_id, first["cursor"], 100, db)
+    assert [row["id"] for row in second["journal_entries"]] == written
+    assert len(second["checkins"]) == 1
+    assert not second["has_more"]
+
+
+async def test_deletes_after_the_cursor_are_returned(run_sql, db, user_id):
+    entry_id = await run_sql(
+        "INSERT INTO journal_entries (user_id, title) VALUES ($1, 'gone') RETURNING id", user_id
+    )
+    cursor = (await get_changes(user_id, 0, 100, db))["cursor"]
+    await run_sql("DELETE FROM journal_entries WHERE id = $1", entry_id)
+
+    changes = await get_changes(user_id, cursor, 100, db)
+    assert changes["deleted"] == [{"type": "journal_entries", "id": entry_id}]
+    assert changes["cursor"] > cursor
@@ -0,0 +1,73 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from core.config import settings
+from crud import users
+from db.shards import ShardRouter
+from tests.databases import fetchval
+
+
+@pytest.fixture
+async def two_shards(database, second_database, monkeypatch):
+    """crud.users routed over two shards; "a", the test database, is home."""
+    router = ShardRouter({"a": database, "b": second_database}, settings.SHARD_VNODES)
+    monkeypatch.setattr(users, "shards", router)
+    yield router
+    for engine in router.engines.values():
+        await engine.dispose()
+
+
+def id_on(router, name):
+    while True:
+        user_id = uuid.uuid4()
+        if router.shard_for(user_id) == name:
+            return user_id
+
+
+async def users_with(email, router):
+    counts = [
+        await fetchval(url, "SELECT count(*) FROM users WHERE email = $1", email)
+        for url in router.urls.values()
+    ]
+    return sum(counts)
+
+
+async def test_an_email_is_registered_once_across_shards(two_shards):
+    email = f"{uuid.uuid4().hex}@example.com"
+
+    results = await asyncio.gather(
+        users.insert_user(id=id_on(two_shards, "a"), email=email),
+        users.insert_user(id=id_on(two_shards, "b"), email=email),
+        return_exceptions=True,
+    )
+
+    assert sum(isinstance(result, IntegrityError) for result in results) == 1
+    assert await users_with(email, two_shards) == 1
+    winner = next(result for result in results if not isinstance(result, Exception))
+    assert (await users.find_user_by_email(email)).id == winner.id
+
+
+async def test_a_failed_insert_releases_the_email(two_shards):
+    taken = uuid.uuid4().hex
+    await users.insert_user(id=id_on(two_shards, "b"), email=f"{taken}@example.com", github_id=taken)
+    email = f"{uuid.uuid4().hex}@example.com"
+
+    with pytest.raises(IntegrityError):  # github_id is taken on shard b
+        await users.insert_user(id=id_on(two_shards, "b"), email=email, github_id=taken)
+    assert await fetchval(two_shards.urls["a"], "SELECT count(*) FROM user_directory WHERE email = $1", email) == 0
+
+    row = await users.insert_user(id=id_on(two_shards, "b"), email=email)
+    assert (await users.find_user_by_email(email)).id == row.id
+
+
+async def test_users_missing_from_the_directory_are_still_found(two_shards):
+    email = f"{uuid.uuid4().hex}@example.com"
+    user_id = await fetchval(
+        two_shards.urls["b"], "INSERT INTO users (email) VALUES ($1) RETURNING id", email
+    )
+
+    assert (await users.find_user_by_email(email)).id == user_id
+    assert await users.find_user_by_email(f"{uuid.uuid4().hex}@example.com") is None
@@ -0,0 +1,41 @@
+# utils/fields.py
+"""
+Sparse fieldsets for list endpoints: `?fields=title,mood,preview`.
+
+Only the requested columns are selected, so unbounded text columns stay in
+Postgres unless asked for. `preview` is a virtual field computed in SQL as
+left(<text column>, PREVIEW_CHARS).
+"""
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import Table, func
+
+from core.config import settings
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+        )
+    return requested
+
+
+def select_columns(table: Table, fields: Sequence[str], preview_of: str) -> list:
+    """Columns for `fields`; `id` is always included so rows stay addressable."""
+    columns = []
+    for field in ["id", *[f for f in fields if f != "id"]]:
+        if field == "preview":
+            columns.append(
+                func.left(table.c[preview_of], settings.PREVIEW_CHARS).label("preview")
+            )
+        else:
+            columns.append(table.c[field])
+    return columns
@@ -0,0 +1,215 @@
+# utils/llm.py
+"""
+Guarded OpenAI client.
+
+Every completion goes through a concurrency semaphore, a per-call deadline
+that covers queueing and retries, jittered retries for transient provider
+errors and a circuit breaker that fails fast while the provider is
+degraded. Latency, in-flight calls, errors, retries, rejections and breaker
+state are exported through core.metrics.
+"""
+import asyncio
+import random
+import time
+from functools import lru_cache
+from typing import Optional
+
+from core.config import settings
+from core.metrics import LLM_BREAKER_OPEN, LLM_REJECTED, LLM_RETRIES, track_external
+
+
+class LLMError(Exception):
+    """Any failed completion: provider error, open breaker or missed deadline.
+    Provider exceptions are chained as __cause__."""
+
+
+class LLMUnavailableError(LLMError):
+    """The call was not attempted or ran out of time."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+
+class LLMDeadlineError(LLMUnavailableError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    closed    - calls flow, consecutive failures are counted
+    open      - calls fail fast until `reset_timeout` has passed
+    half_open - a single probe call decides between closed and open
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self):
+        self._probing = False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+        LLM_BREAKER_OPEN.set(0)
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            LLM_BREAKER_OPEN.set(1)
+
+
+@lru_cache(maxsize=None)
+def _client():
+    # The SDK takes ~0.25s to import; pay it on the first completion, not at startup
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        timeout=settings.OPENAI_TIMEOUT_SECONDS,
+        max_retries=0,  # retries are handled below, inside the deadline
+    )
+
+
+@lru_cache(maxsize=None)
+def _retryable_errors() -> tuple:
+    from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+    return (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
+
+breaker = CircuitBreaker(
+    failure_threshold=settings.OPENAI_BREAKER_FAILURES,
+    reset_timeout=settings.OPENAI_BREAKER_RESET_SECONDS,
+)
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Created lazily so it binds to the running event loop
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def _create(prompt: str, max_tokens: Optional[int], temperature: float, timeout: float):
+    response = await _client().chat.completions.create(
+        model=settings.OPENAI_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        timeout=timeout,
+    )
+    return (response.choices[0].message.content or "").strip()
+
+
+async def complete(
+    prompt: str,
+    max_tokens: int = None,
+    temperature: float = 0.7,
+    deadline: float = None,
+) -> str:
+    """
+    Run a single-turn chat completion and return the stripped text.
+
+    Raises:
+        LLMError: on any provider failure, an open breaker or a missed
+        deadline; callers map it to an HTTP error or a fallback.
+    """
+    if not breaker.allow():
+        LLM_REJECTED.labels("circuit_open").inc()
+        raise CircuitOpenError("OpenAI circuit breaker is open")
+    # Only the probe call is let through while half open
+    probe = breaker.state == "half_open"
+
+    try:
+        return await _complete(prompt, max_tokens, temperature, deadline)
+    finally:
+        if probe:
+            # No-op once the probe recorded its outcome; after saturation or
+            # a cancellation (client gone, request or job deadline) it frees
+            # the probe for the next call instead of keeping the breaker shut
+            breaker.release_probe()
+
+
+async def _complete(
+    prompt: str, max_tokens: Optional[int], temperature: float, deadline: Optional[float]
+) -> str:
+    from openai import OpenAIError
+
+    retryable = _retryable_errors()
+    loop = asyncio.get_running_loop()
+    expires = loop.time() + (deadline or settings.OPENAI_TIMEOUT_SECONDS)
+    semaphore = _get_semaphore()
+
+    try:
+        # asyncio.timeout rather than wait_for: on 3.11 wait_for can swallow
+        # a cancellation that races with the acquire
+        async with asyncio.timeout_at(expires):
+            await semaphore.acquire()
+    except TimeoutError:
+        # Local saturation, not a provider failure: leave the breaker alone
+        LLM_REJECTED.labels("saturated").inc()
+        raise LLMDeadlineError("Timed out waiting for an OpenAI slot")
+
+    try:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                remaining = expires - loop.time()
+                if remaining <= 0:
+                    raise TimeoutError
+                with track_external("openai"):
+                    async with asyncio.timeout_at(expires):
+                        text = await _create(prompt, max_tokens, temperature, remaining)
+                breaker.record_success()
+                return text
+
+            except TimeoutError:
+                exc = LLMDeadlineError("OpenAI call deadline exceeded")
+            except retryable as e:
+                exc = e
+            except OpenAIError as e:
+                # Bad request, auth and the like: retrying will not help
+                if breaker.state == "half_open":
+                    breaker.record_success()
+                raise LLMError(str(e)) from e
+
+            backoff = settings.OPENAI_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            delay = random.uniform(0, backoff)  # full jitter
+            if (
+                isinstance(exc, LLMDeadlineError)
+                or attempt > settings.OPENAI_MAX_RETRIES
+                or loop.time() + delay >= expires
+            ):
+                breaker.record_failure()
+                if isinstance(exc, LLMError):
+                    raise exc
+                raise LLMError(str(exc)) from exc
+
+            LLM_RETRIES.inc()
+            await asyncio.sleep(delay)
+    finally:
+        semaphore.release()
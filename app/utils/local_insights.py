@@ -0,0 +1,150 @@
+# utils/local_insights.py
+"""
+Offline insight engine: TF-IDF keywords, mood summary and focus score
+computed with NumPy from data already in the database. No network calls.
+"""
+import re
+from collections import Counter
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z][a-z']{2,}")
+
+STOPWORDS = frozenset(
+    """
+    about after again all also am an and any are as at be because been before
+    being but by can could day did do does doing done down during each even
+    feel felt few for from get got had has have having he her here him his how
+    i i'm if in into is it it's its just know like lot made make me more most
+    much my myself need next not now of off on once one only or other our out
+    over really same she should so some still such than that the their them
+    then there these they thing things think this those through time to today
+    too up very was way we well went were what when where which while who why
+    will with would yesterday you your
+    """.split()
+)
+
+FOCUS_WORDS = frozenset(
+    """
+    focus focused productive progress finished completed shipped deep plan
+    planned goal goals organized done achieved flow learned practice solved
+    """.split()
+)
+DISTRACTION_WORDS = frozenset(
+    """
+    distracted procrastinated procrastinating scrolling tired lazy overwhelmed
+    stuck interrupted unfocused wasted behind exhausted burnout anxious
+    """.split()
+)
+
+MOOD_SCORES = {"bad": 1, "okay": 2, "good": 3, "great": 4, "happy": 4}
+
+# Focus history weighting: an entry this many entries old counts half as much
+FOCUS_HALF_LIFE = 7
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def tfidf_keywords(documents: Sequence[str], top_n: int = 5) -> List[str]:
+    """
+    Rank terms by their summed TF-IDF weight across the corpus.
+
+    Works on flat (doc, term) index arrays instead of a dense matrix, so
+    memory stays proportional to the number of tokens.
+    """
+    token_lists = [tokenize(doc) for doc in documents]
+    lengths = np.fromiter((len(t) for t in token_lists), dtype=np.int64, count=len(token_lists))
+    if not lengths.sum():
+        return []
+
+    vocab, term_ids = np.unique(
+        np.array([t for tokens in token_lists for t in tokens]), return_inverse=True
+    )
+    n_docs, n_terms = len(token_lists), len(vocab)
+    doc_ids = np.repeat(np.arange(n_docs), lengths)
+
+    pairs, counts = np.unique(doc_ids * n_terms + term_ids, return_counts=True)
+    pair_docs, pair_terms = pairs // n_terms, pairs % n_terms
+
+    df = np.bincount(pair_terms, minlength=n_terms)
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    tf = counts / lengths[pair_docs]
+    scores = np.bincount(pair_terms, weights=tf * idf[pair_terms], minlength=n_terms)
+
+    top = np.argsort(-scores, kind="stable")[:top_n]
+    return [str(vocab[i]) for i in top]
+
+
+def summarize_mood(moods: Sequence[Optional[str]], sentiments: Sequence[float]) -> str:
+    """One-sentence mood summary from the mood distribution and sentiment
+    scores, both ordered newest first."""
+    known = [m for m in moods if m]
+    if not known and not len(sentiments):
+        return "Not enough data to summarize mood yet."
+
+    parts = []
+    if known:
+        distribution = Counter(known)
+        dominant, count = distribution.most_common(1)[0]
+        parts.append(
+            f"Mostly {dominant} ({round(100 * count / len(known))}% of {len(known)} days)"
+        )
+
+        scores = np.array([MOOD_SCORES.get(m, 0) for m in known], dtype=float)
+        scores = scores[scores > 0]
+        if len(scores) >= 4:
+            recent, earlier = scores[: len(scores) // 2], scores[len(scores) // 2 :]
+            delta = recent.mean() - earlier.mean()
+            if delta > 0.25:
+                parts.append("trending up recently")
+            elif delta < -0.25:
+                parts.append("trending down recently")
+            else:
+                parts.append("holding steady")
+
+    if len(sentiments):
+        avg = float(np.mean(sentiments))
+        tone = "positive" if avg > 0.05 else "negative" if avg < -0.05 else "neutral"
+        parts.append(f"with a {tone} tone in notes (sentiment {avg:+.2f})")
+
+    return ", ".join(parts) + "."
+
+
+def focus_score(focus_history: Sequence[Optional[int]], documents: Sequence[str]) -> int:
+    """
+    0-100 focus score: exponentially weighted mean of `focus_percent`
+    (newest first) blended with the balance of focus vs distraction words.
+    """
+    history = np.array([f for f in focus_history if f is not None], dtype=float)
+
+    tokens = [t for doc in documents for t in tokenize(doc)]
+    hits = sum(t in FOCUS_WORDS for t in tokens)
+    misses = sum(t in DISTRACTION_WORDS for t in tokens)
+    text_score = 50 + 50 * (hits - misses) / (hits + misses) if hits + misses else None
+
+    if len(history):
+        weights = 0.5 ** (np.arange(len(history)) / FOCUS_HALF_LIFE)
+        history_score = float(np.dot(history, weights) / weights.sum())
+        score = history_score if text_score is None else 0.8 * history_score + 0.2 * text_score
+    elif text_score is not None:
+        score = text_score
+    else:
+        score = 0
+
+    return int(round(min(max(score, 0), 100)))
+
+
+def build_local_insights(
+    documents: Sequence[str],
+    moods: Sequence[Optional[str]],
+    sentiments: Sequence[float],
+    focus_history: Sequence[Optional[int]],
+) -> dict:
+    return {
+        "mood_summary": summarize_mood(moods, sentiments),
+        "focus_score": focus_score(focus_history, documents),
+        "top_keywords": tfidf_keywords(documents),
+    }
@@ -0,0 +1,54 @@
+# utils/response.py
+from collections.abc import Mapping
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List, Type
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def _default(obj: Any):
+    # Types orjson does not handle natively but our rows contain
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-backed JSON response. Handles UUID, date/datetime, Decimal and
+    SQLAlchemy RowMapping values without a jsonable_encoder pass."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: Type[BaseModel], many: bool) -> TypeAdapter:
+    return TypeAdapter(List[model] if many else model)
+
+
+def model_response(
+    rows: Any, model: Type[BaseModel], many: bool = False, status_code: int = 200
+) -> Response:
+    """
+    Validate DB rows against `model` and dump them straight to JSON bytes in
+    pydantic-core, skipping FastAPI's response_model re-serialization and
+    jsonable_encoder. Keep `response_model=` on the route for the OpenAPI schema.
+    """
+    adapter = _adapter(model, many)
+    content = adapter.validate_python(list(rows) if many else rows)
+    return Response(
+        content=adapter.dump_json(content, by_alias=True),
+        status_code=status_code,
+        media_type="application/json",
+    )
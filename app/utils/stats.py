@@ -0,0 +1,81 @@
+# utils/stats.py
+"""
+Pure computations behind the streak, compare and tag endpoints, kept free
+of I/O so benchmarks/hotpaths.py can time them without a database.
+"""
+from collections import Counter
+from datetime import date, timedelta
+from typing import Iterable, List, Sequence, Tuple
+
+MOOD_SCORES = {"bad": 1, "okay": 2, "good": 3, "great": 4}
+
+ONE_DAY = timedelta(days=1)
+
+
+def compute_streaks(dates: Sequence[date]) -> Tuple[int, int]:
+    """(current, longest) run of consecutive days in ascending, distinct `dates`."""
+    if not dates:
+        return 0, 0
+
+    longest = streak = 1
+    previous = dates[0]
+    for current in dates[1:]:
+        if current - previous == ONE_DAY:
+            streak += 1
+        else:
+            if streak > longest:
+                longest = streak
+            streak = 1
+        previous = current
+    if streak > longest:
+        longest = streak
+
+    # The run still open at the end is the current streak
+    return streak, longest
+
+
+def parse_tags(tag_data) -> List[str]:
+    if isinstance(tag_data, list):
+        # Already a list, just strip whitespace and filter out empties
+        return [tag.strip() for tag in tag_data if isinstance(tag, str) and tag.strip()]
+    elif isinstance(tag_data, str):
+        # Comma-separated string
+        return [tag.strip() for tag in tag_data.split(",") if tag.strip()]
+    return []
+
+
+def count_tags(tags: Iterable[str], normalize: bool = False) -> List[Tuple[str, int]]:
+    """(tag, count) pairs, most frequent first; ties keep first-seen order."""
+    if normalize:
+        tags = (tag.strip().lower() for tag in tags)
+        return [(tag, n) for tag, n in Counter(tags).most_common() if tag]
+    return Counter(tags).most_common()
+
+
+def summarize_range_rows(rows: Iterable) -> dict:
+    """Average focus / mood and top tags for rows with focus_percent, mood and tags."""
+    focus_total = focus_count = 0
+    mood_total = mood_count = 0
+    tag_counts = Counter()
+    entry_count = 0
+
+    for row in rows:
+        entry_count += 1
+        if row.focus_percent is not None:
+            focus_total += row.focus_percent
+            focus_count += 1
+
+        mood = MOOD_SCORES.get(row.mood)
+        if mood is not None:
+            mood_total += mood
+            mood_count += 1
+
+        if row.tags:
+            tag_counts.update(parse_tags(row.tags))
+
+    return {
+        "average_focus": round(focus_total / focus_count) if focus_count else 0,
+        "average_mood": round(mood_total / mood_count, 1) if mood_count else 0,
+        "entry_count": entry_count,
+        "common_tags": [tag for tag, _ in tag_counts.most_common(3)],
+    }